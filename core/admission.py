@@ -0,0 +1,80 @@
+# core/admission.py — age gate + freshest-first + load shedding in front of the expensive calls
+import threading
+import time
+from collections import deque
+
+from .config import MAX_AGE_MIN
+
+
+class Admission:
+    """
+    Decides what work is still worth doing. Anything discovered more than max_age_min ago
+    can never pass the age filter, so it is dropped before a getTransaction / market
+    lookup is spent on it. When more arrives than there is room for, the freshest is kept.
+    stats: admitted, shed_old (too old on arrival), shed_load (no room), shed_stale
+    (went stale while queued). Thread-safe: called from the tx / market workers and the bus.
+    """
+
+    def __init__(self, max_age_min=MAX_AGE_MIN):
+        self.max_age_sec = float(max_age_min) * 60.0
+        self.stats = {"admitted": 0, "shed_old": 0, "shed_load": 0, "shed_stale": 0}
+        self._alert_sec = deque(maxlen=500)   # discovery ts -> posted
+        self._lock = threading.Lock()
+
+    def fresh(self, ts, now=None):
+        """Unknown ts counts as fresh (the market lookup still has the pair age)."""
+        if not ts:
+            return True
+        now = time.time() if now is None else now
+        return now - float(ts) <= self.max_age_sec
+
+    def signatures(self, sigs, room=None, now=None):
+        """Signature infos inside the age window by blockTime, newest first, at most room of them."""
+        now = time.time() if now is None else now
+        keep = [s for s in sigs if self.fresh(s.get("blockTime"), now)]
+        old = len(sigs) - len(keep)
+        keep.sort(key=lambda s: -(s.get("blockTime") or now))
+        load = 0
+        if room is not None and len(keep) > room:
+            load = len(keep) - max(0, room)
+            keep = keep[:max(0, room)]
+        with self._lock:
+            self.stats["shed_old"] += old
+            self.stats["shed_load"] += load
+            self.stats["admitted"] += len(keep)
+        return keep
+
+    def still_fresh(self, ts, now=None):
+        """Check at dequeue time; counts what aged out while waiting."""
+        if self.fresh(ts, now):
+            return True
+        with self._lock:
+            self.stats["shed_stale"] += 1
+        return False
+
+    def shed(self, n=1):
+        with self._lock:
+            self.stats["shed_load"] += n
+
+    def shed_total(self):
+        with self._lock:
+            return self._shed_total()
+
+    def _shed_total(self):
+        return self.stats["shed_old"] + self.stats["shed_load"] + self.stats["shed_stale"]
+
+    def alerted(self, ts, now=None):
+        if ts:
+            lat = (time.time() if now is None else now) - float(ts)
+            with self._lock:
+                self._alert_sec.append(lat)
+
+    def report(self):
+        """stats + shed total + time-to-alert p50/p95 (seconds from discovery ts to post)"""
+        with self._lock:
+            out = dict(self.stats, shed=self._shed_total())
+            lat = sorted(self._alert_sec)
+        if lat:
+            out["alert_p50"] = round(lat[len(lat)//2], 1)
+            out["alert_p95"] = round(lat[min(len(lat)-1, int(len(lat)*0.95))], 1)
+        return out
@@ -4,6 +4,7 @@ import requests
 from datetime import datetime, timezone
 from .market import DEX_TOKEN, _liq_usd, _to_float
 from . import store
+from .outcomes import HORIZONS, OutcomeScheduler
 
 
 def _age_min(created_ms):
@@ -63,7 +64,10 @@ def record_signal(mk: dict, score: float, parts: dict):
         "score_parts": json.dumps(parts),
         "ts": int(time.time()),
     })
-    return store.insert_signal(snap)
+    sid = store.insert_signal(snap)
+    store.overview_signal(snap["mint"], snap["symbol"], snap["ts"], snap["price_usd"])
+    store.seed_outcomes(sid, snap["price_usd"], snap["ts"], HORIZONS)
+    return sid
 
 
 def update_outcome_for_signal(signal_id: int, mint: str, t0_price: float, horizon: str):
@@ -77,11 +81,12 @@ def update_outcome_for_signal(signal_id: int, mint: str, t0_price: float, horizo
 
 
 def update_recent_outcomes(hours_back: int = 6):
-    """Batch update outcomes for recent signals (simple rolling P&L)."""
-    rows = store.recent_signals(hours_back)
-    for sig in rows:
-        sid, mint, p0, ts = sig["id"], sig["mint"], sig["price_usd"], sig["ts"]
-        # 5m / 15m / 60m horizons
-        for h in ("5m", "15m", "60m"):
-            store.ensure_outcome_row(sid, h, p0)
-            update_outcome_for_signal(sid, mint, p0, h)
+    """
+    One scheduler pass: freeze every horizon that is due (one bulk price lookup).
+    Run it at least every few minutes, or use OutcomeScheduler.run_forever().
+    """
+    sched = OutcomeScheduler()
+    sched.load(hours_back)
+    n = sched.fire_due()
+    print(f"[Outcomes] froze {n}, still pending {len(sched)}, stats={sched.stats}")
+    return n
@@ -0,0 +1,183 @@
+# core/backtest.py — replay stored ticks for past signals through core.strategy
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from . import store, strategy
+from .model import _load, features
+
+DEFAULT_GRID = {
+    "ema_fast": [8],
+    "ema_slow": [21],
+    "mom_win": [8],
+    "proba_buy": [0.62],
+    "proba_sell": [0.45],
+}
+
+
+def _init():
+    store.conn().execute("""CREATE TABLE IF NOT EXISTS backtest_results (
+        run_id TEXT NOT NULL,
+        params TEXT NOT NULL,
+        signals INTEGER, trades INTEGER,
+        win_rate REAL, avg_pct REAL, median_pct REAL, sum_pct REAL, worst_pct REAL,
+        PRIMARY KEY (run_id, params)
+    )""")
+    store.conn().commit()
+
+
+def expand_grid(grid):
+    keys = sorted(grid)
+    return [dict(zip(keys, vals)) for vals in itertools.product(*(grid[k] for k in keys))]
+
+
+def candles_from_ticks(ts, px, bar_sec=60):
+    """1m OHLC bars from (ts, price) arrays sorted by ts."""
+    ok = px > 0
+    ts, px = ts[ok], px[ok]
+    if len(ts) == 0:
+        return []
+    bucket = (ts // bar_sec) * bar_sec
+    starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    ends = np.r_[starts[1:], len(ts)]
+    return [{"time": int(bucket[s]), "open": float(px[s]), "high": float(px[s:e].max()),
+             "low": float(px[s:e].min()), "close": float(px[e-1])}
+            for s, e in zip(starts, ends)]
+
+
+def load_history(hours_back=None, horizon_min=60):
+    """{mint: (signals, ts array, price array)} for every signal that has stored ticks."""
+    if not store.conn().execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='ticks'").fetchone():
+        return {}   # the ticker never ran against this db
+    q = "SELECT id, mint, ts, price_usd FROM signals"
+    args = ()
+    if hours_back:
+        q += " WHERE ts >= ?"
+        args = (int(time.time()) - int(hours_back*3600),)
+    sigs = {}
+    for r in store.conn().execute(q + " ORDER BY ts", args):
+        sigs.setdefault(r["mint"], []).append((r["id"], r["ts"], r["price_usd"]))
+    out = {}
+    for mint, rows in sigs.items():
+        lo, hi = rows[0][1], rows[-1][1] + horizon_min*60
+        ticks = store.conn().execute(
+            "SELECT ts, price_usd FROM ticks WHERE mint=? AND ts BETWEEN ? AND ? ORDER BY ts",
+            (mint, lo, hi)).fetchall()
+        if ticks:
+            arr = np.array([(t[0], t[1] or 0.0) for t in ticks], dtype=float)
+            out[mint] = (rows, arr[:, 0].astype(np.int64), arr[:, 1])
+    return out
+
+
+def _probas(candles, last_n):
+    """Model probability at every bar (param independent, so computed once per signal)."""
+    m = _load()
+    if m is None or not candles:
+        return None
+    rows = [features([c["close"] for c in candles[max(0, i+1-last_n):i+1]])
+            for i in range(len(candles))]
+    # live model only: score_batch would log shadow rows from every pool worker
+    return [float(p) for p in m.predict_proba(np.vstack(rows))[:, 1]]
+
+
+def simulate(candles, probas, params, last_n=120, dd_stop=0.03, fee_bps=30.0):
+    """
+    Walk the bars once with decide_from_candles' rules.
+    Entries/exits fill at the next bar's open; a dd_stop below entry exits at the stop.
+    returns: list of trade returns in percent (after fees on both legs)
+    """
+    need = max(params["ema_fast"], params["ema_slow"], params["mom_win"]) + 2
+    fee = fee_bps / 1e4
+    closes = np.array([c["close"] for c in candles], dtype=float)
+    trades = []
+    entry = None
+    for i in range(need - 1, len(candles) - 1):
+        nxt = candles[i+1]
+        if entry is not None and nxt["low"] <= entry*(1-dd_stop):
+            exit_px = min(nxt["open"], entry*(1-dd_stop))
+            trades.append(((exit_px*(1-fee)) / (entry*(1+fee)) - 1) * 100)
+            entry = None
+            continue
+        window = closes[max(0, i+1-last_n):i+1]
+        b, s = strategy._rule_signal(window, params["ema_fast"], params["ema_slow"], params["mom_win"])
+        p = probas[i] if probas else None
+        d = strategy._combine(b, s, p, params["proba_buy"], params["proba_sell"])
+        if not d:
+            continue
+        if d[0] == "B" and entry is None:
+            entry = nxt["open"]
+        elif d[0] == "S" and entry is not None:
+            trades.append(((nxt["open"]*(1-fee)) / (entry*(1+fee)) - 1) * 100)
+            entry = None
+    if entry is not None:
+        trades.append(((closes[-1]*(1-fee)) / (entry*(1+fee)) - 1) * 100)
+    return trades
+
+
+def _run_mint(task):
+    """Worker: every grid combo over every signal of one mint -> {combo index: [trade returns]}."""
+    rows, ts, px, combos, horizon_min, last_n, dd_stop, fee_bps = task
+    out = {k: [] for k in range(len(combos))}
+    for _sid, t0, _p0 in rows:
+        sel = (ts >= t0) & (ts <= t0 + horizon_min*60)
+        candles = candles_from_ticks(ts[sel], px[sel])
+        if len(candles) < 3:
+            continue
+        probas = _probas(candles, last_n)
+        for k, params in enumerate(combos):
+            out[k].extend(simulate(candles, probas, params, last_n, dd_stop, fee_bps))
+    return len(rows), out
+
+
+def _summary(returns):
+    if not returns:
+        return {"trades": 0, "win_rate": None, "avg_pct": None, "median_pct": None,
+                "sum_pct": 0.0, "worst_pct": None}
+    r = np.array(returns)
+    return {"trades": len(r), "win_rate": float((r > 0).mean()), "avg_pct": float(r.mean()),
+            "median_pct": float(np.median(r)), "sum_pct": float(r.sum()), "worst_pct": float(r.min())}
+
+
+def run(grid=None, hours_back=None, horizon_min=60, last_n=120, dd_stop=0.03,
+        fee_bps=30.0, workers=None, run_id=None):
+    """Sweep the grid over stored history; returns summary rows sorted by sum_pct."""
+    combos = expand_grid(grid or DEFAULT_GRID)
+    hist = load_history(hours_back, horizon_min)
+    tasks = [(rows, ts, px, combos, horizon_min, last_n, dd_stop, fee_bps)
+             for rows, ts, px in hist.values()]
+    per_combo = {k: [] for k in range(len(combos))}
+    n_signals = 0
+    t0 = time.time()
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            results = list(ex.map(_run_mint, tasks, chunksize=max(1, len(tasks)//(workers*4))))
+    else:
+        results = [_run_mint(t) for t in tasks]
+    for n, out in results:
+        n_signals += n
+        for k, rets in out.items():
+            per_combo[k].extend(rets)
+
+    run_id = run_id or time.strftime("%Y%m%dT%H%M%S")
+    summary = []
+    for k, params in enumerate(combos):
+        row = {"params": params, "signals": n_signals}
+        row.update(_summary(per_combo[k]))
+        summary.append(row)
+    summary.sort(key=lambda r: r["sum_pct"], reverse=True)
+
+    _init()
+    store.conn().executemany("""INSERT OR REPLACE INTO backtest_results
+        (run_id, params, signals, trades, win_rate, avg_pct, median_pct, sum_pct, worst_pct)
+        VALUES (?,?,?,?,?,?,?,?,?)""", [
+        (run_id, json.dumps(r["params"], sort_keys=True), r["signals"], r["trades"], r["win_rate"],
+         r["avg_pct"], r["median_pct"], r["sum_pct"], r["worst_pct"]) for r in summary])
+    store.conn().commit()
+    print(f"[BT] run={run_id} mints={len(tasks)} signals={n_signals} combos={len(combos)} "
+          f"in {time.time()-t0:.1f}s")
+    return run_id, summary
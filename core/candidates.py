@@ -0,0 +1,202 @@
+# core/candidates.py — one stream of candidate mints from every discovery source
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from . import helius, dex_poller
+from .extract import mints_from_tx
+from .snapshot import SnapshotDiffer
+
+DEDUP_WINDOW_SEC = int(os.getenv("CANDIDATE_WINDOW_SEC", "120"))   # one evaluation per mint per window
+SEEN_SIGS_MAX = 5000
+
+# quote / base-currency mints show up in nearly every swap; never candidates
+QUOTE_MINTS = {
+    "So11111111111111111111111111111111111111112",    # wSOL
+    "EPjFWdd5AufqSNqeM2qN1xzybapC8G4wEGGkZwyTDt1v",   # USDC
+    "Es9vMFrzaCERmJfrF4H2FYD4KCoNkY11McCe8BenwNYB",   # USDT
+}
+
+
+class Candidate:
+    """A mint waiting for evaluation: earliest discovery ts and the source that saw it first."""
+    __slots__ = ("mint", "ts", "source", "sources", "offered")
+
+    def __init__(self, mint, ts, source, offered):
+        self.mint = mint
+        self.ts = ts
+        self.source = source
+        self.sources = {source}
+        self.offered = offered
+
+    def __repr__(self):
+        return f"Candidate({self.mint}, ts={self.ts:.0f}, source={self.source})"
+
+
+class CandidateBus:
+    """
+    Merges candidates from every source. The first offer of a mint queues it for
+    evaluation; later offers within window_sec (from any source) only fold into that
+    entry, keeping the earliest discovery ts and its source. Thread-safe.
+    Candidates are handed out freshest discovery first.
+    maxsize: with this many waiting, a new mint displaces the stalest one (or is shed
+    itself if it is the stalest) instead of blocking the sources.
+    admission: if given, candidates that aged out while waiting are shed in get().
+    """
+
+    def __init__(self, window_sec=DEDUP_WINDOW_SEC, maxsize=None, admission=None):
+        self.window_sec = window_sec
+        self.maxsize = maxsize
+        self.admission = admission
+        self._recent = OrderedDict()    # mint -> Candidate, in first-offer order
+        self._pending = {}              # mint -> Candidate, not yet handed out
+        self._cv = threading.Condition()
+        self.stats = {"offered": 0, "queued": 0, "merged": 0, "taken": 0, "shed": 0}
+
+    def _expire(self, now):
+        while self._recent:
+            mint, c = next(iter(self._recent.items()))
+            if now - c.offered < self.window_sec or mint in self._pending:
+                break
+            self._recent.popitem(last=False)
+
+    def _merge(self, mint, ts, source):
+        c = self._recent.get(mint)
+        if c is None:
+            return False
+        self.stats["merged"] += 1
+        c.sources.add(source)
+        if ts < c.ts:
+            c.ts, c.source = ts, source
+        return True
+
+    def offer(self, mint, ts=None, source="?", now=None):
+        """returns: True if the mint was queued, False if it merged into a recent entry"""
+        if not mint or mint in QUOTE_MINTS:
+            return False
+        now = time.time() if now is None else now
+        ts = now if ts is None else float(ts)
+        with self._cv:
+            self.stats["offered"] += 1
+            self._expire(now)
+            if self._merge(mint, ts, source):
+                return False
+            c = Candidate(mint, ts, source, now)
+            if self.maxsize and len(self._pending) >= self.maxsize:
+                stalest = min(self._pending.values(), key=lambda x: x.ts)
+                self._shed(1)
+                if stalest.ts >= ts:
+                    self._recent[mint] = c   # still counts as seen for the window
+                    return False
+                del self._pending[stalest.mint]
+            self._recent[mint] = c
+            self._pending[mint] = c
+            self.stats["queued"] += 1
+            self._cv.notify_all()
+            return True
+
+    def _shed(self, n):
+        self.stats["shed"] += n
+        if self.admission is not None:
+            self.admission.shed(n)
+
+    def get(self, timeout=None):
+        """Freshest waiting candidate, or None after timeout."""
+        deadline = None if timeout is None else time.time() + timeout
+        with self._cv:
+            while True:
+                left = None if deadline is None else max(0.0, deadline - time.time())
+                if not self._pending and not self._cv.wait_for(lambda: self._pending, left):
+                    return None
+                c = max(self._pending.values(), key=lambda x: x.ts)
+                del self._pending[c.mint]
+                if self.admission is None or self.admission.still_fresh(c.ts):
+                    self.stats["taken"] += 1
+                    return c
+                self.stats["shed"] += 1
+
+    def __len__(self):
+        with self._cv:
+            return len(self._pending)
+
+
+class HeliusSource:
+    """Recent Raydium signatures → parsed tx → every mint in its token balances."""
+    name = "helius"
+
+    def __init__(self, limit=100):
+        self.limit = limit
+        self._done = OrderedDict()   # signatures already fetched (bounded)
+
+    def signatures(self, keep=None):
+        """
+        Signatures not handed out before. keep: optional filter; signatures it rejects
+        are not remembered, so they come back on a later poll while still recent.
+        """
+        out = []
+        for s in helius.get_recent_signatures(limit=self.limit):
+            sig = s.get("signature")
+            if not sig or sig in self._done or (keep is not None and not keep(s)):
+                continue
+            self._done[sig] = True
+            if len(self._done) > SEEN_SIGS_MAX:
+                self._done.popitem(last=False)
+            out.append(s)
+        return out
+
+    @staticmethod
+    def fetch(s):
+        """(signature info, tx) or None when the node has no tx yet."""
+        tx = helius.get_tx(s["signature"])
+        return (s, tx) if tx else None
+
+    def offer(self, bus, s, tx):
+        ts = tx.get("blockTime") or s.get("blockTime")
+        return sum(bus.offer(mint, ts, self.name) for mint in mints_from_tx(tx))
+
+    def poll(self, bus):
+        n = 0
+        for s in self.signatures():
+            got = self.fetch(s)
+            if got:
+                n += self.offer(bus, *got)
+        return n
+
+
+class DexSource:
+    """New / changed pairs from the DexScreener list poll, stamped with pair creation time."""
+    name = "dex"
+
+    def __init__(self, window_minutes=60):
+        self.window_minutes = window_minutes
+        self.differ = SnapshotDiffer()
+
+    def poll(self, bus):
+        pairs, _ = dex_poller.poll(self.differ, self.window_minutes)
+        n = sum(bus.offer(mint, ts.timestamp(), self.name) for mint, ts, _ in pairs)
+        self.differ.commit()
+        return n
+
+
+def run_source(src, bus, every_sec, stop=None):
+    """Poll one source forever (or until stop is set); errors are logged and retried next round."""
+    while stop is None or not stop.is_set():
+        t0 = time.time()
+        try:
+            n = src.poll(bus)
+            if n:
+                print(f"[Bus] {src.name}: {n} new candidate(s)")
+        except Exception as e:
+            print(f"[Bus] {src.name} error:", repr(e))
+        time.sleep(max(0.0, every_sec - (time.time() - t0)))
+
+
+def start_sources(bus, sources, every_sec, stop=None):
+    threads = []
+    for src in sources:
+        t = threading.Thread(target=run_source, args=(src, bus, every_sec, stop),
+                             name=f"source-{src.name}", daemon=True)
+        t.start()
+        threads.append(t)
+    return threads
@@ -0,0 +1,138 @@
+# core/candles.py — DexScreener 1m bars with a shared session and per-mint cache
+import threading
+import time
+import requests
+from .market import DEX_TOKEN, _liq_usd
+
+BARS_URL = "https://api.dexscreener.com/chart/bars/{chain}/{addr}"
+WINDOW_SEC = 60*60*6     # ~6h of 1m bars
+MAX_BARS = 800
+PAIR_TTL_SEC = 10*60     # re-pick the most liquid pair now and then
+MIN_REFRESH_SEC = 5      # callers inside this window share the cached bars
+IDLE_EVICT_SEC = 15*60   # prune() drops mints nobody asked for in this long
+
+_session = requests.Session()
+
+
+def _parse_bars(bars):
+    out = []
+    for b in (bars or []):
+        # each bar: [t, o, h, l, c, v] per docs; time is unix seconds
+        try:
+            out.append({"time": int(b[0]), "open": float(b[1]), "high": float(b[2]),
+                        "low": float(b[3]), "close": float(b[4])})
+        except Exception:
+            continue
+    return out
+
+
+def best_pair(mint: str, timeout=10):
+    j = _session.get(DEX_TOKEN.format(mint=mint), timeout=timeout).json()
+    pairs = (j or {}).get("pairs") or []
+    if not pairs:
+        return None
+    return max(pairs, key=_liq_usd)
+
+
+def fetch_bars(chain: str, addr: str, frm: int, to: int, timeout=10):
+    r = _session.get(BARS_URL.format(chain=chain, addr=addr),
+                     params={"from": frm, "to": to, "resolution": 1}, timeout=timeout)
+    return _parse_bars(r.json())
+
+
+def merge_bars(cached, fresh, keep_from, max_bars=MAX_BARS):
+    """Replace cached bars from the first fresh bar on (the last bar may still be forming)."""
+    if fresh:
+        t0 = fresh[0]["time"]
+        cached = [c for c in cached if c["time"] < t0] + fresh
+    cached = [c for c in cached if c["time"] >= keep_from]
+    return cached[-max_bars:]
+
+
+class _Entry:
+    __slots__ = ("pair", "pair_ts", "candles", "ts", "used", "lock")
+
+    def __init__(self):
+        self.pair = None
+        self.pair_ts = 0.0
+        self.candles = []
+        self.ts = 0.0
+        self.used = 0.0
+        self.lock = threading.Lock()
+
+
+class CandleCache:
+    """
+    Per-mint candle cache. The best pair is resolved once per PAIR_TTL_SEC,
+    concurrent callers for the same mint share one upstream fetch, and after the
+    first full window only bars from the last cached bar onwards are requested.
+    """
+
+    def __init__(self, min_refresh=MIN_REFRESH_SEC, timeout=10):
+        self.min_refresh = min_refresh
+        self.timeout = timeout
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.stats = {"pair_lookups": 0, "full_fetches": 0, "delta_fetches": 0, "hits": 0}
+
+    def _entry(self, mint):
+        with self._lock:
+            e = self._entries.get(mint)
+            if e is None:
+                e = self._entries[mint] = _Entry()
+            return e
+
+    def forget(self, mint):
+        with self._lock:
+            self._entries.pop(mint, None)
+
+    def prune(self, idle_sec=IDLE_EVICT_SEC):
+        cutoff = time.time() - idle_sec
+        with self._lock:
+            for m in [m for m, e in self._entries.items() if e.used < cutoff]:
+                del self._entries[m]
+
+    def __len__(self):
+        return len(self._entries)
+
+    def pair(self, mint):
+        e = self._entry(mint)
+        with e.lock:
+            self._ensure_pair(e, mint, time.time())
+            return e.pair
+
+    def _ensure_pair(self, e, mint, now):
+        if e.pair is None or now - e.pair_ts > PAIR_TTL_SEC:
+            p = best_pair(mint, self.timeout)
+            self.stats["pair_lookups"] += 1
+            if p is not None:
+                if e.pair is not None and p.get("pairAddress") != e.pair.get("pairAddress"):
+                    e.candles = []   # liquidity moved to another pair: start over
+                e.pair = p
+            e.pair_ts = now
+
+    def get(self, mint):
+        """returns: (pair or None, candles)"""
+        e = self._entry(mint)
+        with e.lock:
+            now = time.time()
+            e.used = now
+            if e.candles and now - e.ts < self.min_refresh:
+                self.stats["hits"] += 1
+                return e.pair, e.candles
+            self._ensure_pair(e, mint, now)
+            if e.pair is None:
+                return None, []
+            chain = e.pair.get("chainId") or "solana"
+            addr = e.pair.get("pairAddress")
+            keep_from = int(now) - WINDOW_SEC
+            if e.candles:
+                frm = e.candles[-1]["time"]
+                self.stats["delta_fetches"] += 1
+            else:
+                frm = keep_from
+                self.stats["full_fetches"] += 1
+            fresh = fetch_bars(chain, addr, frm, int(now), self.timeout)
+            e.candles = merge_bars(e.candles, fresh, keep_from)
+            e.ts = now
+            return e.pair, e.candles
@@ -4,33 +4,47 @@ import requests
 from datetime import datetime, timezone, timedelta
 from .config import POLL_SECONDS
 from . import store, filters, scoring, notifier
+from .snapshot import SnapshotDiffer
 
 URL = "https://api.dexscreener.com/latest/dex/pairs/solana"
+POST_ONCE = float("inf")   # claim_post bump: the standalone poller never reposts a mint
+
+
+def poll(differ, window_minutes=60):
+    """
+    One list poll: new / materially changed pairs created within the window.
+    The differ only stages them; call differ.commit() once they were handled, so a
+    failure partway through offers the rest again on the next poll.
+    returns: (pairs, n_polled), each pair as (mint, created ts, raw pair)
+    """
+    r = requests.get(URL, timeout=20)
+    r.raise_for_status()
+    polled = r.json().get("pairs") or []
+    # only new / materially changed pairs go on to filters, scoring and the DB
+    cutoff = datetime.now(timezone.utc) - timedelta(minutes=window_minutes)
+    out = []
+    for p in differ.changes(polled):
+        created_ms = p.get("pairCreatedAt")
+        if not created_ms:
+            continue
+        ts = datetime.fromtimestamp(created_ms/1000.0, tz=timezone.utc)
+        mint = (p.get("baseToken") or {}).get("address")
+        if ts < cutoff or not mint:
+            continue
+        out.append((mint, ts, p))
+    return out, len(polled)
 
 
 def loop(window_minutes=60, min_liq=15000, min_mcap=100000, min_score=50):
+    differ = SnapshotDiffer()
     while True:
         try:
-            r = requests.get(URL, timeout=20)
-            r.raise_for_status()
-            pairs = r.json().get("pairs") or []
-            cutoff = datetime.now(timezone.utc) - \
-                timedelta(minutes=window_minutes)
+            pairs, n_polled = poll(differ, window_minutes)
             posted = 0
             now = datetime.now(timezone.utc)
 
-            for p in pairs:
-                created_ms = p.get("pairCreatedAt")
-                if not created_ms:
-                    continue
-                ts = datetime.fromtimestamp(created_ms/1000.0, tz=timezone.utc)
-                if ts < cutoff:
-                    continue
-
+            for mint, ts, p in pairs:
                 base = p.get("baseToken") or {}
-                mint = base.get("address")
-                if not mint or store.is_seen(mint):
-                    continue
 
                 liq = float((p.get("liquidity") or {}).get("usd") or 0)
                 mc = float(p.get("fdv") or p.get("marketCap") or 0)
@@ -45,19 +59,20 @@ def loop(window_minutes=60, min_liq=15000, min_mcap=100000, min_score=50):
 
                 reject, _ = filters.hard_filters(m)
                 score, parts = scoring.score(m)
-                if not reject and score >= min_score:
+                # claim before posting (one atomic upsert), so a running runner can't post it too;
+                # once only, even when the differ passes the pair on again with a higher score
+                if not reject and score >= min_score and store.claim_post(mint, score, POST_ONCE)[0]:
                     notifier.post(m, score, {
                         "liq": parts["liq"], "mc": parts["mc"],
                         "age": parts["age"], "ratio": parts["ratio"]
                     })
-                    store.mark_posted(mint, score)
-                    store.mark_seen(mint)
                     print(
                         f"[DEX] POSTED {m['symbol']} score={score} liq=${int(liq):,} mc=${int(mc or 0):,} age={age_min:.1f}m")
                     posted += 1
+            differ.commit()
 
             if posted == 0:
-                print("[DEX] no new qualified pairs this cycle")
+                print(f"[DEX] no new qualified pairs this cycle ({len(pairs)}/{n_polled} changed)")
         except Exception as e:
             print("[DEX] error:", repr(e))
         time.sleep(POLL_SECONDS)
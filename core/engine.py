@@ -0,0 +1,105 @@
+# core/engine.py — one signal engine for every followed mint
+import datetime as dt
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from . import model, store
+from .config import CHART_BASE_URL
+from .candles import CandleCache
+from .strategy import decide_batch
+
+CYCLE_SEC = 10
+FETCH_WORKERS = 8
+ENGINE_NAME = "signal_engine"
+
+
+class SignalEngine:
+    """
+    Replaces one signal_loop process per mint: the follow list comes from the
+    engine_follow table (runner writes it), candles come from one shared cache and
+    HTTP session, and each cycle is one decide_batch call.
+    """
+
+    def __init__(self, cycle_sec=CYCLE_SEC, workers=FETCH_WORKERS):
+        self.cycle_sec = cycle_sec
+        self.cache = CandleCache()
+        self.pool = ThreadPoolExecutor(max_workers=workers)
+        self.last_side = {}    # mint -> last side written (avoid spam on same side)
+        self.symbols = {}
+        self.http = requests.Session()
+
+    def _sync(self):
+        mints = store.followed_mints()
+        live = set(mints)
+        for m in [m for m in self.last_side if m not in live]:
+            self.last_side.pop(m, None)
+            self.symbols.pop(m, None)
+            self.cache.forget(m)
+            model.forget(m)
+            print(f"[engine] dropped {m}")
+        for m in mints:
+            if m not in self.last_side:
+                self.last_side[m] = None
+                print(f"[engine] following {m}")
+        return mints
+
+    def _fetch(self, mint):
+        try:
+            pair, candles = self.cache.get(mint)
+            if pair:
+                self.symbols[mint] = (pair.get("baseToken") or {}).get("symbol", "?")
+            return mint, candles
+        except Exception as e:
+            print(f"[engine] fetch error {mint}: {e!r}")
+            return mint, []
+
+    def cycle(self):
+        mints = self._sync()
+        if not mints:
+            return 0
+        candles = {m: c for m, c in self.pool.map(self._fetch, mints) if c}
+        now = int(time.time())
+        store.overview_prices([(m, now, c[-1]["close"]) for m, c in candles.items()])
+        decisions = decide_batch(candles)
+        ts = dt.datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
+        rows = []
+        for mint, d in decisions.items():
+            if not d:
+                continue
+            side, conf = d
+            if side == self.last_side.get(mint):
+                continue
+            px = candles[mint][-1]["close"]
+            rows.append((mint, ts, side, float(px), float(conf) if conf is not None else None))
+            self.last_side[mint] = side
+            print(f"[AI] {self.symbols.get(mint, '?')} {side} @ {px:.6f} (conf={conf:.2f})")
+        if rows:
+            store.insert_ai_trades(rows)
+            self._notify_chart([r[0] for r in rows])
+        return len(rows)
+
+    def _notify_chart(self, mints):
+        # wake the chart server's SSE streams; they also poll, so failures are harmless
+        try:
+            self.http.post(f"{CHART_BASE_URL}/api/notify", json={"mints": mints}, timeout=1)
+        except Exception:
+            pass
+
+    def run_forever(self):
+        print(f"[engine] up (pid={os.getpid()}, cycle={self.cycle_sec}s)")
+        while True:
+            t0 = time.time()
+            try:
+                store.heartbeat(ENGINE_NAME, os.getpid())
+                self.cycle()
+            except Exception as e:
+                print("[engine] error:", repr(e))
+            time.sleep(max(0.0, self.cycle_sec - (time.time() - t0)))
+
+
+def alive(max_age=3*CYCLE_SEC):
+    ts = store.last_heartbeat(ENGINE_NAME)
+    return ts is not None and time.time() - ts < max_age
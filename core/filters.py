@@ -1,5 +1,19 @@
+import numpy as np
+
+from . import config as CFG
 from .config import MIN_LIQ_USD, MIN_MCAP_USD, MAX_AGE_MIN
 
+# tunable thresholds, keyed by their .env names (scripts/optimize_thresholds.py sweeps these)
+THRESHOLD_KEYS = ("MIN_LIQ_USD", "MIN_MCAP_USD", "FDV_LIQ_MAX", "MAX_AGE_MIN", "MIN_SCORE",
+                  "FRESH_GRACE_MIN", "FRESH_LIQ_FACTOR", "SUPER_FRESH_MIN", "SUPER_FRESH_FACTOR")
+
+
+def thresholds(**overrides):
+    """Current config thresholds as a dict, with optional overrides."""
+    th = {k: float(getattr(CFG, k)) for k in THRESHOLD_KEYS}
+    th.update(overrides)
+    return th
+
 
 def hard_filters(m):
     reasons = []
@@ -15,3 +29,38 @@ def hard_filters(m):
     if liq > 0 and mc > 0 and (mc/liq) > 80:
         reasons.append(f"FDV/Liq {mc/liq:.1f} too high")
     return (len(reasons) > 0, reasons)
+
+
+def effective_thresholds(age_min, th=None):
+    """
+    (min_liq, min_mcap) for a launch age: super-fresh/fresh launches get a liquidity
+    discount and no mcap floor. Works on floats and on numpy arrays of ages.
+    """
+    th = th or thresholds()
+    age = np.asarray(age_min, dtype=float)
+    super_fresh = age <= th["SUPER_FRESH_MIN"]
+    fresh = ~super_fresh & (age <= th["FRESH_GRACE_MIN"])
+    factor = np.where(super_fresh, th["SUPER_FRESH_FACTOR"], np.where(fresh, th["FRESH_LIQ_FACTOR"], 1.0))
+    liq = th["MIN_LIQ_USD"] * factor
+    mc = np.where(super_fresh | fresh, 0.0, th["MIN_MCAP_USD"])
+    if liq.ndim == 0:
+        return float(liq), float(mc)
+    return liq, mc
+
+
+def filter_checks(liq, mc, age_min, th=None):
+    """(liq_fail, mcap_fail, fdv_fail) masks; arrays in, arrays out (same as passes_filters)."""
+    th = th or thresholds()
+    liq = np.asarray(liq, dtype=float)
+    mc = np.asarray(mc, dtype=float)
+    min_liq, min_mc = effective_thresholds(age_min, th)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = np.where((mc > 0) & (liq > 0), mc / liq, 0.0)
+    return liq < min_liq, (mc > 0) & (mc < min_mc), ratio > th["FDV_LIQ_MAX"]
+
+
+def passes_filters(mk: dict, age_min: float, th=None):
+    """Liquidity/mcap/FDV gates with the fresh-launch discounts. returns: (ok, reasons)"""
+    checks = filter_checks(float(mk["liq_usd"] or 0.0), float(mk["mcap_usd"] or 0.0), age_min, th)
+    reasons = [name for name, bad in zip(("liq", "mcap", "fdv/liq"), checks) if bool(bad)]
+    return (len(reasons) == 0), reasons
@@ -22,3 +22,9 @@ def get_recent_signatures(limit=60, before=None):
     if before:
         params[1]["before"] = before
     return _post({"jsonrpc": "2.0", "id": 1, "method": "getSignaturesForAddress", "params": params})
+
+
+def get_tx(signature):
+    """Full parsed transaction (None if the node doesn't have it yet)."""
+    return _post({"jsonrpc": "2.0", "id": 1, "method": "getTransaction",
+                  "params": [signature, {"encoding": "jsonParsed", "maxSupportedTransactionVersion": 0}]})
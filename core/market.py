@@ -3,6 +3,8 @@ import requests
 from datetime import datetime, timezone
 
 DEX_TOKEN = "https://api.dexscreener.com/latest/dex/tokens/{mint}"
+BULK_MAX = 30   # DexScreener accepts up to 30 comma-separated token addresses
+_session = requests.Session()
 
 
 def _to_float(v) -> float:
@@ -50,3 +52,24 @@ def fetch_market(mint: str):
         "pair_url": url,
         "age_min": age_min
     }
+
+
+def fetch_pairs_bulk(mints, timeout=20):
+    """
+    Most-liquid pair per mint, {mint: pair}, using one request per 30 mints.
+    Mints without any pair are left out.
+    """
+    out = {}
+    mints = list(dict.fromkeys(m for m in mints if m))
+    for i in range(0, len(mints), BULK_MAX):
+        chunk = mints[i:i+BULK_MAX]
+        r = _session.get(DEX_TOKEN.format(mint=",".join(chunk)), timeout=timeout)
+        r.raise_for_status()
+        wanted = set(chunk)
+        for p in (r.json().get("pairs") or []):
+            mint = (p.get("baseToken") or {}).get("address")
+            if mint not in wanted:
+                continue
+            if mint not in out or _liq_usd(p) > _liq_usd(out[mint]):
+                out[mint] = p
+    return out
@@ -1,32 +1,218 @@
 # core/model.py
-import pickle
+import hashlib
 import os
+import pickle
+import re
+import threading
+import time
 
-_model = None
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# MODEL_PATH may be a single pickle or a directory of versioned "model-<version>.pkl" files
+MODEL_PATH = os.getenv("MODEL_PATH") or os.path.join(_ROOT, "models")
+MODEL_SHADOW_PATH = os.getenv("MODEL_SHADOW_PATH", "").strip()
+MODEL_CHECK_SEC = float(os.getenv("MODEL_CHECK_SEC", "5"))
+SHADOW_SAMPLE_SEC = float(os.getenv("MODEL_SHADOW_SAMPLE_SEC", "60"))   # log shadow rows at most this often
+SHADOW_KEEP_DAYS = float(os.getenv("MODEL_SHADOW_KEEP_DAYS", "7"))
+SHADOW_PRUNE_SEC = 3600
+N_FEATS = 30
 
+_VERSIONED = re.compile(r"^model-(.+)\.pkl$")
+_feat_cache = {}   # mint -> ((last candle time, last close), feature row)
 
-def _load():
-    global _model
-    if _model is None and os.path.exists("model.pkl"):
-        with open("model.pkl", "rb") as f:
-            _model = pickle.load(f)
-    return _model
 
+def _natural(s):
+    return [int(t) if t.isdigit() else t for t in re.split(r"(\d+)", s)]
 
-def model_score_proba(closes_1d):
+
+def _resolve(path):
+    """Newest versioned pickle if path is a directory, else the file itself (None if missing)."""
+    if os.path.isdir(path):
+        names = [n for n in os.listdir(path) if _VERSIONED.match(n)]
+        if not names:
+            return None
+        return os.path.join(path, max(names, key=_natural))
+    return path if os.path.isfile(path) else None
+
+
+def _version_of(path, digest):
+    m = _VERSIONED.match(os.path.basename(path))
+    return m.group(1) if m else digest[:12]
+
+
+def _stamp(f):
+    # the sidecar is part of the stamp: fixing only the checksum must trigger a reload too
+    st = os.stat(f)
+    try:
+        side = os.stat(f + ".sha256").st_mtime_ns
+    except FileNotFoundError:
+        side = None
+    return (f, st.st_mtime_ns, st.st_size, side)
+
+
+class _Slot:
     """
-    closes_1d: numpy array or list of recent close prices
-    returns: float probability (0..1) or None if no model
+    One lazily loaded model that is swapped in place when its file changes.
+    The pickle is read once into memory, checked against an optional "<file>.sha256"
+    sidecar, unpickled, and only then published, so readers never see a half-written model.
     """
-    m = _load()
-    if m is None:
+
+    def __init__(self, *paths):
+        self.paths = [p for p in paths if p]
+        self.model = None
+        self.version = None
+        self.sha256 = None
+        self._stamp = None      # (path, mtime_ns, size, sidecar mtime_ns) of the loaded file
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    def _current_file(self):
+        for p in self.paths:
+            f = _resolve(p)
+            if f:
+                return f
         return None
+
+    def get(self):
+        now = time.time()
+        if self.model is not None and now - self._checked < MODEL_CHECK_SEC:
+            return self.model
+        with self._lock:
+            if self.model is not None and now - self._checked < MODEL_CHECK_SEC:
+                return self.model
+            self._checked = now
+            f = self._current_file()
+            if f is None:
+                return self.model
+            try:
+                stamp = _stamp(f)
+                if stamp != self._stamp:
+                    self._swap(f, stamp)
+            except FileNotFoundError:
+                pass   # file replaced mid-check; keep the current model, look again next time
+        return self.model
+
+    def _swap(self, f, stamp):
+        with open(f, "rb") as fh:
+            data = fh.read()
+        digest = hashlib.sha256(data).hexdigest()
+        side = f + ".sha256"
+        if os.path.exists(side):
+            with open(side, encoding="utf-8") as fh:
+                want = (fh.read().split() or [""])[0].lower()
+            if want != digest:
+                # keep serving the old model; retry once the file changes again
+                print(f"[Model] WARN: checksum mismatch for {f}, keeping {self.version}")
+                self._stamp = stamp
+                return
+        try:
+            model = pickle.loads(data)
+        except Exception as e:
+            print(f"[Model] WARN: could not load {f}: {e!r}")
+            self._stamp = stamp
+            return
+        old = self.version
+        self.model, self.version, self.sha256, self._stamp = model, _version_of(f, digest), digest, stamp
+        if old is not None:
+            print(f"[Model] hot-swapped {old} -> {self.version}")
+
+
+# project models/ dir or MODEL_PATH first, then the old root/cwd model.pkl locations
+_live = _Slot(MODEL_PATH, os.path.join(_ROOT, "model.pkl"), "model.pkl")
+_shadow = _Slot(MODEL_SHADOW_PATH)
+
+
+def _load():
+    return _live.get()
+
+
+def model_version():
+    return _live.version if _live.get() is not None else None
+
+
+def features(closes_1d):
+    """Feature row for one mint: last 30 normalized close-to-close diffs (left-padded)."""
     import numpy as np
     x = np.array(closes_1d[-60:], dtype=float)  # last 60 closes
     # very simple feature: normalized differences; replace with your features later
     feats = (x[1:] - x[:-1]) / (x[:-1] + 1e-9)
-    feats = feats[-30:]  # last 30 diffs
-    if len(feats) < 30:
-        feats = np.pad(feats, (30-len(feats), 0))
-    proba = float(m.predict_proba([feats])[0][1])
-    return proba
+    feats = feats[-N_FEATS:]  # last 30 diffs
+    if len(feats) < N_FEATS:
+        feats = np.pad(feats, (N_FEATS-len(feats), 0))
+    return feats
+
+
+def features_for(mint: str, candles):
+    """
+    Cached feature row keyed by (mint, last candle time, last close): the last bar is
+    still forming, so its close moving must miss the cache too.
+    Only the newest row per mint is kept, so the cache stays as big as the set of followed mints.
+    """
+    if not candles:
+        return None
+    key = (candles[-1]["time"], candles[-1]["close"])
+    hit = _feat_cache.get(mint)
+    if hit is not None and hit[0] == key:
+        return hit[1]
+    feats = features([c["close"] for c in candles])
+    _feat_cache[mint] = (key, feats)
+    return feats
+
+
+def forget(mint: str):
+    _feat_cache.pop(mint, None)
+
+
+_shadow_last = [0.0, 0.0]   # last logged, last pruned
+
+
+def _log_shadow(X, live, mints):
+    sm = _shadow.get()
+    now = time.time()
+    if sm is None or now - _shadow_last[0] < SHADOW_SAMPLE_SEC:
+        return
+    _shadow_last[0] = now
+    try:
+        shadow = [float(p) for p in sm.predict_proba(X)[:, 1]]
+    except Exception as e:
+        print("[Model] shadow error:", repr(e))
+        return
+    from . import store
+    ts = int(now)
+    if now - _shadow_last[1] >= SHADOW_PRUNE_SEC:
+        _shadow_last[1] = now
+        store.prune_shadow_scores(ts - int(SHADOW_KEEP_DAYS*86400))
+    mints = mints or [None]*len(live)
+    store.insert_shadow_scores([
+        (ts, m, _live.version, lp, _shadow.version, sp)
+        for m, lp, sp in zip(mints, live, shadow)
+    ])
+    diff = sum(abs(a-b) for a, b in zip(live, shadow)) / len(live)
+    agree = sum((a >= 0.5) == (b >= 0.5) for a, b in zip(live, shadow)) / len(live)
+    print(f"[Model] shadow {_shadow.version} vs {_live.version}: n={len(live)} "
+          f"mean|d|={diff:.3f} agree={agree:.0%}")
+
+
+def score_batch(feature_rows, mints=None):
+    """
+    feature_rows: 2D array-like, one row per mint
+    mints: optional labels for the rows (used when logging shadow scores)
+    returns: list of probabilities (0..1), one per row, or None if no model
+    """
+    m = _load()
+    if m is None or len(feature_rows) == 0:
+        return None
+    import numpy as np
+    X = np.vstack(feature_rows)
+    out = [float(p) for p in m.predict_proba(X)[:, 1]]
+    if MODEL_SHADOW_PATH:
+        _log_shadow(X, out, mints)
+    return out
+
+
+def model_score_proba(closes_1d):
+    """
+    closes_1d: numpy array or list of recent close prices
+    returns: float probability (0..1) or None if no model
+    """
+    out = score_batch([features(closes_1d)])
+    return None if out is None else out[0]
@@ -1,13 +1,29 @@
 # core/notifier.py
+import atexit
 import json
+import queue
+import threading
+import time
+from collections import deque
 import requests
 from .config import DISCORD_WEBHOOK, DRY_RUN, CHART_BASE_URL
 
+MAX_EMBEDS = 10        # Discord limit per webhook message
+COALESCE_SEC = 1.0     # wait this long for more posts before sending a batch
+MAX_RETRIES = 5        # network/5xx attempts per batch
+MAX_RATE_LIMITED = 10  # 429 waits per batch before giving up
+MAX_BACKOFF_SEC = 30.0
 
-def post(market: dict, score: float, parts: dict):
-    """
-    Post the usual embed. ALWAYS add a Live chart link specific to this mint.
-    """
+_q = queue.Queue()
+_session = requests.Session()
+_worker = None
+_worker_lock = threading.Lock()
+_latencies = deque(maxlen=500)   # enqueue -> delivered seconds
+_not_before = [0.0]              # rate-limit bucket empty until this time
+_stats = {"queued": 0, "sent": 0, "batches": 0, "dropped": 0, "rate_limited": 0, "retries": 0}
+
+
+def _embed(market: dict, score: float, parts: dict):
     mint = (market.get("mint") or "").strip()
     sym = market.get("symbol") or "Token"
     pair_url = market.get("pair_url") or market.get("url") or ""
@@ -27,19 +43,141 @@ def post(market: dict, score: float, parts: dict):
              or parts.get("age") or "—", "inline": True},
         ],
     }
+    button = {"type": 2, "style": 5, "label": f"Live chart {sym}"[:80], "url": chart_link}
+    return embed, button
 
-    payload = {
-        "embeds": [embed],
-        "components": [
-            {"type": 1, "components": [
-                {"type": 2, "style": 5, "label": "Live chart", "url": chart_link}
-            ]}
-        ]
-    }
+
+def _payload(items):
+    embeds = [e for _, e, _ in items]
+    buttons = [b for _, _, b in items]
+    # up to 5 link buttons per action row
+    rows = [{"type": 1, "components": buttons[i:i+5]} for i in range(0, len(buttons), 5)]
+    return {"embeds": embeds, "components": rows}
+
+
+def post(market: dict, score: float, parts: dict):
+    """
+    Queue the usual embed. ALWAYS add a Live chart link specific to this mint.
+    Never blocks: a background worker batches posts and handles rate limits.
+    """
+    embed, button = _embed(market, score, parts)
 
     if DRY_RUN or not DISCORD_WEBHOOK:
+        payload = _payload([(time.time(), embed, button)])
         print("[DRY] Discord embed:", json.dumps(payload, indent=2)[:900])
         return
 
-    r = requests.post(DISCORD_WEBHOOK, json=payload, timeout=20)
-    r.raise_for_status()
+    _ensure_worker()
+    _stats["queued"] += 1
+    _q.put((time.time(), embed, button))
+
+
+def _ensure_worker():
+    global _worker
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(target=_run, name="discord-notifier", daemon=True)
+            _worker.start()
+
+
+def _take_batch():
+    """Block for one post, then gather whatever else arrives within COALESCE_SEC."""
+    items = [_q.get()]
+    deadline = time.time() + COALESCE_SEC
+    while len(items) < MAX_EMBEDS:
+        left = deadline - time.time()
+        if left <= 0:
+            break
+        try:
+            items.append(_q.get(timeout=left))
+        except queue.Empty:
+            break
+    return items
+
+
+def _wait_s(r, default=1.0):
+    try:
+        return float((r.json() or {}).get("retry_after"))
+    except Exception:
+        pass
+    for h in ("Retry-After", "X-RateLimit-Reset-After"):
+        try:
+            return float(r.headers[h])
+        except (KeyError, ValueError):
+            continue
+    return default
+
+
+def _deliver(items):
+    payload = _payload(items)
+    attempt = limited = 0
+    while True:
+        wait = _not_before[0] - time.time()
+        if wait > 0:
+            time.sleep(wait)
+        try:
+            r = _session.post(DISCORD_WEBHOOK, json=payload, timeout=20)
+        except requests.RequestException as e:
+            r, err = None, repr(e)
+        else:
+            err = f"HTTP {r.status_code}"
+            if r.status_code == 429 and limited < MAX_RATE_LIMITED:
+                limited += 1
+                _stats["rate_limited"] += 1
+                time.sleep(min(_wait_s(r), MAX_BACKOFF_SEC))
+                continue
+            if r.status_code < 400:
+                # bucket exhausted: hold the next batch instead of eating a 429
+                if r.headers.get("X-RateLimit-Remaining") == "0":
+                    _not_before[0] = time.time() + min(_wait_s(r, 0.0), MAX_BACKOFF_SEC)
+                return True
+            if r.status_code < 500:
+                # 4xx: bad payload/webhook (or still rate limited) — retrying won't help
+                print(f"[Discord] dropped {len(items)} embed(s): {err} {r.text[:200]}")
+                return False
+        attempt += 1
+        if attempt >= MAX_RETRIES:
+            print(f"[Discord] dropped {len(items)} embed(s) after {attempt} attempts: {err}")
+            return False
+        _stats["retries"] += 1
+        time.sleep(min(0.5 * 2 ** (attempt-1), MAX_BACKOFF_SEC))
+
+
+def _run():
+    while True:
+        items = _take_batch()
+        try:
+            ok = _deliver(items)
+        except Exception as e:
+            print("[Discord] worker error:", repr(e))
+            ok = False
+        now = time.time()
+        if ok:
+            _stats["sent"] += len(items)
+            _stats["batches"] += 1
+            _latencies.extend(now - t for t, _, _ in items)
+        else:
+            _stats["dropped"] += len(items)
+        for _ in items:
+            _q.task_done()
+
+
+def flush(timeout=10.0):
+    """Wait (up to timeout) until every queued post was delivered or dropped."""
+    deadline = time.time() + timeout
+    while _q.unfinished_tasks and time.time() < deadline:
+        time.sleep(0.05)
+    return _q.unfinished_tasks == 0
+
+
+def stats():
+    lat = sorted(_latencies)
+    out = dict(_stats, pending=_q.unfinished_tasks)
+    if lat:
+        out["latency_p50"] = round(lat[len(lat)//2], 3)
+        out["latency_p95"] = round(lat[min(len(lat)-1, int(len(lat)*0.95))], 3)
+    return out
+
+
+# short-lived scripts (scan_recent, test_mint) still get their posts out
+atexit.register(flush, 5.0)
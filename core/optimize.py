@@ -0,0 +1,146 @@
+# core/optimize.py — walk-forward sweep of the filter/score thresholds over stored outcomes
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from . import store, filters, scoring
+from .backtest import expand_grid
+
+DEFAULT_GRID = {
+    "MIN_LIQ_USD": [10000, 15000, 20000, 30000],
+    "FDV_LIQ_MAX": [40, 60, 80, 120],
+    "FRESH_LIQ_FACTOR": [0.5, 0.7, 1.0],
+    "SUPER_FRESH_FACTOR": [0.3, 0.5, 0.7],
+    "SUPER_FRESH_MIN": [0.5, 1, 2],
+    "MIN_SCORE": [60, 65, 70, 75, 80, 85],
+}
+
+_DATA = None   # columnar arrays, set once per worker process
+
+
+def load(horizon="60m", hours_back=None):
+    """
+    Every signal with a frozen outcome at `horizon`, as columnar arrays sorted by time.
+    Only signals that passed the live filters were ever stored, so the sweep can
+    tighten thresholds but says little about loosening them.
+    """
+    q = """SELECT s.ts, s.liq_usd, s.fdv_usd, s.age_min, o.ret_pct
+           FROM signals s JOIN outcomes o ON o.signal_id=s.id
+           WHERE o.horizon=? AND o.frozen=1"""
+    args = [horizon]
+    if hours_back:
+        q += " AND s.ts >= ?"
+        args.append(int(time.time()) - int(hours_back*3600))
+    rows = store.conn().execute(q + " ORDER BY s.ts", args).fetchall()
+    arr = np.array([tuple(np.nan if v is None else v for v in r) for r in rows], dtype=float).reshape(-1, 5)
+    return {"ts": arr[:, 0].astype(np.int64), "liq": np.nan_to_num(arr[:, 1]),
+            "mc": np.nan_to_num(arr[:, 2]), "age": arr[:, 3], "ret": arr[:, 4]}
+
+
+def selected(data, th, score=None):
+    """Mask of signals the production filters + score gate would keep under thresholds th."""
+    age = data["age"]
+    age_f = np.where(np.isnan(age), np.inf, age)   # unknown age: no fresh discount
+    bad_liq, bad_mc, bad_fdv = filters.filter_checks(data["liq"], data["mc"], age_f, th)
+    if score is None:
+        score = scoring.score_arrays(data["liq"], data["mc"], age, th["MAX_AGE_MIN"])
+    keep = ~(bad_liq | bad_mc | bad_fdv) & (score >= th["MIN_SCORE"])
+    return keep & ~(age > th["MAX_AGE_MIN"])
+
+
+def _init_worker(data, folds):
+    global _DATA
+    _DATA = (data, folds)
+
+
+def _eval_chunk(configs):
+    """Per config and fold: (n, wins, sum_ret). Scores are cached per MAX_AGE_MIN."""
+    data, folds = _DATA
+    out = np.zeros((len(configs), len(folds), 3))
+    scores = {}
+    for i, th in enumerate(configs):
+        sc = scores.get(th["MAX_AGE_MIN"])
+        if sc is None:
+            sc = scores[th["MAX_AGE_MIN"]] = scoring.score_arrays(
+                data["liq"], data["mc"], data["age"], th["MAX_AGE_MIN"])
+        keep = selected(data, th, sc)
+        for f, (lo, hi) in enumerate(folds):
+            r = data["ret"][lo:hi][keep[lo:hi]]
+            out[i, f] = (len(r), (r > 0).sum(), r.sum())
+    return out
+
+
+def _folds(n, k):
+    edges = np.linspace(0, n, k + 1).astype(int)
+    return list(zip(edges[:-1], edges[1:]))
+
+
+def _objective(n, total, min_n):
+    return np.where(n >= min_n, total, -np.inf)
+
+
+def run(grid=None, horizon="60m", hours_back=None, folds=5, min_n=10, workers=None):
+    """
+    Evaluate every config on every time fold, then walk forward: for fold k pick the
+    config with the best total return on folds < k and score it on fold k.
+    returns: (ranked configs on all data, walk-forward steps)
+    """
+    data = load(horizon, hours_back)
+    n = len(data["ts"])
+    if n < folds * 2:
+        raise ValueError(f"only {n} signals with a frozen {horizon} outcome")
+    base = filters.thresholds()
+    configs = [dict(base, **c) for c in expand_grid(grid or DEFAULT_GRID)]
+    fl = _folds(n, folds)
+    t0 = time.time()
+
+    workers = workers or os.cpu_count() or 1
+    chunk = max(1, len(configs) // (workers * 4))
+    chunks = [configs[i:i+chunk] for i in range(0, len(configs), chunk)]
+    if workers > 1 and len(chunks) > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(data, fl)) as ex:
+            res = np.concatenate(list(ex.map(_eval_chunk, chunks)))
+    else:
+        _init_worker(data, fl)
+        res = np.concatenate([_eval_chunk(c) for c in chunks])
+
+    steps = []
+    for k in range(1, folds):
+        train = res[:, :k].sum(axis=1)
+        obj = _objective(train[:, 0], train[:, 2], min_n)
+        best = int(np.argmax(obj))
+        if not np.isfinite(obj[best]):
+            continue
+        tn, tw, ts_ = res[best, k]
+        steps.append({"fold": k, "config": configs[best], "train_n": int(train[best, 0]),
+                      "train_sum_pct": float(train[best, 2]), "test_n": int(tn),
+                      "test_win_rate": float(tw / tn) if tn else None, "test_sum_pct": float(ts_)})
+
+    total = res.sum(axis=1)
+    obj = _objective(total[:, 0], total[:, 2], min_n)
+    ranked = []
+    for i in np.argsort(-obj):
+        if not np.isfinite(obj[i]):
+            break
+        tn, tw, ts_ = total[i]
+        oos = res[i, 1:, 2]   # folds after the first: how stable the config is over time
+        ranked.append({"config": configs[i], "n": int(tn), "win_rate": float(tw / tn),
+                       "avg_pct": float(ts_ / tn), "sum_pct": float(ts_),
+                       "worst_fold_pct": float(oos.min()) if len(oos) else None})
+    print(f"[Opt] signals={n} configs={len(configs)} folds={folds} in {time.time()-t0:.1f}s")
+    return ranked, steps
+
+
+def env_fragment(cfg, stats=None):
+    """.env lines for one config (only the threshold keys)."""
+    lines = []
+    if stats:
+        lines.append("# " + " ".join(f"{k}={v:.4g}" if isinstance(v, float) else f"{k}={v}"
+                                     for k, v in stats.items()))
+    for k in filters.THRESHOLD_KEYS:
+        v = cfg[k]
+        lines.append(f"{k}={int(v) if float(v).is_integer() else v}")
+    return "\n".join(lines) + "\n"
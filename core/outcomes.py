@@ -0,0 +1,231 @@
+# core/outcomes.py — fire each outcome horizon once, at its due time
+import heapq
+import time
+
+import numpy as np
+
+from . import store, ticker  # noqa: F401  (ticker creates the ticks table)
+from .market import fetch_pairs_bulk, _to_float
+
+HORIZONS = {"5m": 5*60, "15m": 15*60, "60m": 60*60}
+MAX_LATE_SEC = 10*60     # past this, a live price is no longer "the" horizon price
+RETRY_SEC = 30           # mint had no price this round: try again shortly
+RELOAD_SEC = 30          # pick up signals recorded by other processes
+COVER_SEC = 120          # a horizon counts as covered by ticks if the last one is this close to its end
+
+
+def load_ticks(mint, lo, hi):
+    """(ts, price) arrays for one mint, sorted, zero/null prices dropped."""
+    rows = store.conn().execute(
+        "SELECT ts, price_usd FROM ticks WHERE mint=? AND ts BETWEEN ? AND ? AND price_usd > 0 ORDER BY ts",
+        (mint, lo, hi)).fetchall()
+    if not rows:
+        return np.zeros(0, dtype=np.int64), np.zeros(0)
+    arr = np.array([(r[0], r[1]) for r in rows], dtype=float)
+    return arr[:, 0].astype(np.int64), arr[:, 1]
+
+
+def path_metrics(t0s, p0s, ts, px, horizon_sec, cover=COVER_SEC):
+    """
+    Outcome paths for many signals of one mint over its tick array, in one pass.
+    t0s/p0s: signal times and prices (p0 <= 0 falls back to the first tick in the window)
+    returns: dict of arrays, one entry per signal (NaN where ticks don't cover the horizon):
+      price, ret_pct (at t0+horizon), mfe_pct/mae_pct (max favourable/adverse move),
+      peak_sec (seconds from t0 to the high), n_ticks
+    """
+    t0s = np.asarray(t0s, dtype=np.int64)
+    p0s = np.asarray(p0s, dtype=float)
+    n = len(t0s)
+    out = {k: np.full(n, np.nan) for k in ("price", "ret_pct", "mfe_pct", "mae_pct", "peak_sec")}
+    out["n_ticks"] = np.zeros(n, dtype=np.int64)
+    starts = np.searchsorted(ts, t0s, side="left")
+    ends = np.searchsorted(ts, t0s + horizon_sec, side="right")
+    ok = (ends > starts)
+    ok[ok] &= ts[ends[ok]-1] >= t0s[ok] + horizon_sec - cover
+    if not ok.any():
+        return out
+    s, e = starts[ok], ends[ok]
+    lens = e - s
+    # flatten every window into one array: window w covers vals[off[w]:off[w]+lens[w]]
+    off = np.r_[0, np.cumsum(lens)[:-1]]
+    idx = np.repeat(s - off, lens) + np.arange(lens.sum())
+    vals = px[idx]
+    hi = np.maximum.reduceat(vals, off)
+    lo = np.minimum.reduceat(vals, off)
+    # first tick in each window that touches the high
+    win = np.repeat(np.arange(len(s)), lens)
+    at_peak = np.flatnonzero(vals == hi[win])
+    _, first = np.unique(win[at_peak], return_index=True)
+    peak_ts = ts[idx[at_peak[first]]]
+    p0 = np.where(p0s[ok] > 0, p0s[ok], px[s])
+    last = px[e-1]
+    out["price"][ok] = last
+    out["ret_pct"][ok] = (last / p0 - 1) * 100
+    out["mfe_pct"][ok] = (hi / p0 - 1) * 100
+    out["mae_pct"][ok] = (lo / p0 - 1) * 100
+    out["peak_sec"][ok] = peak_ts - t0s[ok]
+    out["n_ticks"][ok] = lens
+    return out
+
+
+def metrics_for_mint(mint, sigs, horizons=HORIZONS):
+    """
+    sigs: [(signal_id, t0, p0)] of one mint
+    returns: {(signal_id, horizon): (price, ret, mfe, mae, peak_sec, n_ticks)} for covered horizons
+    """
+    if not sigs:
+        return {}
+    t0s = [t for _, t, _ in sigs]
+    ts, px = load_ticks(mint, min(t0s), max(t0s) + max(horizons.values()))
+    if len(ts) == 0:
+        return {}
+    p0s = [p or 0.0 for _, _, p in sigs]
+    out = {}
+    for h, sec in horizons.items():
+        m = path_metrics(t0s, p0s, ts, px, sec)
+        for i, (sid, _, _) in enumerate(sigs):
+            if m["n_ticks"][i]:
+                out[(sid, h)] = (float(m["price"][i]), float(m["ret_pct"][i]), float(m["mfe_pct"][i]),
+                                 float(m["mae_pct"][i]), int(m["peak_sec"][i]), int(m["n_ticks"][i]))
+    return out
+
+
+def backfill(hours_back=None):
+    """
+    Path metrics for historical signals from stored ticks only (no network).
+    Unfrozen horizons that are past due get frozen from ticks; horizons frozen from a
+    live price keep their return and just gain MFE/MAE/time-to-peak.
+    """
+    now = int(time.time())
+    cutoff = 0 if not hours_back else now - int(hours_back*3600)
+    store.seed_recent_outcomes((now - cutoff) // 3600 + 1, HORIZONS)
+    by_mint = {}
+    for r in store.signals_missing_paths(cutoff):
+        by_mint.setdefault(r["mint"], []).append((r["id"], r["ts"], r["price_usd"]))
+    frozen = {(r[0], r[1]) for r in store.conn().execute(
+        "SELECT signal_id, horizon FROM outcomes WHERE frozen=1 AND mfe_pct IS NULL")}
+    freeze, fill = [], []
+    for mint, sigs in by_mint.items():
+        t0 = {sid: t for sid, t, _ in sigs}
+        for (sid, h), (p, ret, mfe, mae, pk, n) in metrics_for_mint(mint, sigs).items():
+            if t0[sid] + HORIZONS[h] > now:
+                continue   # not due yet; the scheduler fires it
+            if (sid, h) in frozen:
+                fill.append((sid, h, mfe, mae, pk, n))
+            else:
+                freeze.append((sid, h, p, ret, now, mfe, mae, pk, n, "ticks"))
+    store.freeze_outcomes(freeze)
+    store.fill_path_metrics(fill)
+    print(f"[Outcomes] backfill: mints={len(by_mint)} frozen={len(freeze)} filled={len(fill)}")
+    return len(freeze), len(fill)
+
+
+class OutcomeScheduler:
+    """
+    Heap of (due_ts, signal_id, horizon, mint, t0_price). Each pass pops what is due,
+    computes the outcome from stored ticks where they cover the horizon, prices the
+    remaining mints with one bulk DexScreener lookup and freezes the rows, so a
+    horizon is written exactly once instead of being overwritten on every rescan.
+    Ticks make late firing harmless; a live price more than MAX_LATE_SEC after the
+    due time is not used (counted as missed, left for backfill()).
+    """
+
+    def __init__(self, max_late=MAX_LATE_SEC):
+        self.max_late = max_late
+        self._heap = []
+        self._known = set()    # (signal_id, horizon) already queued
+        self.stats = {"fired": 0, "from_ticks": 0, "lookups": 0, "retried": 0, "missed": 0}
+
+    def __len__(self):
+        return len(self._heap)
+
+    def _push(self, due, sid, horizon, mint, p0):
+        if (sid, horizon) in self._known:
+            return
+        self._known.add((sid, horizon))
+        heapq.heappush(self._heap, (due, sid, horizon, mint, p0))
+
+    def add_signal(self, signal_id, mint, t0_price, ts):
+        for h, sec in HORIZONS.items():
+            self._push(ts + sec, signal_id, h, mint, t0_price)
+
+    def load(self, hours_back=None):
+        """Queue unfrozen rows still within reach (seeding due times for old signals first)."""
+        if hours_back:
+            store.seed_recent_outcomes(hours_back, HORIZONS)
+        n = len(self._heap)
+        for sid, h, p0, due, mint, _ts in store.pending_outcomes(int(time.time()) - self.max_late):
+            self._push(due, sid, h, mint, p0)
+        return len(self._heap) - n
+
+    def next_due(self):
+        return self._heap[0][0] if self._heap else None
+
+    def fire_due(self, now=None):
+        now = int(time.time() if now is None else now)
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            e = heapq.heappop(self._heap)
+            self._known.discard((e[1], e[2]))
+            due.append(e)
+        if not due:
+            return 0
+        rows, live = [], []
+        by_mint = {}
+        for e in due:
+            by_mint.setdefault(e[3], []).append(e)
+        for mint, es in by_mint.items():
+            got = metrics_for_mint(mint, [(sid, d - HORIZONS[h], p0) for d, sid, h, _, p0 in es],
+                                   {h: HORIZONS[h] for _, _, h, _, _ in es})
+            for e in es:
+                m = got.get((e[1], e[2]))
+                if m is None and now - e[0] > self.max_late:
+                    self.stats["missed"] += 1
+                elif m is None:
+                    live.append(e)
+                else:
+                    rows.append((e[1], e[2], m[0], m[1], now) + m[2:] + ("ticks",))
+        self.stats["from_ticks"] += len(rows)
+        if live:
+            rows += self._fire_live(live, now)
+        if rows:
+            store.freeze_outcomes(rows)
+            self.stats["fired"] += len(rows)
+        return len(rows)
+
+    def _fire_live(self, due, now):
+        """Mints without tick coverage: one bulk price lookup, no path metrics."""
+        try:
+            pairs = fetch_pairs_bulk([e[3] for e in due])
+            self.stats["lookups"] += 1
+        except Exception as e:
+            print("[Outcomes] lookup error:", repr(e))
+            pairs = {}
+        rows = []
+        for d, sid, h, mint, p0 in due:
+            px = _to_float((pairs.get(mint) or {}).get("priceUsd"))
+            if px <= 0:
+                self.stats["retried"] += 1
+                self._push(min(now + RETRY_SEC, d + self.max_late), sid, h, mint, p0)
+                continue
+            ret = 0.0 if not p0 else (px - p0) / p0 * 100.0
+            rows.append((sid, h, px, ret, now, None, None, None, None, "live"))
+        return rows
+
+    def run_forever(self, hours_back=2):
+        self.load(hours_back)
+        print(f"[Outcomes] scheduler up, {len(self)} pending")
+        reload_at = time.time() + RELOAD_SEC
+        while True:
+            try:
+                if time.time() >= reload_at:
+                    self.load()
+                    reload_at = time.time() + RELOAD_SEC
+                n = self.fire_due()
+                if n:
+                    print(f"[Outcomes] froze {n}, pending={len(self)} stats={self.stats}")
+            except Exception as e:
+                print("[Outcomes] error:", repr(e))
+            nxt = self.next_due()
+            wait = reload_at - time.time() if nxt is None else min(nxt - time.time(), reload_at - time.time())
+            time.sleep(min(RELOAD_SEC, max(0.5, wait)))
@@ -0,0 +1,86 @@
+# core/paper.py — paper trading across many followed mints at once
+import time
+from . import store
+from .strategy import TickState, should_enter, should_exit
+
+
+class Position:
+    __slots__ = ("mint", "symbol", "signal_id", "state", "entry", "entry_ts", "until")
+
+    def __init__(self, mint, symbol, signal_id, until):
+        self.mint = mint
+        self.symbol = symbol
+        self.signal_id = signal_id
+        self.state = TickState()
+        self.entry = None      # None while flat / waiting for an entry
+        self.entry_ts = None
+        self.until = until     # stop following (and flatten) after this time
+
+
+class PaperBook:
+    """
+    Every followed mint keeps an incremental TickState; on_tick() is O(1) per mint,
+    prices come from the caller (see ticker.track_many) rather than the ticks table,
+    and fills are written to the store in one batch per flush().
+    """
+
+    def __init__(self, follow_sec=600, dd_stop=0.03, take_profit=0.25, trail=0.10):
+        self.follow_sec = follow_sec
+        self.exit_args = {"dd_stop": dd_stop, "take_profit": take_profit, "trail": trail}
+        self.positions = {}    # mint -> Position
+        self._fills = []
+        self.closed_pnl = []
+
+    def watch(self, mint, symbol=None, signal_id=None, now=None):
+        if mint in self.positions:
+            return
+        now = time.time() if now is None else now
+        self.positions[mint] = Position(mint, symbol or "?", signal_id, now + self.follow_sec)
+
+    def mints(self):
+        return list(self.positions)
+
+    def open_count(self):
+        return sum(1 for p in self.positions.values() if p.entry is not None)
+
+    def _fill(self, pos, side, price, ts, reason, pnl=None):
+        self._fills.append((pos.signal_id, pos.mint, int(ts), side, float(price), pnl, reason))
+        tag = "BUY " if side == "B" else "SELL"
+        tail = "" if pnl is None else f"  PnL={pnl:.1f}%"
+        print(f"[PAPER {tag}] {pos.symbol} at {price} ({reason}){tail}")
+
+    def _close(self, pos, price, ts, reason):
+        pnl = (price - pos.entry) / pos.entry * 100 if pos.entry else 0.0
+        self._fill(pos, "S", price, ts, reason, pnl)
+        self.closed_pnl.append(pnl)
+        pos.entry = None
+
+    def on_tick(self, mint, price, ts=None):
+        pos = self.positions.get(mint)
+        if pos is None or not price:
+            return
+        ts = time.time() if ts is None else ts
+        st = pos.state.update(price, ts)
+        if pos.entry is None:
+            ok, why = should_enter(st)
+            if ok:
+                pos.entry, pos.entry_ts = price, ts
+                st.reset_peak()
+                self._fill(pos, "B", price, ts, why)
+        else:
+            hit, why = should_exit(st, pos.entry, **self.exit_args)
+            if hit:
+                self._close(pos, price, ts, why)
+
+    def expire(self, now=None):
+        """Flatten and drop positions whose follow window is over."""
+        now = time.time() if now is None else now
+        for mint in [m for m, p in self.positions.items() if p.until <= now]:
+            pos = self.positions.pop(mint)
+            if pos.entry is not None and pos.state.last:
+                self._close(pos, pos.state.last, now, "timeout")
+
+    def flush(self):
+        if self._fills:
+            store.insert_paper_fills(self._fills)
+            self._fills = []
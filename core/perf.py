@@ -0,0 +1,47 @@
+# core/perf.py — signal performance report from the perf_rollup tables only
+from . import store
+
+
+def _median(hist, n):
+    """Median return from {bin: count}, interpolated inside the bin."""
+    half, cum = n / 2.0, 0
+    for b in sorted(hist):
+        c = hist[b]
+        if cum + c >= half:
+            return (b + (half - cum) / c) * store.RET_BIN_PCT
+        cum += c
+    return None
+
+
+def report(horizon="60m", by=("score", "age"), min_n=1):
+    """
+    Win rate, mean/median return and count per bucket, read from the rollups
+    (cost depends on the number of buckets, not on history size).
+    by: any of "score"/"age"; buckets of the other dimension are merged.
+    """
+    keep = [i for i, d in enumerate(("score", "age")) if d in by]
+    c = store.conn()
+    groups = {}
+    for sb, ab, n, wins, sum_ret in c.execute(
+            "SELECT score_bucket, age_bucket, n, wins, sum_ret FROM perf_rollup WHERE horizon=?", (horizon,)):
+        k = tuple((sb, ab)[i] for i in keep)
+        g = groups.setdefault(k, {"n": 0, "wins": 0, "sum_ret": 0.0, "hist": {}})
+        g["n"] += n
+        g["wins"] += wins
+        g["sum_ret"] += sum_ret
+    for sb, ab, b, n in c.execute(
+            "SELECT score_bucket, age_bucket, bin, n FROM perf_rollup_hist WHERE horizon=?", (horizon,)):
+        k = tuple((sb, ab)[i] for i in keep)
+        h = groups[k]["hist"]
+        h[b] = h.get(b, 0) + n
+    out = []
+    age_order = {name: i for i, (_, name) in enumerate(store.AGE_BUCKETS)}
+    for k, g in sorted(groups.items(), key=lambda kv: [age_order.get(x, 99) if isinstance(x, str) else x
+                                                       for x in kv[0]]):
+        if g["n"] < min_n:
+            continue
+        row = dict(zip([("score", "age")[i] for i in keep], k))
+        row.update(n=g["n"], win_rate=g["wins"] / g["n"], avg_pct=g["sum_ret"] / g["n"],
+                   median_pct=_median(g["hist"], g["n"]))
+        out.append(row)
+    return out
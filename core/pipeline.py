@@ -0,0 +1,153 @@
+# core/pipeline.py — stages joined by bounded queues, each with its own worker threads
+import itertools
+import queue
+import threading
+import time
+from collections import deque
+
+from . import store
+
+RATE_WINDOW_SEC = 60      # throughput is items finished over the last minute
+LATENCY_SAMPLES = 500
+
+
+def _pct(xs, q):
+    if not xs:
+        return None
+    xs = sorted(xs)
+    return round(xs[min(len(xs)-1, int(len(xs)*q))], 3)
+
+
+class Stage:
+    """
+    One step of the pipeline. fn(item) returns an iterable of outputs (empty to drop
+    the item); outputs go to the next stage's queue, blocking while it is full, so a
+    slow stage backs up into the ones before it instead of piling up memory.
+    priority: key(item), lowest dequeued first (default FIFO).
+    admit: checked when an item is dequeued; False sheds it without calling fn.
+    """
+
+    def __init__(self, name, fn, workers=1, maxsize=64, priority=None, admit=None):
+        self.name = name
+        self.fn = fn
+        self.workers = max(1, int(workers))
+        self.priority = priority
+        self.admit = admit
+        self.q = queue.PriorityQueue(maxsize=maxsize) if priority else queue.Queue(maxsize=maxsize)
+        self._seq = itertools.count()
+        self.next = None
+        self._lock = threading.Lock()
+        self._done_ts = deque()                      # finish times inside RATE_WINDOW_SEC
+        self._lat = deque(maxlen=LATENCY_SAMPLES)    # fn() seconds
+        self._wait = deque(maxlen=LATENCY_SAMPLES)   # seconds spent queued
+        self.stats = {"in": 0, "out": 0, "errors": 0, "shed": 0, "busy": 0, "blocked_sec": 0.0}
+
+    def put(self, item):
+        """Queue an item (blocks while the stage is full)."""
+        prio = self.priority(item) if self.priority else 0
+        self.q.put((prio, next(self._seq), time.time(), item))
+        with self._lock:
+            self.stats["in"] += 1
+
+    def room(self):
+        return max(0, self.q.maxsize - self.q.qsize()) if self.q.maxsize else None
+
+    def _emit(self, outs):
+        n = 0
+        for out in outs or ():
+            n += 1
+            if self.next is not None:
+                t0 = time.time()
+                self.next.put(out)
+                with self._lock:
+                    self.stats["blocked_sec"] += time.time() - t0
+        return n
+
+    def _work(self, stop):
+        while not stop.is_set():
+            try:
+                _, _, t_in, item = self.q.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            if self.admit is not None and not self.admit(item):
+                with self._lock:
+                    self.stats["shed"] += 1
+                self.q.task_done()
+                continue
+            t0 = time.time()
+            with self._lock:
+                self.stats["busy"] += 1
+                self._wait.append(t0 - t_in)
+            try:
+                outs = list(self.fn(item) or ())
+                err = False
+            except Exception as e:
+                print(f"[Pipe] {self.name} error:", repr(e))
+                outs, err = [], True
+            t1 = time.time()
+            with self._lock:
+                self.stats["busy"] -= 1
+                self.stats["errors"] += err
+                self._lat.append(t1 - t0)
+                self._done_ts.append(t1)
+            n = self._emit(outs)
+            with self._lock:
+                self.stats["out"] += n
+            self.q.task_done()
+
+    def start(self, stop):
+        for i in range(self.workers):
+            threading.Thread(target=self._work, args=(stop,), name=f"{self.name}-{i}", daemon=True).start()
+
+    def metrics(self, now=None):
+        now = time.time() if now is None else now
+        with self._lock:
+            while self._done_ts and now - self._done_ts[0] > RATE_WINDOW_SEC:
+                self._done_ts.popleft()
+            lat, wait = list(self._lat), list(self._wait)
+            out = dict(self.stats, workers=self.workers, depth=self.q.qsize(), maxsize=self.q.maxsize,
+                       per_sec=round(len(self._done_ts) / RATE_WINDOW_SEC, 3))
+        out["blocked_sec"] = round(out["blocked_sec"], 1)
+        out["lat_p50"], out["lat_p95"] = _pct(lat, 0.5), _pct(lat, 0.95)
+        out["wait_p50"], out["wait_p95"] = _pct(wait, 0.5), _pct(wait, 0.95)
+        return out
+
+
+class Pipeline:
+    """Stages in order; put() feeds the first one. Metrics per stage via metrics()/report()."""
+
+    def __init__(self, stages, stop=None):
+        self.stages = list(stages)
+        for a, b in zip(self.stages, self.stages[1:]):
+            a.next = b
+        self.stop = stop or threading.Event()
+
+    def __getitem__(self, name):
+        return next(s for s in self.stages if s.name == name)
+
+    def put(self, item):
+        self.stages[0].put(item)
+
+    def start(self):
+        for s in self.stages:
+            s.start(self.stop)
+        return self
+
+    def metrics(self):
+        now = time.time()
+        return {s.name: s.metrics(now) for s in self.stages}
+
+    def report(self, save=True):
+        """Log one line per stage and (optionally) export the snapshot to the stage_stats table."""
+        m = self.metrics()
+        log_metrics(m)
+        if save:
+            store.save_stage_stats(m)
+        return m
+
+
+def log_metrics(m):
+    for name, s in m.items():
+        print(f"[Pipe] {name:<8} depth={s['depth']}/{s['maxsize']} busy={s['busy']}/{s['workers']} "
+              f"{s['per_sec']}/s lat p50={s['lat_p50']} p95={s['lat_p95']} wait p50={s['wait_p50']} "
+              f"blocked={s['blocked_sec']}s shed={s['shed']} err={s['errors']}")
@@ -1,22 +1,38 @@
+import numpy as np
+
 from .config import MAX_AGE_MIN
 
 
+def score_parts(liq, mc, age, max_age_min=MAX_AGE_MIN):
+    """
+    Score components for floats or numpy arrays (age NaN = unknown).
+    returns: (liq_pts, mc_pts, age_pts, ratio_pts), unrounded
+    """
+    liq = np.asarray(liq, dtype=float)
+    mc = np.asarray(mc, dtype=float)
+    age = np.asarray(age, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        liq_pts = 40*np.minimum(liq/80000.0, 1.0)
+        mc_pts = np.where(mc == 0, 0.0,
+                          np.where(mc < 100_000, 5*(mc/100_000.0),
+                                   np.where(mc <= 2_500_000, 5+20*((mc-100_000)/2_400_000),
+                                            np.maximum(0.0, 25-((mc-2_500_000)/2_500_000)*10))))
+        age_pts = np.where(np.isnan(age), 10.0, np.maximum(0.0, 25*(1.0-(age/max_age_min))))
+        ratio = np.where((liq > 0) & (mc > 0), mc/liq, 9999)
+    ratio_pts = np.where(ratio < 20, 10.0, np.where(ratio < 40, 6.0, np.where(ratio < 60, 3.0, 0.0)))
+    return liq_pts, mc_pts, age_pts, ratio_pts
+
+
+def score_arrays(liq, mc, age, max_age_min=MAX_AGE_MIN):
+    """Vectorised score(): total per row, same rounding."""
+    return np.round(sum(score_parts(liq, mc, age, max_age_min)), 1)
+
+
 def score(m):
     liq = m["liq_usd"]
     mc = m["mcap_usd"] or 0
     age = m["age_min"]
-    liq_pts = 40*min(liq/80000.0, 1.0)
-    if mc == 0:
-        mc_pts = 0
-    elif mc < 100_000:
-        mc_pts = 5*(mc/100_000.0)
-    elif mc <= 2_500_000:
-        mc_pts = 5+20*((mc-100_000)/2_400_000)
-    else:
-        mc_pts = max(0.0, 25-((mc-2_500_000)/2_500_000)*10)
-    age_pts = 10 if age is None else max(0.0, 25*(1.0-(age/MAX_AGE_MIN)))
-    ratio = (mc/liq) if (liq > 0 and mc > 0) else 9999
-    ratio_pts = 10 if ratio < 20 else (
-        6 if ratio < 40 else (3 if ratio < 60 else 0))
+    parts = [float(p) for p in score_parts(liq, mc, np.nan if age is None else age)]
+    liq_pts, mc_pts, age_pts, ratio_pts = parts
     total = round(liq_pts+mc_pts+age_pts+ratio_pts, 1)
     return total, {"liq": round(liq_pts, 1), "mc": round(mc_pts, 1), "age": round(age_pts, 1), "ratio": round(ratio_pts, 1)}
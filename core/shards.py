@@ -0,0 +1,139 @@
+# core/shards.py — split candidates across runner processes (consistent hashing + sqlite leases)
+import bisect
+import hashlib
+import os
+import socket
+import threading
+import time
+
+from . import store
+from .candidates import QUOTE_MINTS
+
+VNODES = 64               # ring points per shard
+LEASE_TTL_SEC = 30
+RENEW_SEC = 10
+INBOX_KEEP_SEC = 600      # hand-offs older than this can't pass the age filter anyway
+
+
+def _h(key):
+    return int.from_bytes(hashlib.md5(str(key).encode()).digest()[:8], "big")
+
+
+class HashRing:
+    """Consistent hash ring: changing the shard count only moves ~1/n of the keys."""
+
+    def __init__(self, shards, vnodes=VNODES):
+        pts = sorted((_h(f"{s}#{v}"), s) for s in shards for v in range(vnodes))
+        self._keys = [p for p, _ in pts]
+        self._shards = [s for _, s in pts]
+
+    def shard(self, key):
+        i = bisect.bisect(self._keys, _h(key)) % len(self._keys)
+        return self._shards[i]
+
+
+def _worker_name(i):
+    return f"runner_shard_{i}"
+
+
+class ShardLeases:
+    """
+    The shards this worker currently owns. Worker i holds shard i while it keeps renewing
+    the lease and takes it straight back from a takeover holder when it (re)starts; once
+    worker i stops heartbeating and its lease expires, the first live worker to notice
+    takes the shard over, and releases it again when worker i heartbeats.
+    others: shards whose lease another worker renewed recently. Anything else (owned,
+    or nobody is renewing it right now) this worker fetches itself rather than drop.
+    """
+
+    def __init__(self, n_shards, worker, ttl=LEASE_TTL_SEC):
+        self.n = n_shards
+        self.worker = worker
+        self.ttl = ttl
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{worker}"
+        self.ring = HashRing(range(n_shards))
+        self.owned = frozenset()
+        self.others = frozenset()
+
+    def shard(self, key):
+        return self.ring.shard(key)
+
+    def owns(self, key):
+        return self.ring.shard(key) in self.owned
+
+    def covered_elsewhere(self, key):
+        return self.ring.shard(key) in self.others
+
+    def refresh(self):
+        """Renew / take over / hand back leases. returns: the owned shard set"""
+        store.heartbeat(_worker_name(self.worker), os.getpid())
+        now = time.time()
+        owned = set()
+        for s in range(self.n):
+            home = s == self.worker
+            if not home:
+                hb = store.last_heartbeat(_worker_name(s))
+                if hb is not None and now - hb < self.ttl:   # its own worker is alive
+                    if s in self.owned:
+                        store.release_shard(s, self.owner)
+                        print(f"[Shard] w{self.worker} handing shard {s} back")
+                    continue
+            if store.claim_shard(s, self.owner, self.ttl, home=home):
+                owned.add(s)
+        for s in owned - self.owned:
+            print(f"[Shard] w{self.worker} took shard {s}" + ("" if s == self.worker else " (takeover)"))
+        for s in self.owned - owned:
+            print(f"[Shard] w{self.worker} lost shard {s}")
+        self.owned = frozenset(owned)
+        # a lease renewed within the last ~1.5 rounds has a live holder
+        fresh = now + self.ttl - 1.5*RENEW_SEC
+        self.others = frozenset(s for s, (o, exp) in store.shard_leases().items()
+                                if o != self.owner and exp >= fresh) - self.owned
+        return self.owned
+
+    def run(self, stop):
+        while not stop.is_set():
+            try:
+                self.refresh()
+                store.prune_candidates(time.time() - INBOX_KEEP_SEC)
+            except Exception as e:
+                print(f"[Shard] w{self.worker} lease error:", repr(e))
+            stop.wait(RENEW_SEC)
+
+
+class ShardRouter:
+    """
+    Stands in for the CandidateBus on the discovery side: mints this worker owns go to
+    its bus, every other find is handed off through candidate_inbox (it waits there if
+    the shard has no owner right now), and pump() pulls this worker's hand-offs back in.
+    """
+
+    def __init__(self, bus, leases):
+        self.bus = bus
+        self.leases = leases
+        self.stats = {"local": 0, "handed_off": 0, "received": 0}
+
+    def offer(self, mint, ts=None, source="?"):
+        if not mint or mint in QUOTE_MINTS:
+            return False
+        if self.leases.owns(mint):
+            self.stats["local"] += 1
+            return self.bus.offer(mint, ts, source)
+        store.handoff_candidates([(self.leases.shard(mint), mint, time.time() if ts is None else ts, source)])
+        self.stats["handed_off"] += 1
+        return False
+
+    def pump(self, stop, every_sec=1.0):
+        while not stop.is_set():
+            try:
+                got = store.take_candidates(self.leases.owned)
+                for mint, ts, source in got:
+                    self.bus.offer(mint, ts, source)
+                self.stats["received"] += len(got)
+            except Exception as e:
+                print("[Shard] inbox error:", repr(e))
+            stop.wait(every_sec)
+
+    def start(self, stop):
+        for name, fn in (("leases", self.leases.run), ("inbox", self.pump)):
+            threading.Thread(target=fn, args=(stop,), name=f"shard-{name}", daemon=True).start()
@@ -0,0 +1,118 @@
+# core/snapshot.py — pass on only new or materially changed pairs between polls
+import os
+import time
+
+# default change thresholds (env overrides; callers may also pass their own)
+LIQ_PCT = float(os.getenv("SNAPSHOT_LIQ_PCT", "0.05"))       # liquidity moved >= 5%
+PRICE_PCT = float(os.getenv("SNAPSHOT_PRICE_PCT", "0.03"))   # price moved >= 3%
+TX_DELTA = int(os.getenv("SNAPSHOT_TX_DELTA", "5"))          # >= 5 more/less m5 txns
+
+
+def _f(v):
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _key(p):
+    return p.get("pairAddress") or (p.get("baseToken") or {}).get("address")
+
+
+def _state(p):
+    """(liq, price, m5 txns) — the numbers the thresholds look at."""
+    tx = (p.get("txns") or {}).get("m5") or {}
+    return (_f((p.get("liquidity") or {}).get("usd")), _f(p.get("priceUsd")),
+            int(_f(tx.get("buys")) + _f(tx.get("sells"))))
+
+
+def _fingerprint(p):
+    # cheap equality check; any difference here is then measured against the thresholds
+    return (p.get("priceUsd"), (p.get("liquidity") or {}).get("usd"), str(p.get("txns")), p.get("fdv"))
+
+
+def _moved(a, b, rel):
+    if a == b:
+        return False
+    if a == 0 or b == 0:
+        return True
+    return abs(b - a) / abs(a) >= rel
+
+
+class SnapshotDiffer:
+    """
+    Remembers the previous poll's pairs by address (fingerprint + the state last passed
+    on) and returns only pairs that are new or moved past a threshold since they were
+    last passed on, so slow drift still adds up. Pairs missing from a poll are forgotten.
+    refresh_sec: also pass on unchanged pairs not seen downstream for this long.
+
+    changes() only stages the new state; commit() it once the returned pairs were
+    processed, so a batch that fails halfway is offered again on the next poll.
+    diff() is changes() + commit() for callers that cannot fail after the diff.
+    An empty poll is treated as a failed one and leaves the state alone.
+    """
+
+    def __init__(self, liq_pct=LIQ_PCT, price_pct=PRICE_PCT, tx_delta=TX_DELTA, refresh_sec=None):
+        self.liq_pct = liq_pct
+        self.price_pct = price_pct
+        self.tx_delta = tx_delta
+        self.refresh_sec = refresh_sec
+        self._prev = {}   # key -> (fingerprint, state passed on, passed-on ts)
+        self._staged = None
+        self.stats = {"polled": 0, "new": 0, "changed": 0, "unchanged": 0}
+
+    def _changed(self, old, new):
+        return (_moved(old[0], new[0], self.liq_pct) or _moved(old[1], new[1], self.price_pct)
+                or abs(new[2] - old[2]) >= self.tx_delta)
+
+    def changes(self, pairs, now=None):
+        self._staged = None
+        if not pairs:
+            return []
+        now = time.time() if now is None else now
+        out, cur = [], {}
+        new = changed = 0
+        for p in pairs:
+            k = _key(p)
+            if not k or k in cur:
+                continue
+            fp = _fingerprint(p)
+            prev = self._prev.get(k)
+            if prev is None:
+                new += 1
+            elif prev[0] == fp and not self._stale(prev, now):
+                cur[k] = prev
+                continue
+            else:
+                st = _state(p)
+                if not self._changed(prev[1], st) and not self._stale(prev, now):
+                    cur[k] = (fp, prev[1], prev[2])
+                    continue
+                changed += 1
+            cur[k] = (fp, _state(p), now)
+            out.append(p)
+        self._staged = (cur, len(pairs), new, changed)
+        return out
+
+    def commit(self):
+        """Make the last changes() the baseline for the next poll."""
+        if self._staged is None:
+            return
+        cur, polled, new, changed = self._staged
+        self._staged = None
+        self._prev = cur
+        self.stats["polled"] += polled
+        self.stats["new"] += new
+        self.stats["changed"] += changed
+        self.stats["unchanged"] += len(cur) - new - changed
+
+    def diff(self, pairs, now=None):
+        out = self.changes(pairs, now)
+        self.commit()
+        return out
+
+    def _stale(self, prev, now):
+        return self.refresh_sec is not None and now - prev[2] >= self.refresh_sec
+
+    def __len__(self):
+        return len(self._prev)
@@ -1,8 +1,12 @@
+import json
 import sqlite3
+import threading
 import time
 
 DB_PATH = "freshbot.sqlite3"
-_conn = None
+_local = threading.local()     # one connection per thread
+_init_lock = threading.Lock()
+_ready = False
 
 
 def _init(conn):
@@ -45,16 +49,126 @@ def _init(conn):
         PRIMARY KEY (signal_id, horizon),
         FOREIGN KEY (signal_id) REFERENCES signals(id) ON DELETE CASCADE
     )""")
+    # live vs shadow model probabilities on the same feature rows
+    c.execute("""CREATE TABLE IF NOT EXISTS model_shadow (
+        ts INTEGER NOT NULL,
+        mint TEXT,
+        live_version TEXT,
+        live_proba REAL,
+        shadow_version TEXT,
+        shadow_proba REAL
+    )""")
+    # paper-trading fills (one row per simulated buy/sell)
+    c.execute("""CREATE TABLE IF NOT EXISTS paper_fills (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        signal_id INTEGER,
+        mint TEXT NOT NULL,
+        ts INTEGER NOT NULL,
+        side TEXT NOT NULL CHECK(side IN ('B','S')),
+        price REAL NOT NULL,
+        pnl_pct REAL,
+        reason TEXT
+    )""")
+    # AI markers shown on the chart (written by the signal engine)
+    c.execute("""CREATE TABLE IF NOT EXISTS ai_trades(
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        mint TEXT NOT NULL, ts TEXT NOT NULL, side TEXT NOT NULL CHECK(side IN ('B','S')),
+        price REAL NOT NULL, conf REAL, UNIQUE(mint, ts, side)
+    )""")
+    # mints the signal engine should follow; the runner adds/removes rows
+    c.execute("""CREATE TABLE IF NOT EXISTS engine_follow (
+        mint TEXT PRIMARY KEY,
+        added_ts INTEGER NOT NULL,
+        expires_ts INTEGER NOT NULL
+    )""")
+    # one row per signalled mint, kept current by the writers (chart overview reads it)
+    c.execute("""CREATE TABLE IF NOT EXISTS mint_overview (
+        mint TEXT PRIMARY KEY,
+        symbol TEXT,
+        signal_ts INTEGER, signal_price REAL,
+        last_ts INTEGER, last_price REAL,
+        outcome_horizon TEXT, outcome_ret REAL,
+        ai_side TEXT, ai_price REAL, ai_ts TEXT,
+        updated_ts INTEGER NOT NULL
+    )""")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_overview_updated ON mint_overview(updated_ts)")
+    c.execute("""CREATE TABLE IF NOT EXISTS engine_status (
+        name TEXT PRIMARY KEY,
+        pid  INTEGER,
+        ts   INTEGER NOT NULL
+    )""")
+    # sharded runner (core.shards): who holds which shard, and mints handed to a shard's owner
+    c.execute("""CREATE TABLE IF NOT EXISTS shard_leases (
+        shard   INTEGER PRIMARY KEY,
+        owner   TEXT NOT NULL,
+        expires INTEGER NOT NULL
+    )""")
+    c.execute("""CREATE TABLE IF NOT EXISTS candidate_inbox (
+        id     INTEGER PRIMARY KEY AUTOINCREMENT,
+        shard  INTEGER NOT NULL,
+        mint   TEXT NOT NULL,
+        ts     REAL NOT NULL,
+        source TEXT
+    )""")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_inbox_shard ON candidate_inbox(shard, id)")
+    # latest runner pipeline metrics, one row per stage (core.pipeline)
+    c.execute("""CREATE TABLE IF NOT EXISTS stage_stats (
+        stage TEXT PRIMARY KEY,
+        ts    INTEGER NOT NULL,
+        stats TEXT NOT NULL
+    )""")
+    # due-time outcomes: each horizon is fired once at due_ts and then frozen
+    _add_columns(c, "outcomes", [("due_ts", "INTEGER"), ("fired_ts", "INTEGER"),
+                                 ("frozen", "INTEGER NOT NULL DEFAULT 0")])
+    c.execute("CREATE INDEX IF NOT EXISTS idx_outcomes_due ON outcomes(due_ts) WHERE frozen=0")
+    # path metrics from stored ticks; source is 'ticks' or 'live' (one bulk price lookup)
+    _add_columns(c, "outcomes", [("mfe_pct", "REAL"), ("mae_pct", "REAL"), ("peak_sec", "INTEGER"),
+                                 ("n_ticks", "INTEGER"), ("source", "TEXT")])
+    # performance rollups, updated as outcomes freeze (see _rollup); ret_hist is a
+    # histogram of returns in RET_BIN_PCT bins so the median needs no raw rows
+    c.execute("""CREATE TABLE IF NOT EXISTS perf_rollup (
+        score_bucket INTEGER NOT NULL,
+        age_bucket   TEXT NOT NULL,
+        horizon      TEXT NOT NULL,
+        n INTEGER NOT NULL, wins INTEGER NOT NULL,
+        sum_ret REAL NOT NULL,
+        PRIMARY KEY (score_bucket, age_bucket, horizon)
+    )""")
+    c.execute("""CREATE TABLE IF NOT EXISTS perf_rollup_hist (
+        score_bucket INTEGER NOT NULL,
+        age_bucket   TEXT NOT NULL,
+        horizon      TEXT NOT NULL,
+        bin INTEGER NOT NULL,
+        n INTEGER NOT NULL,
+        PRIMARY KEY (score_bucket, age_bucket, horizon, bin)
+    )""")
     conn.commit()
 
 
+def _add_columns(c, table, cols):
+    have = {r[1] for r in c.execute(f"PRAGMA table_info({table})")}
+    for name, decl in cols:
+        if name not in have:
+            c.execute(f"ALTER TABLE {table} ADD COLUMN {name} {decl}")
+
+
 def conn():
-    global _conn
-    if _conn is None:
-        _conn = sqlite3.connect(DB_PATH, check_same_thread=False)
-        _conn.row_factory = sqlite3.Row
-        _init(_conn)
-    return _conn
+    """
+    This thread's connection. The runner's stage / shard threads all write, and a shared
+    connection interleaves their transactions; separate ones just wait on sqlite's lock.
+    The schema is set up once per process.
+    """
+    global _ready
+    c = getattr(_local, "conn", None)
+    if c is None:
+        c = sqlite3.connect(DB_PATH, timeout=30)
+        c.row_factory = sqlite3.Row
+        with _init_lock:
+            if not _ready:
+                _init(c)
+                _ready = True
+        _local.conn = c
+    return c
 
 # ---- seen signatures ----
 
@@ -82,6 +196,20 @@ def mark_posted(mint: str, score: float):
     conn().commit()
 
 
+def claim_post(mint: str, new_score: float, bump: float):
+    """
+    should_post + mark_posted as one statement: the row is written only if the mint was
+    never posted or the score beat the last post by bump, so of several processes racing
+    on a mint exactly one gets True. returns: (ok, last score before, or None)
+    """
+    last = get_last_post(mint)
+    with conn() as c:   # commit, or roll back so a failed claim doesn't linger
+        cur = c.execute("""INSERT INTO posts(mint,ts,score) VALUES (?,?,?)
+            ON CONFLICT(mint) DO UPDATE SET ts=excluded.ts, score=excluded.score
+            WHERE excluded.score >= posts.score + ?""", (mint, int(time.time()), float(new_score), float(bump)))
+    return cur.rowcount == 1, (float(last[1]) if last else None)
+
+
 def should_post(mint: str, new_score: float, bump: float):
     row = get_last_post(mint)
     if row is None:
@@ -127,9 +255,309 @@ def ensure_outcome_row(signal_id: int, horizon: str, t0_price: float):
 
 
 def upsert_outcome(signal_id: int, horizon: str, t0_price: float, price_now: float, ret_pct: float):
-    conn().execute("""INSERT INTO outcomes(signal_id,horizon,t0_price,price_now,ret_pct,updated_ts)
+    cur = conn().execute("""INSERT INTO outcomes(signal_id,horizon,t0_price,price_now,ret_pct,updated_ts)
                       VALUES (?,?,?,?,?,?)
                       ON CONFLICT(signal_id,horizon)
-                      DO UPDATE SET price_now=excluded.price_now, ret_pct=excluded.ret_pct, updated_ts=excluded.updated_ts""",
-                   (signal_id, horizon, t0_price, price_now, ret_pct, int(time.time())))
+                      DO UPDATE SET price_now=excluded.price_now, ret_pct=excluded.ret_pct, updated_ts=excluded.updated_ts
+                      WHERE outcomes.frozen=0""",
+                         (signal_id, horizon, t0_price, price_now, ret_pct, int(time.time())))
+    if cur.rowcount:   # frozen rows are left alone, and so is their overview
+        _overview_outcomes([(signal_id, horizon, ret_pct)])
+    conn().commit()
+
+
+def seed_outcomes(signal_id: int, t0_price: float, ts: int, horizons: dict):
+    """Pending outcome rows with their due times (horizons: {'5m': 300, ...})."""
+    now = int(time.time())
+    conn().executemany("""INSERT OR IGNORE INTO outcomes(signal_id,horizon,t0_price,price_now,ret_pct,updated_ts,due_ts)
+                          VALUES (?,?,?,?,?,?,?)""",
+                       [(signal_id, h, t0_price or 0.0, t0_price or 0.0, 0.0, now, ts + sec)
+                        for h, sec in horizons.items()])
+    conn().commit()
+
+
+def seed_recent_outcomes(hours_back: int, horizons: dict):
+    """Seed/repair due times for signals from before the scheduler existed."""
+    cutoff = int(time.time()) - hours_back*3600
+    for h, sec in horizons.items():
+        conn().execute("""INSERT OR IGNORE INTO outcomes(signal_id,horizon,t0_price,price_now,ret_pct,updated_ts,due_ts)
+                          SELECT id, ?, COALESCE(price_usd,0), COALESCE(price_usd,0), 0.0, ?, ts + ?
+                          FROM signals WHERE ts >= ?""", (h, int(time.time()), sec, cutoff))
+        conn().execute("""UPDATE outcomes SET due_ts=(SELECT ts FROM signals WHERE id=signal_id) + ?
+                          WHERE due_ts IS NULL AND horizon=?""", (sec, h))
+    conn().commit()
+
+
+def pending_outcomes(min_due: int):
+    """Unfrozen outcome rows due at/after min_due (uses the partial due index)."""
+    cur = conn().execute("""SELECT o.signal_id, o.horizon, o.t0_price, o.due_ts, s.mint, s.ts
+                            FROM outcomes o JOIN signals s ON s.id=o.signal_id
+                            WHERE o.frozen=0 AND o.due_ts >= ?""", (min_due,))
+    return cur.fetchall()
+
+
+SCORE_BUCKET = 5                      # score points per bucket
+AGE_BUCKETS = [(1, "<1m"), (2, "1-2m"), (4, "2-4m"), (8, "4-8m"), (None, "8m+")]
+RET_BIN_PCT = 5.0                     # histogram bin width for returns
+RET_BIN_MIN, RET_BIN_MAX = -20, 100   # clamp: -100% .. +500%
+
+
+def score_bucket(score):
+    return int((score or 0) // SCORE_BUCKET) * SCORE_BUCKET
+
+
+def age_bucket(age_min):
+    if age_min is None:
+        return "?"
+    for hi, name in AGE_BUCKETS:
+        if hi is None or age_min < hi:
+            return name
+
+
+def ret_bin(ret_pct):
+    return max(RET_BIN_MIN, min(RET_BIN_MAX, int(ret_pct // RET_BIN_PCT)))
+
+
+def _rollup(c, rows):
+    """Add freshly frozen (signal_id, horizon, ret_pct) rows to the perf rollups."""
+    if not rows:
+        return
+    ids = list({r[0] for r in rows})
+    meta = {}
+    for i in range(0, len(ids), 500):
+        chunk = ids[i:i+500]
+        q = f"SELECT id, score, age_min FROM signals WHERE id IN ({','.join('?'*len(chunk))})"
+        for r in c.execute(q, chunk):
+            meta[r[0]] = (score_bucket(r[1]), age_bucket(r[2]))
+    agg, hist = {}, {}
+    for sid, h, ret in rows:
+        if sid not in meta:
+            continue
+        k = meta[sid] + (h,)
+        a = agg.setdefault(k, [0, 0, 0.0])
+        a[0] += 1
+        a[1] += ret > 0
+        a[2] += ret
+        hk = k + (ret_bin(ret),)
+        hist[hk] = hist.get(hk, 0) + 1
+    c.executemany("""INSERT INTO perf_rollup(score_bucket,age_bucket,horizon,n,wins,sum_ret) VALUES (?,?,?,?,?,?)
+                     ON CONFLICT(score_bucket,age_bucket,horizon)
+                     DO UPDATE SET n=n+excluded.n, wins=wins+excluded.wins, sum_ret=sum_ret+excluded.sum_ret""",
+                  [k + tuple(a) for k, a in agg.items()])
+    c.executemany("""INSERT INTO perf_rollup_hist(score_bucket,age_bucket,horizon,bin,n) VALUES (?,?,?,?,?)
+                     ON CONFLICT(score_bucket,age_bucket,horizon,bin) DO UPDATE SET n=n+excluded.n""",
+                  [k + (n,) for k, n in hist.items()])
+
+
+def rebuild_rollups():
+    """Recompute the perf rollups from every frozen outcome (one-off / after changing buckets)."""
+    c = conn()
+    c.execute("DELETE FROM perf_rollup")
+    c.execute("DELETE FROM perf_rollup_hist")
+    _rollup(c, [tuple(r) for r in c.execute(
+        "SELECT signal_id, horizon, ret_pct FROM outcomes WHERE frozen=1")])
+    c.commit()
+
+
+def freeze_outcomes(rows):
+    """
+    rows: (signal_id, horizon, price_now, ret_pct, fired_ts, mfe_pct, mae_pct, peak_sec, n_ticks, source)
+    Frozen rows are never rewritten; only the ones that actually froze go into the perf rollups
+    and the overview.
+    """
+    now = int(time.time())
+    c = conn()
+    done = []
+    for sid, h, p, r, f, mfe, mae, pk, n, src in rows:
+        cur = c.execute("""UPDATE outcomes SET price_now=?, ret_pct=?, fired_ts=?, mfe_pct=?, mae_pct=?,
+                                  peak_sec=?, n_ticks=?, source=?, updated_ts=?, frozen=1
+                           WHERE signal_id=? AND horizon=? AND frozen=0""",
+                        (p, r, f, mfe, mae, pk, n, src, now, sid, h))
+        if cur.rowcount:
+            done.append((sid, h, r))
+    _rollup(c, done)
+    _overview_outcomes(done)
+    conn().commit()
+
+
+def fill_path_metrics(rows):
+    """rows: (signal_id, horizon, mfe_pct, mae_pct, peak_sec, n_ticks) for rows frozen from a live price."""
+    conn().executemany("""UPDATE outcomes SET mfe_pct=?, mae_pct=?, peak_sec=?, n_ticks=?
+                          WHERE signal_id=? AND horizon=? AND frozen=1 AND mfe_pct IS NULL""",
+                       [(mfe, mae, pk, n, sid, h) for sid, h, mfe, mae, pk, n in rows])
+    conn().commit()
+
+
+def signals_missing_paths(cutoff: int):
+    """Signals since cutoff with at least one outcome horizon lacking path metrics."""
+    cur = conn().execute("""SELECT DISTINCT s.id, s.mint, s.ts, s.price_usd
+                            FROM signals s JOIN outcomes o ON o.signal_id=s.id
+                            WHERE s.ts >= ? AND o.mfe_pct IS NULL ORDER BY s.mint, s.ts""", (cutoff,))
+    return cur.fetchall()
+
+
+# ---- model shadow scoring ----
+
+
+def insert_shadow_scores(rows):
+    """rows: (ts, mint, live_version, live_proba, shadow_version, shadow_proba)"""
+    conn().executemany("""INSERT INTO model_shadow(ts,mint,live_version,live_proba,shadow_version,shadow_proba)
+                          VALUES (?,?,?,?,?,?)""", rows)
+    conn().commit()
+
+
+def prune_shadow_scores(before_ts: int):
+    conn().execute("DELETE FROM model_shadow WHERE ts < ?", (before_ts,))
+    conn().commit()
+
+
+# ---- paper trading ----
+
+
+def insert_paper_fills(rows):
+    """rows: (signal_id, mint, ts, side, price, pnl_pct, reason)"""
+    conn().executemany("""INSERT INTO paper_fills(signal_id,mint,ts,side,price,pnl_pct,reason)
+                          VALUES (?,?,?,?,?,?,?)""", rows)
+    conn().commit()
+
+
+# ---- signal engine ----
+
+
+def follow_mint(mint: str, ttl_sec: int):
+    now = int(time.time())
+    conn().execute("""INSERT INTO engine_follow(mint,added_ts,expires_ts) VALUES (?,?,?)
+                      ON CONFLICT(mint) DO UPDATE SET expires_ts=excluded.expires_ts""",
+                   (mint, now, now + int(ttl_sec)))
+    conn().commit()
+
+
+def unfollow_mint(mint: str):
+    conn().execute("DELETE FROM engine_follow WHERE mint=?", (mint,))
+    conn().commit()
+
+
+def followed_mints():
+    """Live follow list; expired rows are dropped on the way."""
+    now = int(time.time())
+    conn().execute("DELETE FROM engine_follow WHERE expires_ts <= ?", (now,))
+    conn().commit()
+    return [r[0] for r in conn().execute("SELECT mint FROM engine_follow ORDER BY added_ts")]
+
+
+def insert_ai_trades(rows):
+    """rows: (mint, ts_iso, side, price, conf)"""
+    conn().executemany("INSERT OR IGNORE INTO ai_trades(mint, ts, side, price, conf) VALUES(?,?,?,?,?)", rows)
+    now = int(time.time())
+    conn().executemany("UPDATE mint_overview SET ai_side=?, ai_price=?, ai_ts=?, updated_ts=? WHERE mint=?",
+                       [(r[2], r[3], r[1], now, r[0]) for r in rows])
+    conn().commit()
+
+
+def heartbeat(name: str, pid: int):
+    conn().execute("INSERT OR REPLACE INTO engine_status(name,pid,ts) VALUES (?,?,?)",
+                   (name, pid, int(time.time())))
+    conn().commit()
+
+
+def last_heartbeat(name: str):
+    row = conn().execute("SELECT ts FROM engine_status WHERE name=?", (name,)).fetchone()
+    return row[0] if row else None
+
+
+def save_stage_stats(metrics: dict):
+    now = int(time.time())
+    conn().executemany("INSERT OR REPLACE INTO stage_stats(stage,ts,stats) VALUES (?,?,?)",
+                       [(k, now, json.dumps(v)) for k, v in metrics.items()])
+    conn().commit()
+
+
+def stage_stats():
+    """{stage: metrics dict + ts} as last exported by the runner."""
+    rows = conn().execute("SELECT stage, ts, stats FROM stage_stats").fetchall()
+    return {r[0]: dict(json.loads(r[2]), ts=r[1]) for r in rows}
+
+# ---- shard leases + hand-off (sharded runner) ----
+
+
+def claim_shard(shard: int, owner: str, ttl: int, home: bool = False) -> bool:
+    """
+    Take or renew a shard lease; fails while another owner's lease is unexpired,
+    unless home is set (the shard's own worker takes it straight back from a takeover).
+    """
+    now = int(time.time())
+    with conn() as c:
+        cur = c.execute("""INSERT INTO shard_leases(shard,owner,expires) VALUES (?,?,?)
+            ON CONFLICT(shard) DO UPDATE SET owner=excluded.owner, expires=excluded.expires
+            WHERE shard_leases.owner=excluded.owner OR shard_leases.expires < ? OR ?""",
+                        (shard, owner, now + ttl, now, int(home)))
+    return cur.rowcount == 1
+
+
+def shard_leases():
+    """{shard: (owner, expires)}"""
+    return {r[0]: (r[1], r[2]) for r in conn().execute("SELECT shard, owner, expires FROM shard_leases")}
+
+
+def release_shard(shard: int, owner: str):
+    with conn() as c:
+        c.execute("UPDATE shard_leases SET expires=0 WHERE shard=? AND owner=?", (shard, owner))
+
+
+def handoff_candidates(rows):
+    """rows: (shard, mint, ts, source) for mints another worker owns"""
+    if not rows:
+        return
+    with conn() as c:
+        c.executemany("INSERT INTO candidate_inbox(shard,mint,ts,source) VALUES (?,?,?,?)", rows)
+
+
+def prune_candidates(before_ts: float):
+    """Drop hand-offs nobody picked up (e.g. for a shard count no longer running)."""
+    with conn() as c:
+        c.execute("DELETE FROM candidate_inbox WHERE ts < ?", (before_ts,))
+
+
+def take_candidates(shards, limit=200):
+    """
+    Pop up to limit handed-off candidates for these shards: [(mint, ts, source)].
+    The delete is rolled back if it fails, so the rows stay in the inbox for the next pump.
+    """
+    shards = list(shards)
+    if not shards:
+        return []
+    qs = ",".join("?" * len(shards))
+    with conn() as c:
+        rows = c.execute(f"""DELETE FROM candidate_inbox WHERE id IN (
+            SELECT id FROM candidate_inbox WHERE shard IN ({qs}) ORDER BY id LIMIT ?)
+            RETURNING mint, ts, source""", shards + [limit]).fetchall()
+    return [tuple(r) for r in rows]
+
+
+# ---- overview aggregate (one row per signalled mint) ----
+
+
+def overview_signal(mint: str, symbol: str, ts: int, price: float):
+    conn().execute("""INSERT INTO mint_overview(mint,symbol,signal_ts,signal_price,last_ts,last_price,updated_ts)
+                      VALUES (?,?,?,?,?,?,?)
+                      ON CONFLICT(mint) DO UPDATE SET symbol=excluded.symbol, signal_ts=excluded.signal_ts,
+                        signal_price=excluded.signal_price, updated_ts=excluded.updated_ts""",
+                   (mint, symbol, ts, price, ts, price, int(time.time())))
+    conn().commit()
+
+
+def _overview_outcomes(rows):
+    """rows: (signal_id, horizon, ret_pct); overview rows already showing that outcome aren't rewritten"""
+    conn().executemany("""UPDATE mint_overview SET outcome_horizon=?, outcome_ret=?, updated_ts=?
+                          WHERE mint=(SELECT mint FROM signals WHERE id=?)
+                            AND (outcome_horizon IS NOT ? OR outcome_ret IS NOT ?)""",
+                       [(h, r, int(time.time()), sid, h, r) for sid, h, r in rows])
+
+
+def overview_prices(rows):
+    """rows: (mint, ts, price) — only mints that already have an overview row are touched."""
+    now = int(time.time())
+    conn().executemany("""UPDATE mint_overview SET last_ts=?, last_price=?, updated_ts=?
+                          WHERE mint=? AND COALESCE(last_ts,0) <= ?""",
+                       [(ts, price, now, mint, ts) for mint, ts, price in rows if price])
     conn().commit()
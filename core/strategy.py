@@ -4,9 +4,12 @@ from collections import deque
 import numpy as np
 
 try:
-    from .model import model_score_proba  # optional; returns None if no model
+    # optional; all return None if no model
+    from .model import model_score_proba, features_for, score_batch
 except Exception:
     def model_score_proba(_df): return None
+    def features_for(_mint, _candles): return None
+    def score_batch(_rows, mints=None): return None
 
 
 def ema(arr, n):
@@ -26,27 +29,18 @@ def momentum(arr, n):
     return out
 
 
-def decide_from_candles(candles, last_n=120,
-                        ema_fast=8, ema_slow=21,
-                        mom_win=8, dd_stop=0.03,
-                        proba_buy=0.62, proba_sell=0.45):
-    """
-    candles: list of dicts with keys time/open/high/low/close
-    returns: 'B'|'S'|None plus confidence float
-    """
-    if not candles or len(candles) < max(ema_fast, ema_slow, mom_win) + 2:
-        return None
-
-    closes = np.array([c["close"] for c in candles[-last_n:]], dtype=float)
+def _rule_signal(closes, ema_fast, ema_slow, mom_win):
     ef = ema(closes, ema_fast)
     es = ema(closes, ema_slow)
     mom = momentum(closes, mom_win)
 
     b = ef[-2] <= es[-2] and ef[-1] > es[-1] and mom[-1] > 0
     s = ef[-2] >= es[-2] and ef[-1] < es[-1] and mom[-1] < 0
+    return b, s
 
+
+def _combine(b, s, p, proba_buy, proba_sell):
     # optional ML probability on top
-    p = model_score_proba(closes)  # returns float 0..1 or None
     if p is not None:
         if p >= proba_buy:
             b = True
@@ -58,3 +52,121 @@ def decide_from_candles(candles, last_n=120,
     if s and not b:
         return ("S", float(0.6 if p is None else 1.0-p))
     return None
+
+
+def decide_from_candles(candles, last_n=120,
+                        ema_fast=8, ema_slow=21,
+                        mom_win=8, dd_stop=0.03,
+                        proba_buy=0.62, proba_sell=0.45):
+    """
+    candles: list of dicts with keys time/open/high/low/close
+    returns: 'B'|'S'|None plus confidence float
+    """
+    if not candles or len(candles) < max(ema_fast, ema_slow, mom_win) + 2:
+        return None
+
+    closes = np.array([c["close"] for c in candles[-last_n:]], dtype=float)
+    b, s = _rule_signal(closes, ema_fast, ema_slow, mom_win)
+    p = model_score_proba(closes)  # returns float 0..1 or None
+    return _combine(b, s, p, proba_buy, proba_sell)
+
+
+def decide_batch(candles_by_mint, last_n=120,
+                 ema_fast=8, ema_slow=21,
+                 mom_win=8, dd_stop=0.03,
+                 proba_buy=0.62, proba_sell=0.45):
+    """
+    Same rules as decide_from_candles for every mint at once.
+    candles_by_mint: {mint: candles}
+    returns: {mint: ('B'|'S', conf) or None}
+    Features are cached per mint on (last candle time, close), so the forming bar still refreshes,
+    and the model is called once per batch.
+    """
+    need = max(ema_fast, ema_slow, mom_win) + 2
+    out = {}
+    rules = {}
+    rows, row_mints = [], []
+    for mint, candles in candles_by_mint.items():
+        if not candles or len(candles) < need:
+            out[mint] = None
+            continue
+        closes = np.array([c["close"] for c in candles[-last_n:]], dtype=float)
+        rules[mint] = _rule_signal(closes, ema_fast, ema_slow, mom_win)
+        feats = features_for(mint, candles[-last_n:])
+        if feats is not None:
+            rows.append(feats)
+            row_mints.append(mint)
+
+    probas = score_batch(rows, row_mints) if rows else None
+    p_by_mint = dict(zip(row_mints, probas)) if probas else {}
+    for mint, (b, s) in rules.items():
+        out[mint] = _combine(b, s, p_by_mint.get(mint), proba_buy, proba_sell)
+    return out
+
+
+class TickState:
+    """
+    Incremental EMA/momentum over a live tick stream: O(1) work per tick,
+    so many mints can be followed without re-reading history.
+    """
+
+    def __init__(self, ema_fast=8, ema_slow=21, mom_win=8):
+        self.kf = 2/(ema_fast+1)
+        self.ks = 2/(ema_slow+1)
+        self.need = max(ema_fast, ema_slow, mom_win) + 2
+        self.ef = self.es = None
+        self.win = deque(maxlen=mom_win+1)
+        self.n = 0
+        self.last = None
+        self.ts = None
+        self.peak = None   # highest price since the last reset_peak()
+
+    def update(self, price, ts=None):
+        if not price or price <= 0:
+            return self
+        self.ef = price if self.ef is None else (price - self.ef)*self.kf + self.ef
+        self.es = price if self.es is None else (price - self.es)*self.ks + self.es
+        self.win.append(price)
+        self.n += 1
+        self.last = price
+        self.ts = ts
+        self.peak = price if self.peak is None else max(self.peak, price)
+        return self
+
+    def reset_peak(self):
+        self.peak = self.last
+
+    @property
+    def ready(self):
+        return self.n >= self.need
+
+    @property
+    def momentum(self):
+        return self.win[-1] - self.win[0] if len(self.win) == self.win.maxlen else 0.0
+
+
+def should_enter(st: TickState):
+    """returns: (ok, why) — fast EMA above slow with positive momentum."""
+    if not st.ready:
+        return False, f"warming up {st.n}/{st.need}"
+    if st.ef > st.es and st.momentum > 0:
+        return True, f"ema {st.ef:.3g}>{st.es:.3g} mom+"
+    return False, f"ema {st.ef:.3g}/{st.es:.3g} mom={st.momentum:.3g}"
+
+
+def should_exit(st: TickState, entry: float,
+                dd_stop=0.03, take_profit=0.25, trail=0.10):
+    """returns: (hit, why) for a long opened at entry."""
+    px = st.last
+    if not px or not entry:
+        return False, "no price"
+    chg = (px - entry) / entry
+    if chg <= -dd_stop:
+        return True, f"stop {chg:.1%}"
+    if chg >= take_profit:
+        return True, f"take profit {chg:.1%}"
+    if st.peak and st.peak > entry and px <= st.peak*(1-trail):
+        return True, f"trail {px/st.peak-1:.1%} from peak"
+    if st.ready and st.ef < st.es and st.momentum < 0:
+        return True, "ema cross down"
+    return False, f"hold {chg:+.1%}"
@@ -3,8 +3,8 @@ import time
 import requests
 import sqlite3
 from datetime import datetime, timezone
-from .market import DEX_TOKEN, _liq_usd, _to_float
-from .store import conn
+from .market import DEX_TOKEN, _liq_usd, _to_float, fetch_pairs_bulk
+from .store import conn, overview_prices
 
 
 def _init():
@@ -36,16 +36,23 @@ def fetch_pair(mint):
     return pairs[0]
 
 
-def track_once(mint: str):
-    p = fetch_pair(mint)
-    if not p:
-        return
+# mint -> (ts, price_usd) of the newest tick this process has seen
+LATEST = {}
+
+_INSERT = """INSERT OR IGNORE INTO ticks(
+      mint, ts, price_usd, liq_usd, fdv_usd,
+      tx_m5_buys, tx_m5_sells, tx_m15_buys, tx_m15_sells,
+      tx_h1_buys, tx_h1_sells, vol_m5, vol_m15, vol_h1
+    ) VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?)"""
+
+
+def _row(p, mint, ts):
     base = p.get("baseToken") or {}
     tx = p.get("txns") or {}
     vol = p.get("volume") or {}
-    row = (
+    return (
         base.get("address") or mint,
-        int(time.time()),
+        ts,
         _to_float(p.get("priceUsd")), _liq_usd(p), _to_float(
             p.get("fdv") or p.get("marketCap")),
         int((tx.get("m5") or {}).get("buys") or 0),  int(
@@ -57,12 +64,41 @@ def track_once(mint: str):
         _to_float(vol.get("m5") or 0), _to_float(
             vol.get("m15") or 0), _to_float(vol.get("h1") or 0)
     )
-    conn().execute("""INSERT OR IGNORE INTO ticks(
-      mint, ts, price_usd, liq_usd, fdv_usd,
-      tx_m5_buys, tx_m5_sells, tx_m15_buys, tx_m15_sells,
-      tx_h1_buys, tx_h1_sells, vol_m5, vol_m15, vol_h1
-    ) VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?)""", row)
+
+
+def track_once(mint: str):
+    p = fetch_pair(mint)
+    if not p:
+        return
+    row = _row(p, mint, int(time.time()))
+    conn().execute(_INSERT, row)
     conn().commit()
+    LATEST[row[0]] = (row[1], row[2])
+    overview_prices([(row[0], row[1], row[2])])
+
+
+def track_many(mints):
+    """
+    One tick for many mints: bulk DexScreener lookup, one insert batch, one commit.
+    returns: {mint: (ts, price_usd)} for the mints that resolved
+    """
+    pairs = fetch_pairs_bulk(mints)
+    ts = int(time.time())
+    rows = [_row(p, mint, ts) for mint, p in pairs.items()]
+    if rows:
+        conn().executemany(_INSERT, rows)
+        conn().commit()
+    out = {}
+    for r in rows:
+        LATEST[r[0]] = out[r[0]] = (r[1], r[2])
+    if rows:
+        overview_prices([(r[0], r[1], r[2]) for r in rows])
+    return out
+
+
+def latest_price(mint: str):
+    hit = LATEST.get(mint)
+    return hit[1] if hit else None
 
 
 def track_loop(mint: str, seconds=5, duration_sec=600):
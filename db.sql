@@ -34,6 +34,7 @@ CREATE TABLE IF NOT EXISTS call_outcomes (
 );
 CREATE INDEX IF NOT EXISTS idx_outcomes_due15 ON call_outcomes(due_15m) WHERE price_15m IS NULL;
 CREATE INDEX IF NOT EXISTS idx_outcomes_due1h ON call_outcomes(due_1h) WHERE price_1h IS NULL;
+CREATE INDEX IF NOT EXISTS idx_call_outcomes_call ON call_outcomes(call_id);
 
 -- tiny scan log (auto-pruned by code)
 CREATE TABLE IF NOT EXISTS scan_events (
@@ -50,6 +51,21 @@ CREATE TABLE IF NOT EXISTS scan_events (
 CREATE INDEX IF NOT EXISTS idx_scan_events_seen  ON scan_events(seen_at);
 CREATE INDEX IF NOT EXISTS idx_scan_events_stage ON scan_events(stage);
 
+-- per-minute rollups of scan_events, bumped by bot.insert_scan_events in the same transaction
+CREATE TABLE IF NOT EXISTS scan_stage_minute (
+  minute TIMESTAMPTZ NOT NULL,
+  stage  TEXT NOT NULL,
+  n      INT NOT NULL,
+  PRIMARY KEY (minute, stage)
+);
+-- reasons of 'base_reject' events only
+CREATE TABLE IF NOT EXISTS scan_reason_minute (
+  minute TIMESTAMPTZ NOT NULL,
+  reason TEXT NOT NULL,
+  n      INT NOT NULL,
+  PRIMARY KEY (minute, reason)
+);
+
 -- lifecycle of tokens we discover (prevents re-checking garbage forever)
 -- stages: 0=never_recheck, 1=watch, 2=qualified, 3=posted, 4=dead
 CREATE TABLE IF NOT EXISTS token_lifecycle (
@@ -60,10 +76,13 @@ CREATE TABLE IF NOT EXISTS token_lifecycle (
   last_checked TIMESTAMPTZ NOT NULL DEFAULT now(),
   stage        INT NOT NULL DEFAULT 1,
   notes        TEXT,
-  meta         JSONB
+  meta         JSONB,
+  lease_until  TIMESTAMPTZ,               -- bot worker claim (FOR UPDATE SKIP LOCKED queue)
+  leased_by    TEXT
 );
 CREATE INDEX IF NOT EXISTS idx_token_stage ON token_lifecycle(stage);
 CREATE INDEX IF NOT EXISTS idx_token_last_checked ON token_lifecycle(last_checked DESC);
+CREATE INDEX IF NOT EXISTS idx_token_stage_checked ON token_lifecycle(stage, last_checked);
 
 -- hot keywords (trends/news). scores decay over time in trends.py
 CREATE TABLE IF NOT EXISTS hot_keywords (
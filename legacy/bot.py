@@ -1,7 +1,7 @@
-import os, time, json, math, requests, collections
+import os, time, json, math, socket, requests, collections
 from dotenv import load_dotenv
 import psycopg2
-from psycopg2.extras import RealDictCursor, Json as PgJson
+from psycopg2.extras import RealDictCursor, Json as PgJson, execute_values
 
 load_dotenv()
 
@@ -10,6 +10,11 @@ SMOKE_TEST = True
 CHAIN            = "solana"
 LOOP_SECONDS     = 60
 BATCH_LIMIT      = 30
+PAIRS_PER_REQUEST = 30          # Dexscreener takes up to 30 comma-separated pair addresses
+PRUNE_EVERY_SEC  = 60*60        # scan_events 7-day retention, applied outside tick()
+ROLLUP_KEEP_DAYS = 90           # per-minute scan rollups are tiny; keep them longer
+LEASE_SECONDS    = 180          # claimed candidates go back to the queue if a worker dies
+WORKER_ID        = os.getenv("BOT_WORKER_ID") or f"{socket.gethostname()}:{os.getpid()}"
 
 MIN_LIQ_USD      = 2000 if not SMOKE_TEST else 300
 MIN_FDV_USD      = 30000 if not SMOKE_TEST else 8000
@@ -33,6 +38,7 @@ TREND_MAX_BOOST       = 10.0
 
 DISCORD_WEBHOOK = os.getenv("DISCORD_WEBHOOK")
 DEX_API         = "https://api.dexscreener.com"
+SESSION         = requests.Session()
 
 # ---------- DB ----------
 def db():
@@ -51,142 +57,241 @@ def lifecycle_stats(conn):
         rows = cur.fetchall()
     return {r["stage"]: r["c"] for r in rows}
 
-def next_candidates(conn):
+def ensure_schema(conn):
+    """Lease columns + queue index on older databases (db.sql has them for new ones)."""
     with conn.cursor() as cur:
+        cur.execute("ALTER TABLE token_lifecycle ADD COLUMN IF NOT EXISTS lease_until TIMESTAMPTZ")
+        cur.execute("ALTER TABLE token_lifecycle ADD COLUMN IF NOT EXISTS leased_by TEXT")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_token_stage_checked ON token_lifecycle(stage, last_checked)")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_call_outcomes_call ON call_outcomes(call_id)")
         cur.execute("""
-          SELECT pair_address
-          FROM token_lifecycle
-          WHERE stage IN (1,2)
-          ORDER BY last_checked ASC
-          LIMIT %s
-        """, (BATCH_LIMIT,))
-        rows = cur.fetchall()
+          CREATE TABLE IF NOT EXISTS scan_stage_minute (
+            minute TIMESTAMPTZ NOT NULL, stage TEXT NOT NULL, n INT NOT NULL,
+            PRIMARY KEY (minute, stage))
+        """)
+        cur.execute("""
+          CREATE TABLE IF NOT EXISTS scan_reason_minute (
+            minute TIMESTAMPTZ NOT NULL, reason TEXT NOT NULL, n INT NOT NULL,
+            PRIMARY KEY (minute, reason))
+        """)
+        # workers starting together: only the first to get the lock seeds (released on commit)
+        cur.execute("SELECT pg_advisory_xact_lock(hashtext('scan_rollup_seed'))")
+        cur.execute("SELECT EXISTS (SELECT 1 FROM scan_stage_minute) AS has")
+        if not cur.fetchone()["has"]:
+            # first run with rollups: seed them from the events still retained
+            cur.execute("""
+              INSERT INTO scan_stage_minute (minute, stage, n)
+              SELECT date_trunc('minute', seen_at), stage, count(*) FROM scan_events GROUP BY 1, 2
+            """)
+            cur.execute("""
+              INSERT INTO scan_reason_minute (minute, reason, n)
+              SELECT date_trunc('minute', seen_at), r, count(*)
+              FROM scan_events, jsonb_array_elements_text(COALESCE(reasons,'[]'::jsonb)) AS r
+              WHERE stage='base_reject' GROUP BY 1, 2
+            """)
+    conn.commit()
+
+def _claim(cur, where, order):
+    # FOR UPDATE SKIP LOCKED: concurrent workers never block on, or claim, the same rows.
+    # Rows checked within the last loop are skipped, so a full batch only repeats on real backlog.
+    cur.execute(f"""
+      WITH c AS (
+        SELECT pair_address
+        FROM token_lifecycle
+        WHERE {where} AND (lease_until IS NULL OR lease_until < now())
+          AND (last_checked IS NULL OR last_checked < now() - %s * interval '1 second')
+        ORDER BY {order}
+        LIMIT %s
+        FOR UPDATE SKIP LOCKED
+      )
+      UPDATE token_lifecycle t
+      SET lease_until = now() + %s * interval '1 second', leased_by = %s
+      FROM c WHERE t.pair_address = c.pair_address
+      RETURNING t.pair_address
+    """, (LOOP_SECONDS, BATCH_LIMIT, LEASE_SECONDS, WORKER_ID))
+    return [r["pair_address"] for r in cur.fetchall()]
+
+def next_candidates(conn):
+    """Claim up to BATCH_LIMIT pairs for this worker (leased for LEASE_SECONDS)."""
+    with conn.cursor() as cur:
+        rows = _claim(cur, "stage IN (1,2)", "last_checked ASC")
         if not rows:
             # fallback: take most recent first_seen, any stage except 0 (never recheck) & 4 (dead)
-            cur.execute("""
-              SELECT pair_address
-              FROM token_lifecycle
-              WHERE COALESCE(stage,1) NOT IN (0,4)
-              ORDER BY first_seen DESC
-              LIMIT %s
-            """, (BATCH_LIMIT,))
-            rows = cur.fetchall()
-    return [r["pair_address"] for r in rows]
+            rows = _claim(cur, "COALESCE(stage,1) NOT IN (0,4)", "first_seen DESC")
+    conn.commit()
+    return rows
+
+def release(cur, pair_addresses):
+    """Hand claimed pairs back (also the ones Dexscreener returned nothing for)."""
+    cur.execute("""
+      UPDATE token_lifecycle SET lease_until=NULL, leased_by=NULL, last_checked=now()
+      WHERE pair_address = ANY(%s) AND leased_by = %s
+    """, (list(pair_addresses), WORKER_ID))
 
 def set_stage(conn, pair_address, stage, notes=None, meta=None):
     with conn.cursor() as cur:
         cur.execute("""
           UPDATE token_lifecycle
-          SET stage=%s, last_checked=now(), notes=COALESCE(%s, notes), meta=COALESCE(%s, meta)
+          SET stage=%s, last_checked=now(), notes=COALESCE(%s, notes), meta=COALESCE(%s, meta),
+              lease_until=NULL, leased_by=NULL
           WHERE pair_address=%s
         """, (stage, notes, PgJson(meta) if meta is not None else None, pair_address))
     conn.commit()
 
+def _event_row(stage, p=None, reasons=None, score=None):
+    return (
+      stage,
+      (p or {}).get("pairAddress"),
+      (p or {}).get("chainId"),
+      (p or {}).get("dexId"),
+      ((p or {}).get("baseToken") or {}).get("symbol"),
+      score,
+      json.dumps(reasons or [])
+    )
+
+def insert_scan_events(cur, events):
+    """Insert _event_row tuples and bump the per-minute stage / reject-reason rollups."""
+    if not events: return
+    execute_values(cur, """
+      INSERT INTO scan_events (stage, pair_address, chain, dex, symbol, score, reasons)
+      VALUES %s
+    """, events)
+    stages = collections.Counter(e[0] for e in events)
+    reasons = collections.Counter(r for e in events if e[0] == "base_reject" for r in json.loads(e[6]))
+    # seen_at defaults to now() (transaction time), so every event here lands in this minute.
+    # Rows go in key order so concurrent workers lock the same rollup rows in the same order.
+    execute_values(cur, """
+      INSERT INTO scan_stage_minute (minute, stage, n) VALUES %s
+      ON CONFLICT (minute, stage) DO UPDATE SET n = scan_stage_minute.n + EXCLUDED.n
+    """, sorted(stages.items()), template="(date_trunc('minute', now()), %s, %s)")
+    if reasons:
+        execute_values(cur, """
+          INSERT INTO scan_reason_minute (minute, reason, n) VALUES %s
+          ON CONFLICT (minute, reason) DO UPDATE SET n = scan_reason_minute.n + EXCLUDED.n
+        """, sorted(reasons.items()), template="(date_trunc('minute', now()), %s, %s)")
+
 def log_scan_event(conn, stage, p=None, reasons=None, score=None):
     with conn.cursor() as cur:
-        cur.execute("""
-          INSERT INTO scan_events (stage, pair_address, chain, dex, symbol, score, reasons)
-          VALUES (%s,%s,%s,%s,%s,%s,%s)
-        """, (
-          stage,
-          (p or {}).get("pairAddress"),
-          (p or {}).get("chainId"),
-          (p or {}).get("dexId"),
-          ((p or {}).get("baseToken") or {}).get("symbol"),
-          score,
-          json.dumps(reasons or [])
-        ))
+        insert_scan_events(cur, [_event_row(stage, p, reasons, score)])
+    conn.commit()
+
+def prune_scan_events(conn):
+    with conn.cursor() as cur:
         cur.execute("DELETE FROM scan_events WHERE seen_at < now() - interval '7 days'")
+        n = cur.rowcount
+        for t in ("scan_stage_minute", "scan_reason_minute"):
+            cur.execute(f"DELETE FROM {t} WHERE minute < now() - %s * interval '1 day'", (ROLLUP_KEEP_DAYS,))
     conn.commit()
+    print(f"[DB] pruned {n} scan events")
 
-def already_called(conn, pair_address, new_score):
+def last_calls(conn, pair_addresses):
+    """{pair_address: (last score, called within ANTI_SPAM_MINUTES)} in one query."""
+    if not pair_addresses: return {}
     with conn.cursor() as cur:
         cur.execute("""
-            SELECT score, called_at
+            SELECT DISTINCT ON (pair_address) pair_address, score,
+                   now() - called_at < %s * interval '1 minute' AS recent
             FROM calls
-            WHERE pair_address = %s
-            ORDER BY called_at DESC
-            LIMIT 1
-        """, (pair_address,))
-        row = cur.fetchone()
-    if not row: return False
-    last_score = float(row["score"]) if row["score"] is not None else None
-    with conn.cursor() as cur:
-        cur.execute("SELECT now() - %s < interval %s AS recent",
-                    (row["called_at"], f"{ANTI_SPAM_MINUTES} minutes"))
-        recent = cur.fetchone()["recent"]
+            WHERE pair_address = ANY(%s)
+            ORDER BY pair_address, called_at DESC
+        """, (ANTI_SPAM_MINUTES, list(pair_addresses)))
+        rows = cur.fetchall()
+    return {r["pair_address"]: (float(r["score"]) if r["score"] is not None else None, r["recent"])
+            for r in rows}
+
+def already_called(last, new_score):
+    """last: entry from last_calls() or None."""
+    if not last: return False
+    last_score, recent = last
     if recent: return True
     if last_score is not None and abs(last_score - new_score) < SCORE_JUMP_TO_REPOST: return True
     return False
 
-def log_calls_and_seed_outcomes(conn, cards):
+def _call_row(p):
+    return (
+        p.get('baseToken',{}).get('address'),
+        p.get('pairAddress'),
+        p.get('_score'),
+        (p.get('liquidity') or {}).get('usd', 0),
+        (p.get('fdv') or 0),
+        (p.get('priceChange') or {}).get('m5', 0),
+        (p.get('priceChange') or {}).get('h1', 0),
+        json.dumps(p)
+    )
+
+def log_calls_and_seed_outcomes(cur, cards):
+    """Insert calls + seed outcomes for the top 5 cards on cur (caller commits)."""
+    cards = cards[:5]
     if not cards: return
+    called = execute_values(cur, """
+        INSERT INTO calls
+          (token_mint, pair_address, score, liq_usd, fdv_usd, pchg_5m, pchg_1h, meta)
+        VALUES %s
+        ON CONFLICT (pair_address) DO UPDATE
+          SET score=EXCLUDED.score, liq_usd=EXCLUDED.liq_usd, fdv_usd=EXCLUDED.fdv_usd, meta=EXCLUDED.meta
+        RETURNING id, pair_address, called_at
+    """, [_call_row(p) for p in cards], fetch=True)
+    by_pair = {p.get("pairAddress"): p for p in cards}
+    rows = []
+    for r in called:
+        p = by_pair[r["pair_address"]]
+        price_now = float(p.get("priceUsd") or p.get("priceNative") or 0)
+        rows.append((r["id"], r["pair_address"], p.get('baseToken',{}).get('address'),
+                     r["called_at"], price_now, r["called_at"], r["called_at"]))
+    execute_values(cur, """
+        INSERT INTO call_outcomes
+          (call_id, pair_address, token_mint, called_at, price_at_call, due_15m, due_1h)
+        VALUES %s
+    """, rows, template="(%s,%s,%s,%s,%s, %s + interval '15 minutes', %s + interval '1 hour')")
+    cur.execute("UPDATE token_lifecycle SET stage=3, last_checked=now() WHERE pair_address = ANY(%s)",
+                (list(by_pair),))
+    print(f"[DB] Logged {len(cards)} calls + seeded outcomes")
+
+def write_tick(conn, stages, events, cards, claimed=()):
+    """
+    One transaction for everything a tick decided; releases this worker's leases.
+    stages: (pair_address, stage, notes); events: _event_row tuples; cards: posted pairs
+    """
     with conn.cursor() as cur:
-        for p in cards[:5]:
-            cur.execute("""
-                INSERT INTO calls
-                  (token_mint, pair_address, score, liq_usd, fdv_usd, pchg_5m, pchg_1h, meta)
-                VALUES (%s,%s,%s,%s,%s,%s,%s,%s)
-                ON CONFLICT (pair_address) DO UPDATE
-                  SET score=EXCLUDED.score, liq_usd=EXCLUDED.liq_usd, fdv_usd=EXCLUDED.fdv_usd, meta=EXCLUDED.meta
-                RETURNING id, called_at
-            """, (
-                p.get('baseToken',{}).get('address'),
-                p.get('pairAddress'),
-                p.get('_score'),
-                (p.get('liquidity') or {}).get('usd', 0),
-                (p.get('fdv') or 0),
-                (p.get('priceChange') or {}).get('m5', 0),
-                (p.get('priceChange') or {}).get('h1', 0),
-                json.dumps(p)
-            ))
-            call_id, called_at = cur.fetchone()
-            price_now = float(p.get("priceUsd") or p.get("priceNative") or 0)
-            cur.execute("""
-                INSERT INTO call_outcomes
-                  (call_id, pair_address, token_mint, called_at, price_at_call, due_15m, due_1h)
-                VALUES
-                  (%s,%s,%s,%s,%s, %s + interval '15 minutes', %s + interval '1 hour')
-            """, (
-                call_id,
-                p.get("pairAddress"),
-                p.get('baseToken',{}).get('address'),
-                called_at,
-                price_now,
-                called_at,
-                called_at
-            ))
-            cur.execute("UPDATE token_lifecycle SET stage=3, last_checked=now() WHERE pair_address=%s",
-                        (p.get("pairAddress"),))
+        if claimed:
+            release(cur, claimed)
+        if stages:
+            execute_values(cur, """
+              UPDATE token_lifecycle AS t
+              SET stage=v.stage, last_checked=now(), notes=COALESCE(v.notes, t.notes),
+                  lease_until=NULL, leased_by=NULL
+              FROM (VALUES %s) AS v(pair_address, stage, notes)
+              WHERE t.pair_address = v.pair_address
+            """, stages, template="(%s, %s::int, %s::text)")
+        insert_scan_events(cur, events)
+        log_calls_and_seed_outcomes(cur, cards)
     conn.commit()
-    print(f"[DB] Logged {len(cards[:5])} calls + seeded outcomes")
 
 # ---------- Fetch & score ----------
 def get_pairs_details(addresses):
     """
-    Dexscreener supports a few formats. We'll try two:
-    1) /latest/dex/pairs/<PAIR_ADDRESS>
-    2) /latest/dex/pairs/solana/<PAIR_ADDRESS>
-    This avoids 404s due to path variations.
+    Pair details for many addresses, PAIRS_PER_REQUEST per call:
+    /latest/dex/pairs/solana/<a>,<b>,... (the unqualified path is the fallback
+    if a whole batch fails). Pairs Dexscreener doesn't know are left out.
     """
-    out = []
-    for addr in addresses:
-        ok = False
-        for url in (f"{DEX_API}/latest/dex/pairs/{addr}",
-                    f"{DEX_API}/latest/dex/pairs/{CHAIN}/{addr}"):
+    out = {}
+    addresses = list(dict.fromkeys(a for a in addresses if a))
+    for i in range(0, len(addresses), PAIRS_PER_REQUEST):
+        chunk = addresses[i:i+PAIRS_PER_REQUEST]
+        joined = ",".join(chunk)
+        for url in (f"{DEX_API}/latest/dex/pairs/{CHAIN}/{joined}",
+                    f"{DEX_API}/latest/dex/pairs/{joined}"):
             try:
-                r = requests.get(url, timeout=15)
+                r = SESSION.get(url, timeout=15)
                 if r.status_code != 200: continue
-                pairs = r.json().get("pairs") or []
-                if pairs:
-                    out.append(pairs[0]); ok = True
-                    break
+                wanted = set(chunk)
+                for p in (r.json().get("pairs") or []):
+                    if p.get("pairAddress") in wanted:
+                        out.setdefault(p["pairAddress"], p)
+                break
             except Exception:
                 pass
-        if not ok:
-            # mark as watch; we'll retry later
-            pass
-    return out
+    return [out[a] for a in addresses if a in out]
 
 
 def clamp01(x): return max(0.0, min(1.0, x))
@@ -208,12 +313,15 @@ def feature_extract(p, now_ms):
     spike   = (v5m/baseline_5m) if baseline_5m>0 else 0
     return age_min, liq, fdv, pc5, pc1h, buys5, sells5, imb, v5m, v24h, spike
 
-def trend_boost(conn, p):
-    sym = (p.get("baseToken") or {}).get("symbol","").lower()
-    name = (p.get("info") or {}).get("name","").lower()
+def hot_keywords(conn):
     with conn.cursor() as cur:
         cur.execute("SELECT term, score FROM hot_keywords ORDER BY score DESC LIMIT 50")
-        kws = cur.fetchall()
+        return cur.fetchall()
+
+def trend_boost(kws, p):
+    """kws: hot_keywords() rows, loaded once per tick."""
+    sym = (p.get("baseToken") or {}).get("symbol","").lower()
+    name = (p.get("info") or {}).get("name","").lower()
     boost = 0.0
     hits = []
     for k in kws:
@@ -323,16 +431,18 @@ def tick(conn):
     print("[Diag] lifecycle counts:", stats)
 
     addrs = next_candidates(conn)
-    print(f"[Diag] candidate addresses: {len(addrs)}")
+    print(f"[Diag] {WORKER_ID} claimed {len(addrs)} candidate addresses")
     if not addrs:
         print("[Select] No candidates. Collector might not be writing to the same DB.")
-        return
+        return 0
 
     now_ms = int(time.time()*1000)
     details = get_pairs_details(addrs)
     print(f"[Dex] fetched details for {len(details)} pairs")
 
-    chosen = []
+    kws = hot_keywords(conn)
+    chosen, gated = [], []
+    stages, events = [], []
     reject_tally = collections.Counter()
 
     for p in details:
@@ -346,15 +456,15 @@ def tick(conn):
         if reasons:
             for r in reasons: reject_tally[r] += 1
             print(f"[Reject] {p.get('baseToken',{}).get('symbol','?')} — {', '.join(reasons)}")
-            log_scan_event(conn, "base_reject", p=p, reasons=reasons)
+            events.append(_event_row("base_reject", p=p, reasons=reasons))
             if (p.get("liquidity") or {}).get("usd",0) < 200 and (p.get("fdv",0) or 0) < 5000:
-                set_stage(conn, pair_addr, 0, notes="hard-trash")
+                stages.append((pair_addr, 0, "hard-trash"))
             else:
-                set_stage(conn, pair_addr, 1)
+                stages.append((pair_addr, 1, None))
             continue
 
         feats = feature_extract(p, now_ms)
-        tboost = trend_boost(conn, p)
+        tboost = trend_boost(kws, p)
         score  = score_pair(p, feats, base_boost=tboost)
         is_new     = (feats[0] < NEW_MAX_AGE_MIN)
         is_revival = (feats[0] >= REVIVAL_MIN_AGE_MIN)
@@ -365,18 +475,22 @@ def tick(conn):
 
         if not (ok_new or ok_revival):
             reject_tally["rules_fail"] += 1
-            set_stage(conn, pair_addr, 1, notes="rule-fail")
-            log_scan_event(conn, "base_reject", p=p, reasons=["rules_fail"], score=score)
+            stages.append((pair_addr, 1, "rule-fail"))
+            events.append(_event_row("base_reject", p=p, reasons=["rules_fail"], score=score))
             continue
+        gated.append(p)
 
-        if already_called(conn, pair_addr, score):
+    last = last_calls(conn, [p.get("pairAddress") for p in gated])
+    for p in gated:
+        pair_addr, score = p.get("pairAddress"), p["_score"]
+        if already_called(last.get(pair_addr), score):
             reject_tally["anti_spam"] += 1
-            log_scan_event(conn, "base_reject", p=p, reasons=["anti_spam"], score=score)
-            set_stage(conn, pair_addr, 2, notes="qualified-anti-spam")
+            events.append(_event_row("base_reject", p=p, reasons=["anti_spam"], score=score))
+            stages.append((pair_addr, 2, "qualified-anti-spam"))
             continue
 
-        log_scan_event(conn, "qualified", p=p, score=score)
-        set_stage(conn, pair_addr, 2, notes="qualified")
+        events.append(_event_row("qualified", p=p, score=score))
+        stages.append((pair_addr, 2, "qualified"))
         chosen.append(p)
 
     if reject_tally:
@@ -386,26 +500,41 @@ def tick(conn):
     print(f"[Select] {len(chosen)} qualified to post")
 
     if chosen:
-        post_discord(chosen)
-        log_calls_and_seed_outcomes(conn, chosen)
+        try:
+            post_discord(chosen)
+        except Exception as e:
+            # still record the tick; unposted pairs stay qualified and come back next round
+            print("[Discord] post failed:", e)
+            chosen = []
         for p in chosen:
-            log_scan_event(conn, "posted", p=p, score=p.get("_score"))
+            events.append(_event_row("posted", p=p, score=p.get("_score")))
     else:
         print("[Select] Nothing to post this tick")
 
+    write_tick(conn, stages, events, chosen, claimed=addrs)
+    return len(addrs)
+
 # ---------- Main ----------
 if __name__ == "__main__":
     conn = None
+    last_prune = 0.0
     while True:
+        claimed = 0
         try:
             if conn is None or conn.closed != 0:
                 conn = db()
+                ensure_schema(conn)
                 print("[DB] Connected")
-            tick(conn)
+            claimed = tick(conn)
+            if time.time() - last_prune > PRUNE_EVERY_SEC:
+                prune_scan_events(conn)
+                last_prune = time.time()
         except Exception as e:
             print("Error:", e)
             try:
                 if conn: conn.close()
             except: pass
             conn = None
-        time.sleep(LOOP_SECONDS)
+        # a full batch means there is a backlog: go again instead of waiting a whole loop
+        if claimed < BATCH_LIMIT:
+            time.sleep(LOOP_SECONDS)
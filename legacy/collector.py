@@ -1,8 +1,12 @@
-import os, time, requests, psycopg2
+import os, sys, time, requests, psycopg2
 from psycopg2.extras import RealDictCursor, Json as PgJson
 from dotenv import load_dotenv
 
 load_dotenv()
+
+# make core.* importable when started directly from legacy/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.snapshot import SnapshotDiffer  # noqa: E402
 DEX_API = "https://api.dexscreener.com"
 CHAIN = "solana"
 POLL_SECONDS = 15  # not too fast; Dexscreener rate limits hard
@@ -48,17 +52,21 @@ if __name__ == "__main__":
     print("[Collector] DB =", os.getenv("PGUSER","postgres"), "@", os.getenv("PGHOST","localhost"),
           os.getenv("PGDATABASE","memebot"))
     conn = None
+    differ = SnapshotDiffer()
     while True:
         try:
             if conn is None or conn.closed != 0:
                 conn = db()
                 print("[Collector] DB connected")
-            pairs = fetch_pairs_search()
-            print(f"[Collector] fetched {len(pairs)} pairs from search")
+            polled = fetch_pairs_search()
+            # staged only: committed once every pair below is upserted, so a DB error retries them
+            pairs = differ.changes(polled)
+            print(f"[Collector] fetched {len(polled)} pairs from search, {len(pairs)} new/changed")
             for p in pairs:
                 # Only keep Solana (search sometimes returns cross-chain)
                 if p.get("chainId") != CHAIN: continue
                 upsert_lifecycle(conn, p)
+            differ.commit()
         except Exception as e:
             print("Collector error:", e)
             try:
@@ -1,9 +1,13 @@
-import os, time, requests, psycopg2
+import os, sys, time, requests, psycopg2
 from psycopg2.extras import RealDictCursor, Json as PgJson
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# make core.* importable when started directly from legacy/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.snapshot import SnapshotDiffer  # noqa: E402
+
 CHAIN = "solana"
 DEX_API = "https://api.dexscreener.com"
 POLL_SECONDS = 20   # how often we poll
@@ -56,19 +60,23 @@ def upsert_lifecycle(conn, pair):
 if __name__ == "__main__":
     print("[Collector-DexNew] starting (freshest Solana pairs)")
     conn = None
+    differ = SnapshotDiffer()
     while True:
         try:
             if conn is None or conn.closed != 0:
                 conn = db()
                 print("[Collector-DexNew] DB connected")
 
-            pairs = fetch_new_pairs()
-            print(f"[Collector-DexNew] fetched {len(pairs)} pairs")
+            polled = fetch_new_pairs()
+            # staged only: committed once every pair below is upserted, so a DB error retries them
+            pairs = differ.changes(polled)
+            print(f"[Collector-DexNew] fetched {len(polled)} pairs, {len(pairs)} new/changed")
 
             for p in pairs:
                 if p.get("chainId") != CHAIN: 
                     continue
                 upsert_lifecycle(conn, p)
+            differ.commit()
 
         except Exception as e:
             print("Collector-DexNew error:", e)
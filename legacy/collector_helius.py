@@ -1,6 +1,7 @@
 # collector_helius.py (patched: dry-run + safe commit)
 import os, time, requests, psycopg2
-from psycopg2.extras import RealDictCursor, Json as PgJson
+from concurrent.futures import ThreadPoolExecutor
+from psycopg2.extras import RealDictCursor, Json as PgJson, execute_values
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -30,6 +31,10 @@ DEX_API = "https://api.dexscreener.com"
 POLL_SECONDS = 5            # aggressive polling for fresh launches
 MAX_ATTEMPTS = 12           # retry attempts for pending mints (12 * 5s = 60s)
 SIG_LIMIT = 16              # how many recent Raydium signatures to fetch per tick
+TOKENS_PER_REQUEST = 30     # Dexscreener /tokens takes up to 30 comma-separated mints
+DEX_WORKERS = 4             # token batches in flight
+
+SESSION = requests.Session()
 
 # Raydium AMM Program (where new pools are created)
 RAY_AMM = "675kPX9MHTjS2zt1qfr1NYHuzP9Lj1xFLh3WFSjr4cX"
@@ -74,35 +79,58 @@ def ensure_tables(conn):
         """)
     safe_commit(conn)
 
-def mint_already_seen(conn, mint):
-    with conn.cursor() as cur:
-        cur.execute("SELECT 1 FROM seen_mints WHERE mint=%s", (mint,))
-        return cur.fetchone() is not None
-
-def mark_mint_seen(conn, mint):
-    with conn.cursor() as cur:
-        cur.execute("INSERT INTO seen_mints (mint) VALUES (%s) ON CONFLICT DO NOTHING", (mint,))
-    safe_commit(conn)
-
 def get_pending(conn):
     with conn.cursor() as cur:
         cur.execute("SELECT mint, attempts FROM pending_mints ORDER BY last_try ASC LIMIT 200")
         return cur.fetchall()
 
-def upsert_pending(conn, mint, attempts):
-    with conn.cursor() as cur:
-        cur.execute("""
-          INSERT INTO pending_mints (mint, attempts, last_try)
-          VALUES (%s,%s,now())
-          ON CONFLICT (mint) DO UPDATE
-            SET attempts = EXCLUDED.attempts,
-                last_try = now()
-        """, (mint, attempts))
-    safe_commit(conn)
+def seen_among(cur, mints):
+    """Subset of mints already in seen_mints (one query)."""
+    if not mints:
+        return set()
+    cur.execute("SELECT mint FROM seen_mints WHERE mint = ANY(%s)", (list(mints),))
+    return {r["mint"] for r in cur.fetchall()}
 
-def remove_pending(conn, mint):
+def pending_attempts(cur, mints):
+    if not mints:
+        return {}
+    cur.execute("SELECT mint, attempts FROM pending_mints WHERE mint = ANY(%s)", (list(mints),))
+    return {r["mint"]: r["attempts"] for r in cur.fetchall()}
+
+def _lifecycle_row(pair):
+    base = pair.get("baseToken") or {}
+    return (pair.get("pairAddress"), base.get("symbol"), base.get("address"), PgJson(pair))
+
+def apply_tick(conn, pairs, seen, pending, drop_pending):
+    """
+    One transaction for a whole tick.
+    pairs: resolved Dexscreener pairs -> token_lifecycle; seen: mints -> seen_mints;
+    pending: {mint: attempts} still waiting; drop_pending: mints leaving pending_mints
+    """
     with conn.cursor() as cur:
-        cur.execute("DELETE FROM pending_mints WHERE mint=%s", (mint,))
+        if pairs:
+            execute_values(cur, """
+              INSERT INTO token_lifecycle (pair_address, symbol, token_mint, stage, meta)
+              VALUES %s
+              ON CONFLICT (pair_address) DO UPDATE
+                SET symbol = COALESCE(EXCLUDED.symbol, token_lifecycle.symbol),
+                    token_mint = COALESCE(EXCLUDED.token_mint, token_lifecycle.token_mint),
+                    stage = COALESCE(token_lifecycle.stage, 1),
+                    last_checked = now(),
+                    meta = EXCLUDED.meta
+            """, [_lifecycle_row(p) for p in pairs], template="(%s,%s,%s,1,%s)")
+        if seen:
+            execute_values(cur, "INSERT INTO seen_mints (mint) VALUES %s ON CONFLICT DO NOTHING",
+                           [(m,) for m in seen])
+        if drop_pending:
+            cur.execute("DELETE FROM pending_mints WHERE mint = ANY(%s)", (list(drop_pending),))
+        if pending:
+            execute_values(cur, """
+              INSERT INTO pending_mints (mint, attempts, last_try) VALUES %s
+              ON CONFLICT (mint) DO UPDATE
+                SET attempts = EXCLUDED.attempts,
+                    last_try = now()
+            """, list(pending.items()), template="(%s,%s,now())")
     safe_commit(conn)
 
 # ----------------- Helius RPC helpers -----------------
@@ -165,44 +193,78 @@ def decode_mints_from_sigs(sigs):
     return list(mints)
 
 # ----------------- Dexscreener helpers -----------------
-def best_pair_for_mint(mint):
-    """Ask Dexscreener for token pairs for this mint (choose best SOL pair by liquidity)."""
+def _best_pairs_chunk(chunk):
+    out = {}
     try:
-        r = requests.get(f"{DEX_API}/latest/dex/tokens/{mint}", timeout=10)
+        r = SESSION.get(f"{DEX_API}/latest/dex/tokens/{','.join(chunk)}", timeout=10)
         if r.status_code != 200:
-            return None
-        pairs = r.json().get("pairs") or []
-        sol_pairs = [p for p in pairs if p.get("chainId") == CHAIN]
-        if not sol_pairs:
-            return None
-        # choose pair with highest USD liquidity
-        return max(sol_pairs, key=lambda p: float((p.get("liquidity") or {}).get("usd", 0) or 0))
-    except Exception:
-        return None
+            return out
+        wanted = set(chunk)
+        for p in (r.json().get("pairs") or []):
+            mint = (p.get("baseToken") or {}).get("address")
+            if p.get("chainId") != CHAIN or mint not in wanted:
+                continue
+            liq = float((p.get("liquidity") or {}).get("usd", 0) or 0)
+            if mint not in out or liq > float((out[mint].get("liquidity") or {}).get("usd", 0) or 0):
+                out[mint] = p
+    except Exception as e:
+        logging.warning("[Collector-Helius] Dexscreener batch failed: %s", e)
+    return out
 
-def upsert_lifecycle(conn, pair):
-    """Insert the pair (so bot can evaluate it)."""
-    if not pair:
-        return False
-    pair_address = pair.get("pairAddress")
-    if not pair_address:
-        return False
-    symbol = (pair.get("baseToken") or {}).get("symbol")
-    mint = (pair.get("baseToken") or {}).get("address")
+def best_pairs_for_mints(mints):
+    """{mint: best SOL pair} for many mints: 30 per request, DEX_WORKERS requests in flight."""
+    mints = list(dict.fromkeys(mints))
+    chunks = [mints[i:i+TOKENS_PER_REQUEST] for i in range(0, len(mints), TOKENS_PER_REQUEST)]
+    out = {}
+    with ThreadPoolExecutor(max_workers=DEX_WORKERS) as ex:
+        for got in ex.map(_best_pairs_chunk, chunks):
+            out.update(got)
+    return out
+
+def tick(conn):
+    # 1) fetch recent Raydium signatures
+    sigs = fetch_new_pool_sigs(limit=SIG_LIMIT)
+    logging.info(f"[Collector-Helius] fetched {len(sigs)} signatures")
+
+    # 2) decode potential mints from those sigs
+    mints = decode_mints_from_sigs(sigs)
+    logging.info(f"[Collector-Helius] decoded {len(mints)} candidate mints: {mints[:6]}")
+    to_process = mints[:LIMIT] if LIMIT and len(mints) > LIMIT else mints
+
+    # 3) new mints + the pending table (in case new pairs appeared), checked in bulk
+    pending_rows = get_pending(conn)
+    candidates = list(dict.fromkeys(to_process + [r["mint"] for r in pending_rows]))
     with conn.cursor() as cur:
-        cur.execute("""
-          INSERT INTO token_lifecycle (pair_address, symbol, token_mint, stage, meta)
-          VALUES (%s,%s,%s,1,%s)
-          ON CONFLICT (pair_address) DO UPDATE
-            SET symbol = COALESCE(EXCLUDED.symbol, token_lifecycle.symbol),
-                token_mint = COALESCE(EXCLUDED.token_mint, token_lifecycle.token_mint),
-                stage = COALESCE(token_lifecycle.stage, 1),
-                last_checked = now(),
-                meta = EXCLUDED.meta
-        """, (pair_address, symbol, mint, PgJson(pair)))
-    safe_commit(conn)
-    logging.info(f"[Collector-Helius] SAVED pair -> {symbol} {pair_address}")
-    return True
+        already = seen_among(cur, candidates)
+        attempts = pending_attempts(cur, candidates)
+    drop = {m for m in already if m in attempts}
+    todo = [m for m in candidates if m not in already]
+    if pending_rows:
+        logging.info(f"[Collector-Helius] rechecking {len(pending_rows)} pending mints")
+
+    # 4) resolve all of them concurrently, then write the tick in one transaction
+    pairs = best_pairs_for_mints(todo) if todo else {}
+    saved, seen, pending = {}, set(), {}
+    for mint in todo:
+        pair = pairs.get(mint)
+        if pair and pair.get("pairAddress"):
+            saved[pair["pairAddress"]] = pair
+            seen.add(mint)
+            drop.add(mint)
+            logging.info(f"[Collector-Helius] SAVED pair -> {(pair.get('baseToken') or {}).get('symbol')} "
+                         f"{pair['pairAddress']}")
+            continue
+        n = attempts.get(mint, 0) + 1
+        if n >= MAX_ATTEMPTS:
+            # give up: mark seen (we won't re-check forever)
+            seen.add(mint)
+            drop.add(mint)
+            logging.info(f"[Collector-Helius] GIVE UP on {mint} after {n} attempts (no Dex pair)")
+        else:
+            pending[mint] = n
+    apply_tick(conn, list(saved.values()), seen, pending, drop)
+    logging.info(f"[Collector-Helius] tick: saved={len(saved)} pending={len(pending)} "
+                 f"skipped_seen={len(already)}")
 
 # ----------------- Main loop -----------------
 if __name__ == "__main__":
@@ -215,57 +277,7 @@ if __name__ == "__main__":
                 ensure_tables(conn)
                 logging.info("[Collector-Helius] DB connected")
 
-            # 1) fetch recent Raydium signatures
-            sigs = fetch_new_pool_sigs(limit=SIG_LIMIT)
-            logging.info(f"[Collector-Helius] fetched {len(sigs)} signatures")
-
-            # 2) decode potential mints from those sigs
-            mints = decode_mints_from_sigs(sigs)
-            logging.info(f"[Collector-Helius] decoded {len(mints)} candidate mints: {mints[:6]}")
-
-            # 3) process each mint (respect LIMIT if provided)
-            to_process = mints[:LIMIT] if LIMIT and len(mints) > LIMIT else mints
-            for mint in to_process:
-                if mint_already_seen(conn, mint):
-                    continue
-
-                # try to resolve to a Dexscreener pair now
-                pair = best_pair_for_mint(mint)
-                if pair:
-                    ok = upsert_lifecycle(conn, pair)
-                    if ok:
-                        mark_mint_seen(conn, mint)
-                        remove_pending(conn, mint)
-                    continue
-
-                # no pair yet: bump pending attempts
-                with conn.cursor() as cur:
-                    cur.execute("SELECT attempts FROM pending_mints WHERE mint=%s", (mint,))
-                    row = cur.fetchone()
-                    attempts = (row["attempts"] if row else 0) + 1
-                if attempts >= MAX_ATTEMPTS:
-                    # give up: mark seen (we won't re-check forever)
-                    mark_mint_seen(conn, mint)
-                    remove_pending(conn, mint)
-                    logging.info(f"[Collector-Helius] GIVE UP on {mint} after {attempts} attempts (no Dex pair)")
-                else:
-                    upsert_pending(conn, mint, attempts)
-                    logging.info(f"[Collector-Helius] pending {mint} (attempt {attempts}/{MAX_ATTEMPTS})")
-
-            # 4) also reprocess pending table (in case new pairs appeared)
-            pending = get_pending(conn)
-            if pending:
-                logging.info(f"[Collector-Helius] rechecking {len(pending)} pending mints")
-            for row in pending:
-                mint = row["mint"]
-                if mint_already_seen(conn, mint):
-                    remove_pending(conn, mint)
-                    continue
-                pair = best_pair_for_mint(mint)
-                if pair:
-                    if upsert_lifecycle(conn, pair):
-                        mark_mint_seen(conn, mint)
-                        remove_pending(conn, mint)
+            tick(conn)
 
         except Exception as e:
             logging.exception("[Collector-Helius] unexpected error: %s", e)
@@ -45,34 +45,49 @@ def recent_scan_events(conn, limit=30):
         print(f"  {when}  {r['stage']:<10}  {r['sym']:<10}  score={sc}  {rs}")
 
 def reject_reasons(conn, hours=6, top=15):
+    # per-minute rollup (bot.insert_scan_events), not the raw events
     with conn.cursor() as cur:
-        cur.execute(f"""
-            WITH x AS (
-              SELECT jsonb_array_elements_text(COALESCE(reasons,'[]'::jsonb)) AS r
-              FROM scan_events
-              WHERE stage='base_reject' AND seen_at > now() - interval '{hours} hours'
-            )
-            SELECT r AS reason, COUNT(*) AS n FROM x GROUP BY r ORDER BY n DESC LIMIT %s
-        """, (top,))
+        cur.execute("""
+            SELECT reason, SUM(n) AS n
+            FROM scan_reason_minute
+            WHERE minute > now() - %s * interval '1 hour'
+            GROUP BY reason ORDER BY n DESC LIMIT %s
+        """, (hours, top))
         rows = cur.fetchall()
     print(f"\n[Top reject reasons] (last {hours}h)")
     for r in rows:
         print(f"  {r['reason']:<18}  {r['n']}")
 
+def stage_counts(conn, hours=6):
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT stage, SUM(n) AS n,
+                   SUM(n) FILTER (WHERE minute > now() - interval '1 hour') AS n_1h
+            FROM scan_stage_minute
+            WHERE minute > now() - %s * interval '1 hour'
+            GROUP BY stage ORDER BY n DESC
+        """, (hours,))
+        rows = cur.fetchall()
+    print(f"\n[Scan events by stage] (last {hours}h / last 1h)")
+    for r in rows:
+        print(f"  {r['stage']:<12}  {r['n']:>8}  {r['n_1h'] or 0:>6}")
+
 def last_calls(conn, limit=10):
+    # newest calls first, then their outcomes by call_id (not a scan of all call_outcomes)
     with conn.cursor() as cur:
         cur.execute("""
-            SELECT c.called_at, (c.meta->'baseToken'->>'symbol') AS sym,
-                   c.score, c.liq_usd, c.fdv_usd, co.p_gain_15m, co.p_gain_1h
-            FROM calls c
-            LEFT JOIN (
-                SELECT call_id,
-                       ROUND(100.0*gain_15m,2) AS p_gain_15m,
-                       ROUND(100.0*gain_1h,2) AS p_gain_1h
-                FROM call_outcomes
-            ) co ON co.call_id=c.id
+            WITH c AS (
+                SELECT id, called_at, (meta->'baseToken'->>'symbol') AS sym, score, liq_usd, fdv_usd
+                FROM calls
+                ORDER BY called_at DESC
+                LIMIT %s
+            )
+            SELECT c.called_at, c.sym, c.score, c.liq_usd, c.fdv_usd,
+                   ROUND((100.0*co.gain_15m)::numeric,2) AS p_gain_15m,
+                   ROUND((100.0*co.gain_1h)::numeric,2) AS p_gain_1h
+            FROM c
+            LEFT JOIN call_outcomes co ON co.call_id=c.id
             ORDER BY c.called_at DESC
-            LIMIT %s
         """, (limit,))
         rows = cur.fetchall()
     print(f"\n[Last {limit} calls]")
@@ -95,6 +110,7 @@ if __name__ == "__main__":
     print("[Inspector] DB =", os.getenv("PGUSER","postgres"), "@", os.getenv("PGHOST","localhost"),
           os.getenv("PGDATABASE","memebot"))
     lifecycle(conn)
+    stage_counts(conn, hours=args.hours)
     reject_reasons(conn, hours=args.hours, top=15)
     recent_scan_events(conn, limit=args.limit)
     last_calls(conn, limit=10)
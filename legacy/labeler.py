@@ -1,10 +1,18 @@
-import os, time, requests
+import os, time, argparse, requests
+from concurrent.futures import ThreadPoolExecutor
 import psycopg2
-from psycopg2.extras import RealDictCursor
+from psycopg2.extras import RealDictCursor, execute_values
 from dotenv import load_dotenv
 
 load_dotenv()
 DEX_API = "https://api.dexscreener.com"
+CHAIN = "solana"
+PAIRS_PER_REQUEST = 30      # Dexscreener takes up to 30 comma-separated pair addresses
+LOOKUP_WORKERS = 4
+NORMAL_LIMIT = 200          # due rows per horizon per 30s pass
+CATCHUP_PAGE = 2000         # due rows per horizon per catch-up round
+
+SESSION = requests.Session()
 
 def db():
     return psycopg2.connect(
@@ -16,61 +24,124 @@ def db():
         cursor_factory=RealDictCursor,
     )
 
-def price_now(pair_address):
-    r = requests.get(f"{DEX_API}/latest/dex/pairs/{pair_address}", timeout=15)
-    if r.status_code == 200:
-        pairs = r.json().get("pairs") or []
-        if pairs:
-            p = pairs[0]
-            return float(p.get("priceUsd") or p.get("priceNative") or 0)
-    return None
+def _prices_chunk(chunk):
+    out = {}
+    try:
+        r = SESSION.get(f"{DEX_API}/latest/dex/pairs/{CHAIN}/{','.join(chunk)}", timeout=15)
+        if r.status_code != 200:
+            return out
+        wanted = set(chunk)
+        for p in (r.json().get("pairs") or []):
+            addr = p.get("pairAddress")
+            if addr in wanted and addr not in out:
+                out[addr] = float(p.get("priceUsd") or p.get("priceNative") or 0)
+    except Exception as e:
+        print("[Labeler] lookup error:", e)
+    return out
 
-def resolve():
-    conn = db()
-    with conn.cursor() as cur:
-        cur.execute("""
-          SELECT id, pair_address, price_at_call
-          FROM call_outcomes
-          WHERE due_15m <= now() AND price_15m IS NULL
-          ORDER BY due_15m ASC
-          LIMIT 20
-        """)
-        rows15 = cur.fetchall()
-        for r15 in rows15:
-            p = price_now(r15["pair_address"])
-            if p is None: continue
-            gain = (p - r15["price_at_call"]) / max(1e-12, r15["price_at_call"])
-            cur.execute("""
-              UPDATE call_outcomes
-              SET price_15m=%s, gain_15m=%s, win_15m = (gain_15m >= 0.0)
-              WHERE id=%s
-            """, (p, gain, r15["id"]))
-            print(f"[Label] 15m id={r15['id']} gain={gain:.2%}")
+def prices_now(pair_addresses):
+    """{pair_address: price} for many pairs: deduped, 30 per call, LOOKUP_WORKERS calls in flight."""
+    addrs = list(dict.fromkeys(a for a in pair_addresses if a))
+    chunks = [addrs[i:i+PAIRS_PER_REQUEST] for i in range(0, len(addrs), PAIRS_PER_REQUEST)]
+    out = {}
+    with ThreadPoolExecutor(max_workers=LOOKUP_WORKERS) as ex:
+        for got in ex.map(_prices_chunk, chunks):
+            out.update(got)
+    return out
+
+def backlog(cur):
+    cur.execute("""
+      SELECT count(*) FILTER (WHERE due_15m <= now() AND price_15m IS NULL) AS b15,
+             count(*) FILTER (WHERE due_1h  <= now() AND price_1h  IS NULL) AS b1h
+      FROM call_outcomes
+      WHERE (due_15m <= now() AND price_15m IS NULL) OR (due_1h <= now() AND price_1h IS NULL)
+    """)
+    r = cur.fetchone()
+    return r["b15"], r["b1h"]
 
-        cur.execute("""
-          SELECT id, pair_address, price_at_call
-          FROM call_outcomes
-          WHERE due_1h <= now() AND price_1h IS NULL
-          ORDER BY due_1h ASC
-          LIMIT 20
-        """)
-        rows1h = cur.fetchall()
-        for r1 in rows1h:
-            p = price_now(r1["pair_address"])
+def _due(cur, col, limit, after_id=0):
+    # col is '15m' or '1h'; keyset paging on id so unpriceable rows don't repeat in one drain
+    cur.execute(f"""
+      SELECT id, pair_address, price_at_call
+      FROM call_outcomes
+      WHERE due_{col} <= now() AND price_{col} IS NULL AND id > %s
+      ORDER BY id ASC
+      LIMIT %s
+    """, (after_id, limit))
+    return cur.fetchall()
+
+def label(cur, rows15, rows1h):
+    """Price every due row with batched lookups and write them all in one UPDATE. returns: labels written"""
+    prices = prices_now([r["pair_address"] for r in rows15 + rows1h])
+    labels = {}   # id -> [price_15m, gain_15m, price_1h, gain_1h]
+    for slot, rows in ((0, rows15), (2, rows1h)):
+        for r in rows:
+            p = prices.get(r["pair_address"])
             if p is None: continue
-            gain = (p - r1["price_at_call"]) / max(1e-12, r1["price_at_call"])
-            cur.execute("""
-              UPDATE call_outcomes
-              SET price_1h=%s, gain_1h=%s, win_1h = (gain_1h >= 0.0)
-              WHERE id=%s
-            """, (p, gain, r1["id"]))
-            print(f"[Label] 1h  id={r1['id']} gain={gain:.2%}")
+            gain = (p - r["price_at_call"]) / max(1e-12, r["price_at_call"])
+            labels.setdefault(r["id"], [None]*4)[slot:slot+2] = [p, gain]
+    if not labels:
+        return 0
+    rows = [(i,) + tuple(v) for i, v in labels.items()]
+    # page_size: execute_values would otherwise split this into one statement per 100 rows
+    execute_values(cur, """
+      UPDATE call_outcomes AS t
+      SET price_15m = COALESCE(t.price_15m, v.p15), gain_15m = COALESCE(t.gain_15m, v.g15),
+          win_15m   = COALESCE(t.win_15m, v.g15 >= 0.0),
+          price_1h  = COALESCE(t.price_1h, v.p1h),  gain_1h  = COALESCE(t.gain_1h, v.g1h),
+          win_1h    = COALESCE(t.win_1h, v.g1h >= 0.0)
+      FROM (VALUES %s) AS v(id, p15, g15, p1h, g1h)
+      WHERE t.id = v.id
+    """, rows, template="(%s::bigint, %s::float8, %s::float8, %s::float8, %s::float8)", page_size=len(rows))
+    return sum(v[0] is not None for v in labels.values()) + sum(v[2] is not None for v in labels.values())
 
+def resolve():
+    conn = db()
+    with conn.cursor() as cur:
+        rows15 = _due(cur, "15m", NORMAL_LIMIT)
+        rows1h = _due(cur, "1h", NORMAL_LIMIT)
+        n = label(cur, rows15, rows1h)
     conn.commit()
     conn.close()
+    if n:
+        print(f"[Label] {n} labels ({len(rows15)} due 15m, {len(rows1h)} due 1h)")
+
+def catch_up():
+    """Drain every due row in CATCHUP_PAGE rounds; reports backlog and drain rate."""
+    conn = db()
+    t0 = time.time()
+    done = 0
+    with conn.cursor() as cur:
+        b15, b1h = backlog(cur)
+        print(f"[Labeler] backlog: 15m={b15} 1h={b1h}")
+        last15 = last1h = 0
+        while True:
+            rows15 = _due(cur, "15m", CATCHUP_PAGE, last15)
+            rows1h = _due(cur, "1h", CATCHUP_PAGE, last1h)
+            if not rows15 and not rows1h:
+                break
+            done += label(cur, rows15, rows1h)
+            conn.commit()
+            last15 = rows15[-1]["id"] if rows15 else last15
+            last1h = rows1h[-1]["id"] if rows1h else last1h
+            dt = max(1e-6, time.time() - t0)
+            print(f"[Labeler] labelled {done} in {dt:.1f}s ({done/dt:.1f}/s)")
+        b15, b1h = backlog(cur)
+    conn.close()
+    dt = max(1e-6, time.time() - t0)
+    print(f"[Labeler] catch-up done: {done} labels in {dt:.1f}s ({done/dt:.1f}/s), "
+          f"left unpriced: 15m={b15} 1h={b1h}")
 
 if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--catch-up", action="store_true", help="drain the whole due backlog, then keep running")
+    args = ap.parse_args()
     print("[Labeler] started")
+    if args.catch_up:
+        try:
+            catch_up()
+        except Exception as e:
+            print("Labeler catch-up error:", e)
     while True:
         try:
             resolve()
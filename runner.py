@@ -1,15 +1,19 @@
 # runner.py — scan → score → post; one-command mode: auto chart + auto AI signal loops
+import argparse
 import os
 import sys
 import time
 import subprocess
+import threading
 import requests
 from datetime import datetime, timezone
 
 from core import config as CFG
-from core import helius, market as mkt, scoring, notifier, store, analytics
-from core.extract import mints_from_tx
-from core.ticker import track_once
+from core import market as mkt, scoring, filters, notifier, store, analytics, engine
+from core.candidates import CandidateBus, HeliusSource, DexSource, start_sources
+from core.admission import Admission
+from core.pipeline import Stage, Pipeline, log_metrics
+from core.shards import ShardLeases, ShardRouter
 
 
 def minutes_ago(ts): return (datetime.now(
@@ -29,39 +33,6 @@ MIN_SCORE = _num("MIN_SCORE", CFG.MIN_SCORE, float)
 SCORE_REPOST_BUMP = CFG.SCORE_REPOST_BUMP
 POLL_SECONDS = CFG.POLL_SECONDS
 MAX_AGE_MIN = CFG.MAX_AGE_MIN
-MIN_LIQ_USD_BASE = CFG.MIN_LIQ_USD
-MIN_MCAP_USD_BASE = CFG.MIN_MCAP_USD
-FDV_LIQ_MAX = CFG.FDV_LIQ_MAX
-FRESH_GRACE_MIN = CFG.FRESH_GRACE_MIN
-FRESH_LIQ_FACTOR = CFG.FRESH_LIQ_FACTOR
-SUPER_FRESH_MIN = CFG.SUPER_FRESH_MIN
-SUPER_FRESH_FACTOR = CFG.SUPER_FRESH_FACTOR
-
-
-def _effective_thresholds(age_min: float):
-    liq = MIN_LIQ_USD_BASE
-    mc = MIN_MCAP_USD_BASE
-    if age_min <= SUPER_FRESH_MIN:
-        liq *= SUPER_FRESH_FACTOR
-        mc = 0.0
-    elif age_min <= FRESH_GRACE_MIN:
-        liq *= FRESH_LIQ_FACTOR
-        mc = 0.0
-    return float(liq), float(mc)
-
-
-def _passes_filters(mk: dict, age_min: float):
-    reasons = []
-    min_liq, min_mc = _effective_thresholds(age_min)
-    liq = float(mk["liq_usd"] or 0.0)
-    mc = float(mk["mcap_usd"] or 0.0)
-    if liq < min_liq:
-        reasons.append("liq")
-    if mc and mc < min_mc:
-        reasons.append("mcap")
-    if mc > 0 and liq > 0 and (mc/liq) > FDV_LIQ_MAX:
-        reasons.append("fdv/liq")
-    return (len(reasons) == 0), reasons
 
 # ---------------- one-command bits ----------------
 
@@ -93,31 +64,223 @@ def ensure_chart_server():
     print("[Chart] WARN: chart not reachable at", CFG.CHART_BASE_URL)
 
 
-# auto-spawn AI loops per posted mint (runs scripts.signal_loop as a module)
-ACTIVE_LOOPS = {}   # mint -> (Popen, start_ts)
-LOOP_TTL_SEC = 30*60  # keep each loop 30 minutes
+# one shared signal engine follows every posted mint (scripts.signal_engine)
+ENGINE_PROC = None
+MANAGE_ENGINE = True   # shard workers leave this to the supervisor
+LOOP_TTL_SEC = 30*60  # follow each mint 30 minutes
 
 
-def prune_loops():
-    now = time.time()
-    dead = []
-    for mint, (proc, t0) in ACTIVE_LOOPS.items():
-        if (proc.poll() is not None) or (now - t0 > LOOP_TTL_SEC):
-            try:
-                if proc.poll() is None:
-                    proc.terminate()
-            except Exception:
-                pass
-            dead.append(mint)
-    for m in dead:
-        ACTIVE_LOOPS.pop(m, None)
-
-
-def spawn_signal_loop(mint: str):
-    prune_loops()
-    if mint in ACTIVE_LOOPS:
+def ensure_signal_engine():
+    global ENGINE_PROC
+    if engine.alive():
         return
+    if ENGINE_PROC is not None and ENGINE_PROC.poll() is None:
+        return  # started, heartbeat not written yet
+    print("[Engine] starting signal engine...")
     proj_root = os.path.dirname(os.path.abspath(__file__))
     env = dict(os.environ)
     # ensure PYTHONPATH set for the child to import core.*
-    env.s
+    env["PYTHONPATH"] = proj_root + os.pathsep + env.get("PYTHONPATH", "")
+    logf = open("engine.log", "a", buffering=1)
+    ENGINE_PROC = subprocess.Popen([sys.executable, "-m", "scripts.signal_engine"],
+                                   env=env,
+                                   stdout=logf, stderr=subprocess.STDOUT)
+
+
+def spawn_signal_loop(mint: str):
+    """Hand the mint to the signal engine (starting the engine if needed)."""
+    if MANAGE_ENGINE:
+        ensure_signal_engine()
+    store.follow_mint(mint, LOOP_TTL_SEC)
+    print(f"[Engine] following {mint} for {LOOP_TTL_SEC//60}m")
+
+
+def stop_signal_loop(mint: str):
+    store.unfollow_mint(mint)
+
+
+# ---------------- pipeline: discover → tx → extract → bus → market → score → post → record → follow ----------------
+
+STAGE_QUEUE = _num("STAGE_QUEUE", 64, int)        # bounded queue in front of every stage
+METRICS_SEC = _num("STAGE_METRICS_SEC", 30, int)
+# worker threads per stage (WORKERS_<STAGE> in .env)
+STAGE_WORKERS = {name: _num(f"WORKERS_{name.upper()}", n, int) for name, n in
+                 (("tx", 4), ("extract", 1), ("market", 4), ("score", 1), ("post", 1), ("record", 2), ("follow", 1))}
+
+
+def lookup_stage(c):
+    mk = mkt.fetch_market(c.mint)
+    if not mk:
+        return []
+    disc_age = (time.time() - c.ts) / 60.0
+    age_eff = disc_age if mk["age_min"] is None else min(mk["age_min"], disc_age)
+    if age_eff > MAX_AGE_MIN:
+        return []
+    ok, _ = filters.passes_filters(mk, age_eff)
+    return [(c, mk, age_eff)] if ok else []
+
+
+def score_stage(x):
+    c, mk, age_eff = x
+    sc, parts = scoring.score(mk)
+    return [(c, mk, age_eff, sc, parts)] if sc >= MIN_SCORE else []
+
+
+def post_stage(x, adm=None):
+    c, mk, age_eff, sc, parts = x
+    # claim first: one atomic upsert, so no other worker/process can post the mint too
+    ok_bump, last = store.claim_post(mk["mint"], sc, SCORE_REPOST_BUMP)
+    if not ok_bump:
+        return []
+    notifier.post(mk, sc, {"liq": parts["liq"], "mc": parts["mc"], "age": parts["age"], "ratio": parts["ratio"]})
+    if adm is not None:
+        adm.alerted(c.ts)
+    print(f"POSTED {mk['symbol']} | score={sc} | liq=${int(mk['liq_usd']):,} | age={age_eff:.1f}m | "
+          f"src={c.source} ({'+'.join(sorted(c.sources))}) | last={last} | "
+          f"{time.time() - c.ts:.0f}s after discovery | {mk['pair_url']}")
+    return [x]
+
+
+def record_stage(x):
+    _, mk, _, sc, parts = x
+    analytics.record_signal(mk, sc, parts)
+    return [mk["mint"]]
+
+
+def follow_stage(mint):
+    spawn_signal_loop(mint)
+    return []
+
+
+def build(bus, helius_src, stop, adm):
+    """(discovery pipeline feeding the bus, evaluation pipeline fed from it)"""
+    def stage(name, fn, **kw):
+        return Stage(name, fn, STAGE_WORKERS[name], STAGE_QUEUE, **kw)
+
+    def tx_stage(s):
+        got = helius_src.fetch(s)
+        return [got] if got else []
+
+    def extract_stage(got):
+        helius_src.offer(bus, *got)   # never blocks: a full bus displaces its stalest candidate
+        return []
+
+    # newest first, and anything that aged out of MAX_AGE_MIN while queued is shed unfetched
+    front = Pipeline([stage("tx", tx_stage, priority=lambda s: -(s.get("blockTime") or time.time()),
+                            admit=lambda s: adm.still_fresh(s.get("blockTime"))),
+                      stage("extract", extract_stage)], stop)
+    back = Pipeline([stage("market", lookup_stage, priority=lambda c: -c.ts, admit=lambda c: adm.still_fresh(c.ts)),
+                     stage("score", score_stage), stage("post", lambda x: post_stage(x, adm)),
+                     stage("record", record_stage), stage("follow", follow_stage)], stop)
+    return front, back
+
+
+def discover(src, front, stop, adm, leases=None):
+    """
+    Feed new signatures to the tx stage: only those inside the age window by blockTime,
+    newest first, and no more than the stage has room for (the rest are shed).
+    Shard workers skip signatures another live worker covers (left unremembered, so
+    they are picked up here if that worker goes away while they are still recent).
+    """
+    tx = front.stages[0]
+    keep = None if leases is None else (lambda s: not leases.covered_elsewhere(s["signature"]))
+    while not stop.is_set():
+        t0 = time.time()
+        try:
+            for s in adm.signatures(src.signatures(keep), room=tx.room()):
+                tx.put(s)
+        except Exception as e:
+            print("[Runner] discover error:", repr(e))
+        time.sleep(max(0.0, POLL_SECONDS - (time.time() - t0)))
+
+
+def pump(bus, back, stop):
+    """Bus → market stage; blocks while the market stage is full, which in turn fills the bus."""
+    while not stop.is_set():
+        c = bus.get(timeout=1.0)
+        if c is not None:
+            back.put(c)
+
+
+def run(worker=None, shards=1):
+    """
+    One runner process. With worker set it is shard worker `worker` of `shards`: it only
+    fetches txs for signatures on its shards, evaluates mints on its shards, and hands
+    the rest to their owners (core.shards).
+    """
+    global MANAGE_ENGINE
+    adm = Admission(MAX_AGE_MIN)
+    bus = CandidateBus(maxsize=STAGE_QUEUE, admission=adm)
+    hel = HeliusSource()
+    stop = threading.Event()
+    router = leases = None
+    tag = ""
+    if worker is None:
+        ensure_chart_server()
+        ensure_signal_engine()
+    else:
+        MANAGE_ENGINE = False   # the supervisor keeps the engine up
+        leases = ShardLeases(shards, worker)
+        leases.refresh()
+        router = ShardRouter(bus, leases)
+        router.start(stop)
+        tag = f"w{worker}:"
+    front, back = build(router or bus, hel, stop, adm)
+    front.start()
+    back.start()
+    start_sources(router or bus, [DexSource()], POLL_SECONDS, stop)
+    threading.Thread(target=discover, args=(hel, front, stop, adm, leases), name="discover", daemon=True).start()
+    threading.Thread(target=pump, args=(bus, back, stop), name="pump", daemon=True).start()
+    print(f"[Runner] {tag}started: min_score={MIN_SCORE} max_age={MAX_AGE_MIN}m window={bus.window_sec}s "
+          f"workers={STAGE_WORKERS} queue={STAGE_QUEUE}" + (f" shards={sorted(leases.owned)}/{shards}" if leases else ""))
+    try:
+        while True:
+            time.sleep(METRICS_SEC)
+            m = dict(front.metrics(), **back.metrics())
+            log_metrics(m)
+            m["bus"] = dict(bus.stats, depth=len(bus), maxsize=bus.maxsize)
+            m["admission"] = adm.report()
+            if router:
+                m["shards"] = dict(router.stats, owned=sorted(leases.owned))
+            print(f"[Bus] {tag} depth={len(bus)} {bus.stats}" + (f" {m['shards']}" if router else ""))
+            print(f"[Admit] {tag} {m['admission']}")
+            store.save_stage_stats({tag + k: v for k, v in m.items()})
+    except KeyboardInterrupt:
+        stop.set()
+
+
+def supervise(n):
+    """Sharded mode: n worker processes, restarted if they exit; leases cover the gap."""
+    store.conn().execute("PRAGMA journal_mode=WAL")   # n writers + the chart server's readers
+    ensure_chart_server()
+    ensure_signal_engine()
+    procs = {}
+    while True:
+        for i in range(n):
+            p = procs.get(i)
+            if p is not None and p.poll() is None:
+                continue
+            if p is not None:
+                print(f"[Runner] shard worker {i} exited ({p.returncode}), restarting")
+            logf = open(f"runner_w{i}.log", "a", buffering=1)
+            procs[i] = subprocess.Popen([sys.executable, os.path.abspath(__file__), "--worker", str(i), "--shards", str(n)],
+                                        stdout=logf, stderr=subprocess.STDOUT)
+        ensure_signal_engine()
+        time.sleep(5)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--shards", type=int, default=1, help="worker processes (mints split by consistent hashing)")
+    ap.add_argument("--worker", type=int, default=None, help=argparse.SUPPRESS)   # set by the supervisor
+    args = ap.parse_args()
+    if args.worker is not None:
+        run(args.worker, args.shards)
+    elif args.shards > 1:
+        supervise(args.shards)
+    else:
+        run()
+
+
+if __name__ == "__main__":
+    main()
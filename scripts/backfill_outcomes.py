@@ -0,0 +1,15 @@
+# scripts/backfill_outcomes.py — outcome paths (return, MFE/MAE, time to peak) from stored ticks
+import argparse
+from core import outcomes
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--hours", type=float, default=None,
+                    help="only signals from the last N hours (default: all)")
+    args = ap.parse_args()
+    outcomes.backfill(args.hours)
+
+
+if __name__ == "__main__":
+    main()
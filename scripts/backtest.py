@@ -0,0 +1,63 @@
+# scripts/backtest.py — parameter sweep of core.strategy over stored signals/ticks
+import argparse
+from core import backtest
+
+
+def _floats(s): return [float(x) for x in s.split(",") if x.strip()]
+def _ints(s): return [int(x) for x in s.split(",") if x.strip()]
+
+
+def _fmt(v, pct=False):
+    if v is None:
+        return "-"
+    return f"{v:.0%}" if pct else f"{v:.2f}"
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--ema-fast", type=_ints, default=[8])
+    ap.add_argument("--ema-slow", type=_ints, default=[21])
+    ap.add_argument("--mom-win", type=_ints, default=[8])
+    ap.add_argument("--proba-buy", type=_floats, default=[0.62])
+    ap.add_argument("--proba-sell", type=_floats, default=[0.45])
+    ap.add_argument("--hours", type=float, default=None,
+                    help="only signals from the last N hours (default: all)")
+    ap.add_argument("--horizon-min", type=int, default=60)
+    ap.add_argument("--dd-stop", type=float, default=0.03)
+    ap.add_argument("--fee-bps", type=float, default=30.0)
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--top", type=int, default=15)
+    ap.add_argument("--csv", help="also write the full summary table here")
+    args = ap.parse_args()
+
+    grid = {"ema_fast": args.ema_fast, "ema_slow": args.ema_slow, "mom_win": args.mom_win,
+            "proba_buy": args.proba_buy, "proba_sell": args.proba_sell}
+    run_id, rows = backtest.run(grid, hours_back=args.hours, horizon_min=args.horizon_min,
+                                dd_stop=args.dd_stop, fee_bps=args.fee_bps, workers=args.workers)
+
+    print(f"\n[Backtest {run_id}] top {args.top} by total P&L")
+    print(f"  {'fast':>4} {'slow':>4} {'mom':>4} {'pBuy':>5} {'pSell':>5} "
+          f"{'trades':>6} {'win':>5} {'avg%':>7} {'med%':>7} {'sum%':>8} {'worst%':>7}")
+    for r in rows[:args.top]:
+        p = r["params"]
+        print(f"  {p['ema_fast']:>4} {p['ema_slow']:>4} {p['mom_win']:>4} {p['proba_buy']:>5} "
+              f"{p['proba_sell']:>5} {r['trades']:>6} {_fmt(r['win_rate'], True):>5} "
+              f"{_fmt(r['avg_pct']):>7} {_fmt(r['median_pct']):>7} {_fmt(r['sum_pct']):>8} "
+              f"{_fmt(r['worst_pct']):>7}")
+
+    if args.csv:
+        import csv
+        with open(args.csv, "w", newline="", encoding="utf-8") as f:
+            w = csv.writer(f)
+            w.writerow(["ema_fast", "ema_slow", "mom_win", "proba_buy", "proba_sell", "signals",
+                        "trades", "win_rate", "avg_pct", "median_pct", "sum_pct", "worst_pct"])
+            for r in rows:
+                p = r["params"]
+                w.writerow([p["ema_fast"], p["ema_slow"], p["mom_win"], p["proba_buy"],
+                            p["proba_sell"], r["signals"], r["trades"], r["win_rate"],
+                            r["avg_pct"], r["median_pct"], r["sum_pct"], r["worst_pct"]])
+        print(f"[Backtest] wrote {args.csv}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# scripts/fake_webhook.py — local stand-in for a Discord webhook (no network, no Discord)
+import argparse
+import json
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+PORT = 8790
+
+
+class FakeWebhook:
+    """
+    Accepts webhook POSTs like Discord: 204 on success with X-RateLimit-* headers,
+    and a 429 with retry_after once `bucket` posts land within `window` seconds.
+    `fail_every` > 0 returns a 502 on every Nth request to exercise retries.
+    """
+
+    def __init__(self, port=PORT, bucket=5, window=2.0, fail_every=0):
+        self.port, self.bucket, self.window, self.fail_every = port, bucket, window, fail_every
+        self.received = []     # (ts, payload)
+        self.statuses = []
+        self._hits = []
+        self._n = 0
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server.server_address[1]}/webhook"
+
+    def _handler(self):
+        hook = self
+
+        class H(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                code, headers, out = hook._answer(body)
+                self.send_response(code)
+                for k, v in headers.items():
+                    self.send_header(k, v)
+                self.send_header("Content-Length", str(len(out)))
+                self.end_headers()
+                self.wfile.write(out)
+
+            def log_request(self, *args, **kwargs):
+                pass
+
+        return H
+
+    def _answer(self, body):
+        now = time.time()
+        with self._lock:
+            self._n += 1
+            self._hits = [t for t in self._hits if now - t < self.window]
+            if self.fail_every and self._n % self.fail_every == 0:
+                self.statuses.append(502)
+                return 502, {}, b"bad gateway"
+            if len(self._hits) >= self.bucket:
+                wait = self.window - (now - self._hits[0])
+                self.statuses.append(429)
+                return 429, {"Content-Type": "application/json", "Retry-After": f"{wait:.3f}"}, \
+                    json.dumps({"message": "You are being rate limited.", "retry_after": wait,
+                                "global": False}).encode()
+            self._hits.append(now)
+            self.received.append((now, json.loads(body or b"{}")))
+            self.statuses.append(204)
+            left = self.bucket - len(self._hits)
+            reset = self.window - (now - self._hits[0])
+            return 204, {"X-RateLimit-Limit": str(self.bucket), "X-RateLimit-Remaining": str(left),
+                         "X-RateLimit-Reset-After": f"{reset:.3f}"}, b""
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--port", type=int, default=PORT)
+    ap.add_argument("--bucket", type=int, default=5, help="posts allowed per window")
+    ap.add_argument("--window", type=float, default=2.0)
+    ap.add_argument("--fail-every", type=int, default=0)
+    args = ap.parse_args()
+    hook = FakeWebhook(args.port, args.bucket, args.window, args.fail_every)
+    print(f"[fake-webhook] DISCORD_WEBHOOK={hook.url}")
+    hook.server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
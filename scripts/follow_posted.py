@@ -1,8 +1,11 @@
 # scripts/follow_posted.py
 import time
 from core.store import conn
-from core.ticker import track_loop
-from core.strategy import should_enter, should_exit
+from core.ticker import track_many
+from core.paper import PaperBook
+
+TICK_SECONDS = 5
+FOLLOW_SECONDS = 600  # 10 min follow per signal
 
 
 def new_signals(after_ts: int):
@@ -13,39 +16,28 @@ def new_signals(after_ts: int):
 
 def main():
     print("[follow] watching signals… (paper)")
+    book = PaperBook(follow_sec=FOLLOW_SECONDS)
     last_ts = int(time.time()) - 5
     while True:
+        t0 = time.time()
         for row in new_signals(last_ts):
             last_ts = row["ts"]
-            mint, sym, p0 = row["mint"], row["symbol"], float(
-                row["price_usd"] or 0)
-            print(f"[track] {sym} {mint} p0={p0}")
-            t0 = time.time()
-            entered = False
-            entry = p0
-            while time.time()-t0 < 600:  # 10 min follow
-                track_loop(mint, seconds=5, duration_sec=5)  # 1 sample
-                if not entered:
-                    ok, why = should_enter(mint)
-                    print(f"  enter? {ok} | {why}")
-                    if ok:
-                        entered = True
-                        # set paper entry at last tick price
-                        cur = conn().execute(
-                            "SELECT price_usd FROM ticks WHERE mint=? ORDER BY ts DESC LIMIT 1", (mint,))
-                        entry = float(cur.fetchone()[0] or 0)
-                        print(f"  [PAPER BUY] {sym} at {entry}")
-                else:
-                    hit, why = should_exit(mint, entry)
-                    print(f"  exit? {hit} | {why}")
-                    if hit:
-                        cur = conn().execute(
-                            "SELECT price_usd FROM ticks WHERE mint=? ORDER BY ts DESC LIMIT 1", (mint,))
-                        px = float(cur.fetchone()[0] or 0)
-                        pnl = (px-entry)/entry*100 if entry else 0
-                        print(f"  [PAPER SELL] {sym} at {px}  PnL={pnl:.1f}%")
-                        break
-        time.sleep(5)
+            print(f"[track] {row['symbol']} {row['mint']} p0={row['price_usd']}")
+            book.watch(row["mint"], row["symbol"], row["id"])
+
+        mints = book.mints()
+        if mints:
+            try:
+                # one bulk lookup per 30 mints; prices stay in memory for the decisions
+                for mint, (ts, px) in track_many(mints).items():
+                    book.on_tick(mint, px, ts)
+            except Exception as e:
+                print("[follow] tick error:", repr(e))
+            book.expire()
+            book.flush()
+            print(f"[follow] following={len(book.positions)} open={book.open_count()} "
+                  f"closed={len(book.closed_pnl)} pnl_sum={sum(book.closed_pnl):.1f}%")
+        time.sleep(max(0.0, TICK_SECONDS - (time.time()-t0)))
 
 
 if __name__ == "__main__":
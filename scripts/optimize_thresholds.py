@@ -0,0 +1,56 @@
+# scripts/optimize_thresholds.py — walk-forward sweep of the filter/score thresholds
+import argparse
+import os
+import time
+from core import optimize, filters
+
+
+def _grid_arg(s):
+    k, _, vals = s.partition("=")
+    k = k.strip().upper()
+    if k not in filters.THRESHOLD_KEYS:
+        raise argparse.ArgumentTypeError(f"unknown threshold {k}")
+    return k, [float(v) for v in vals.split(",") if v.strip()]
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--set", type=_grid_arg, action="append", default=[], metavar="KEY=v1,v2",
+                    help="values to sweep for one threshold (replaces its default grid)")
+    ap.add_argument("--horizon", default="60m")
+    ap.add_argument("--hours", type=float, default=None,
+                    help="only signals from the last N hours (default: all)")
+    ap.add_argument("--folds", type=int, default=5)
+    ap.add_argument("--min-n", type=int, default=10, help="ignore configs keeping fewer signals")
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--top", type=int, default=5)
+    ap.add_argument("--out", default="opt", help="directory for the .env fragments")
+    args = ap.parse_args()
+
+    grid = dict(optimize.DEFAULT_GRID)
+    grid.update(dict(args.set))
+    ranked, steps = optimize.run(grid, args.horizon, args.hours, args.folds, args.min_n, args.workers)
+
+    print("\n[Opt] walk-forward (best on earlier folds, scored on the next)")
+    for s in steps:
+        wr = "-" if s["test_win_rate"] is None else f"{s['test_win_rate']:.0%}"
+        print(f"  fold {s['fold']}: train n={s['train_n']} sum={s['train_sum_pct']:.1f}%  "
+              f"-> test n={s['test_n']} win={wr} sum={s['test_sum_pct']:.1f}%")
+    if steps:
+        print(f"  out-of-sample total: {sum(s['test_sum_pct'] for s in steps):.1f}%")
+
+    run_dir = os.path.join(args.out, time.strftime("%Y%m%dT%H%M%S"))
+    os.makedirs(run_dir, exist_ok=True)
+    print(f"\n[Opt] top {args.top} on all data -> {run_dir}")
+    for i, r in enumerate(ranked[:args.top], 1):
+        stats = {k: r[k] for k in ("n", "win_rate", "avg_pct", "sum_pct", "worst_fold_pct")}
+        path = os.path.join(run_dir, f"rank{i:02d}.env")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(optimize.env_fragment(r["config"], stats))
+        c = r["config"]
+        print(f"  #{i} n={r['n']} win={r['win_rate']:.0%} avg={r['avg_pct']:.2f}% sum={r['sum_pct']:.1f}%  "
+              + " ".join(f"{k}={c[k]:g}" for k in grid))
+
+
+if __name__ == "__main__":
+    main()
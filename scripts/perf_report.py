@@ -0,0 +1,32 @@
+# scripts/perf_report.py — win rate / returns by score bucket, launch age and horizon
+import argparse
+import time
+from core import perf, store
+from core.outcomes import HORIZONS
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--horizon", default="60m", choices=list(HORIZONS))
+    ap.add_argument("--by", default="score,age", help="score, age or score,age")
+    ap.add_argument("--min-n", type=int, default=1)
+    ap.add_argument("--rebuild", action="store_true", help="recompute the rollups from all frozen outcomes first")
+    args = ap.parse_args()
+
+    if args.rebuild:
+        store.rebuild_rollups()
+    t0 = time.perf_counter()
+    by = [b.strip() for b in args.by.split(",") if b.strip()]
+    rows = perf.report(args.horizon, by, args.min_n)
+    ms = (time.perf_counter() - t0) * 1000
+
+    print(f"[Perf] horizon={args.horizon} buckets={len(rows)} ({ms:.1f} ms)")
+    print(f"  {'score':>5} {'age':>5} {'n':>6} {'win':>5} {'avg%':>8} {'med%':>8}")
+    for r in rows:
+        med = "-" if r["median_pct"] is None else f"{r['median_pct']:.1f}"
+        print(f"  {str(r.get('score', '*')):>5} {str(r.get('age', '*')):>5} {r['n']:>6} "
+              f"{r['win_rate']:>5.0%} {r['avg_pct']:>8.2f} {med:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,48 +5,55 @@ from datetime import datetime, timezone
 from core import config as CFG
 from core.helius import get_recent_signatures, get_tx
 from core.extract import mints_from_tx
-from core import market as mkt, scoring, notifier, store, analytics
+from core.admission import Admission
+from core.candidates import QUOTE_MINTS
+from core import market as mkt, scoring, filters, notifier, store, analytics
 
 MIN_SCORE = float(os.getenv("MIN_SCORE", "70"))
 SCORE_REPOST_BUMP = float(getattr(CFG, "SCORE_REPOST_BUMP", 10))
 MAX_AGE_MIN = float(os.getenv("MAX_AGE_MIN", "8"))
-MIN_LIQ_USD_BASE = float(getattr(CFG, "MIN_LIQ_USD", 15000))
-MIN_MCAP_USD_BASE = float(getattr(CFG, "MIN_MCAP_USD", 100000))
-FDV_LIQ_MAX = float(os.getenv("FDV_LIQ_MAX", "80"))
-FRESH_GRACE_MIN = float(os.getenv("FRESH_GRACE_MIN", "2"))
-FRESH_LIQ_FACTOR = float(os.getenv("FRESH_LIQ_FACTOR", "0.7"))
-SUPER_FRESH_MIN = float(os.getenv("SUPER_FRESH_MIN", "1"))
-SUPER_FRESH_FACTOR = float(os.getenv("SUPER_FRESH_FACTOR", "0.5"))
+MAX_POSTS = int(os.getenv("SCAN_MAX_POSTS", "4"))              # per scan, so one burst can't flood the channel
+POST_SLEEP_SEC = float(os.getenv("SCAN_POST_SLEEP_SEC", "0.25"))
 
 
 def minutes_ago(ts): return (datetime.now(
     timezone.utc)-ts).total_seconds()/60.0
 
 
-def _effective_thresholds(age_min):
-    liq = MIN_LIQ_USD_BASE
-    mc = MIN_MCAP_USD_BASE
-    if age_min <= SUPER_FRESH_MIN:
-        liq *= SUPER_FRESH_FACTOR
-        mc = 0.0
-    elif age_min <= FRESH_GRACE_MIN:
-        liq *= FRESH_LIQ_FACTOR
-        mc = 0.0
-    return float(liq), float(mc)
-
-
-def _passes_filters(mk, age_min):
-    reasons = []
-    min_liq, min_mc = _effective_thresholds(age_min)
-    liq = float(mk["liq_usd"] or 0.0)
-    mc = float(mk["mcap_usd"] or 0.0)
-    if liq < min_liq:
-        reasons.append("liq")
-    if mc and mc < min_mc:
-        reasons.append("mcap")
-    if mc > 0 and liq > 0 and (mc/liq) > FDV_LIQ_MAX:
-        reasons.append("fdv/liq")
-    return (len(reasons) == 0), reasons
+def evaluate(mint, ts, adm):
+    """market -> filters -> score -> claim -> post for one mint. returns: True if posted"""
+    if not adm.still_fresh(ts):
+        return False
+    mk = mkt.fetch_market(mint)
+    if not mk:
+        return False
+
+    ds_age = mk["age_min"]
+    tx_age = minutes_ago(datetime.fromtimestamp(ts, tz=timezone.utc))
+    age_eff = tx_age if ds_age is None else min(ds_age, tx_age)
+    if age_eff > MAX_AGE_MIN:
+        return False
+
+    ok, _ = filters.passes_filters(mk, age_eff)
+    if not ok:
+        return False
+
+    sc, parts = scoring.score(mk)
+    if sc < MIN_SCORE:
+        return False
+
+    # atomic check-and-mark, so a running runner can't post the same mint too
+    ok_bump, last = store.claim_post(
+        mk["mint"], sc, SCORE_REPOST_BUMP)
+    if not ok_bump:
+        return False
+
+    sid = analytics.record_signal(mk, sc, parts)
+    notifier.post(mk, sc, {
+                  "liq": parts["liq"], "mc": parts["mc"], "age": parts["age"], "ratio": parts["ratio"]})
+    print(
+        f"POSTED {mk['symbol']} | score={sc} | liq=${int(mk['liq_usd']):,} | age={age_eff:.1f}m | last={last} sid={sid} | {mk['pair_url']}")
+    return True
 
 
 def main():
@@ -54,49 +61,32 @@ def main():
     sigs = get_recent_signatures(limit=220)
     print(f"[scan] got {len(sigs)}")
 
+    # drop signatures outside the age window before paying for getTransaction; newest first,
+    # and each tx's mints are evaluated (and posted) before the next tx is fetched
+    adm = Admission(MAX_AGE_MIN)
+    sigs = adm.signatures(sigs)
+    done = set()   # mints already evaluated (from a newer tx)
     posted = 0
     for s in sigs:
-        if posted >= 4:
+        if posted >= MAX_POSTS:
             break
         tx = get_tx(s["signature"])
-        tx_ts = datetime.fromtimestamp(tx.get("blockTime", 0), tz=timezone.utc)
-
+        if not tx:
+            continue
+        ts = tx.get("blockTime") or s.get("blockTime") or 0
         for mint in mints_from_tx(tx):
-            if posted >= 4:
+            if posted >= MAX_POSTS:
                 break
-            mk = mkt.fetch_market(mint)
-            if not mk:
-                continue
-
-            ds_age = mk["age_min"]
-            tx_age = minutes_ago(tx_ts)
-            age_eff = tx_age if ds_age is None else min(ds_age, tx_age)
-            if age_eff > MAX_AGE_MIN:
+            if mint in QUOTE_MINTS or mint in done:
                 continue
-
-            ok, _ = _passes_filters(mk, age_eff)
-            if not ok:
-                continue
-
-            sc, parts = scoring.score(mk)
-            if sc < MIN_SCORE:
-                continue
-
-            ok_bump, last = store.should_post(
-                mk["mint"], sc, SCORE_REPOST_BUMP)
-            if not ok_bump:
-                continue
-
-            sid = analytics.record_signal(mk, sc, parts)
-            notifier.post(mk, sc, {
-                          "liq": parts["liq"], "mc": parts["mc"], "age": parts["age"], "ratio": parts["ratio"]})
-            store.mark_posted(mk["mint"], sc)
-            print(
-                f"POSTED {mk['symbol']} | score={sc} | liq=${int(mk['liq_usd']):,} | age={age_eff:.1f}m | last={last} sid={sid} | {mk['pair_url']}")
-            posted += 1
-            time.sleep(0.25)
-
-    print(f"[scan] done. posted {posted} token(s).")
+            done.add(mint)
+            if evaluate(mint, ts, adm):
+                posted += 1
+                time.sleep(POST_SLEEP_SEC)
+
+    st = adm.stats
+    print(f"[scan] done. {len(done)} mint(s), posted {posted} token(s) (cap {MAX_POSTS}). shed {adm.shed_total()} "
+          f"(old sigs={st['shed_old']}, aged while scanning={st['shed_stale']})")
 
 
 if __name__ == "__main__":
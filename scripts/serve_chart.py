@@ -1,15 +1,27 @@
 # scripts/serve_chart.py
-import requests
+import argparse
+import gzip
+import hashlib
+import queue
 import json
 import os
 import sqlite3
+import sys
 import threading
 import time
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from contextlib import contextmanager
+from http.server import HTTPServer, ThreadingHTTPServer, BaseHTTPRequestHandler
 from urllib.parse import urlparse, parse_qs
 
+# runner starts this file directly; make core.* importable without PYTHONPATH
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core import store  # noqa: E402
+from core.candles import CandleCache  # noqa: E402
+
 PORT = 8765
 DB_PATH = "freshbot.sqlite3"
+POOL_SIZE = 8
+UPSTREAM_TIMEOUT = (3, 5)   # (connect, read) seconds per DexScreener call
 
 HTML = f"""<!doctype html>
 <html>
@@ -53,33 +65,89 @@ HTML = f"""<!doctype html>
 
     function setStatus(t) {{ document.getElementById('status').textContent = t }}
 
+    let candleCursor = 0, markerCursor = 0, pollMarkers = [];
+
+    // columnar payload -> [{{time,open,high,low,close}}]
+    function rowsFromCols(c) {{
+      const out = [];
+      for (let i = 0; i < (c.t || []).length; i++)
+        out.push({{ time: c.t[i], open: c.o[i], high: c.h[i], low: c.l[i], close: c.c[i] }});
+      return out;
+    }}
+
     async function fetchDexCandles(mint) {{
       // Use DexScreener's public token endpoint to find a liquid pair, then fetch chart data via proxy /candles
       // We read through the server to avoid CORS headaches; the server exposes /candles for us.
-      const r = await fetch('/candles?mint=' + encodeURIComponent(mint));
+      // since= asks only for bars from our last bar on; the browser handles ETag/304 and gzip.
+      const r = await fetch('/candles?format=cols&since=' + candleCursor + '&mint=' + encodeURIComponent(mint));
       if (!r.ok) throw new Error('candle fetch failed');
-      return await r.json(); // {{ candles:[{{time,open,high,low,close}}], symbol, pairUrl }}
+      const j = await r.json(); // {{ candles:{{t,o,h,l,c}}, symbol, pairUrl, cursor }}
+      j.candles = rowsFromCols(j.candles);
+      candleCursor = j.cursor || candleCursor;
+      return j;
     }}
 
     async function fetchServerSignals(mint) {{
-      const r = await fetch('/api/live?mint=' + encodeURIComponent(mint));
+      const r = await fetch('/api/live?format=cols&since=' + markerCursor + '&mint=' + encodeURIComponent(mint));
       if (!r.ok) return {{ signals: [] }};
-      return await r.json();
+      const j = await r.json();
+      const c = j.signals, sigs = [];
+      for (let i = 0; i < (c.id || []).length; i++)
+        sigs.push({{ t: c.t[i], side: c.side[i], price: c.price[i], conf: c.conf[i] }});
+      markerCursor = j.cursor || markerCursor;
+      pollMarkers = pollMarkers.concat(sigs);
+      return {{ signals: pollMarkers }};
+    }}
+
+    function toMarker(s) {{
+      const time = Math.floor(new Date(s.t).getTime() / 1000);
+      const text = s.side === 'B' ? 'B' : 'S';
+      const color = s.side === 'B' ? '#00e676' : '#ff6e6e';
+      return {{ time, position: s.side === 'B' ? 'belowBar' : 'aboveBar', shape:'circle', color, text, size:1 }};
     }}
 
     function drawMarkersFromServer(sigs) {{
-      const m = [];
-      for (const s of sigs) {{
-        const time = Math.floor(new Date(s.t).getTime() / 1000);
-        const text = s.side === 'B' ? 'B' : 'S';
-        const color = s.side === 'B' ? '#00e676' : '#ff6e6e';
-        m.push({{ time, position: s.side === 'B' ? 'belowBar' : 'aboveBar', shape:'circle', color, text, size:1 }});
-      }}
-      candleSeries.setMarkers(m);
+      candleSeries.setMarkers(sigs.map(toMarker));
     }}
 
     async function bootstrap() {{
       if (!MINT) {{ setStatus('no mint'); return; }}
+      if (window.EventSource && startStream()) return;
+      startPolling();
+    }}
+
+    // push mode: one SSE stream per tab; server sends the initial state, then only new bars/markers
+    function startStream() {{
+      let markers = [];
+      let gotInit = false;
+      const es = new EventSource('/api/stream?mint=' + encodeURIComponent(MINT));
+      es.addEventListener('init', (ev) => {{
+        const j = JSON.parse(ev.data);
+        gotInit = true;
+        document.getElementById('sym').textContent = j.symbol || 'Pair';
+        document.getElementById('dslink').href = j.pairUrl || '#';
+        candleSeries.setData(j.candles || []);
+        markers = (j.signals || []).map(toMarker);
+        candleSeries.setMarkers(markers);
+        setStatus('live (push)');
+      }});
+      es.addEventListener('candles', (ev) => {{
+        for (const c of JSON.parse(ev.data).candles || []) candleSeries.update(c);
+      }});
+      es.addEventListener('markers', (ev) => {{
+        markers = markers.concat((JSON.parse(ev.data).signals || []).map(toMarker));
+        markers.sort((a, b) => a.time - b.time);
+        candleSeries.setMarkers(markers);
+      }});
+      es.onerror = () => {{
+        if (gotInit) {{ setStatus('reconnecting…'); return; }}  // EventSource retries by itself
+        es.close();
+        startPolling();   // stream not available: fall back to polling
+      }};
+      return true;
+    }}
+
+    async function startPolling() {{
       try {{
         const boot = await fetchDexCandles(MINT);
         document.getElementById('sym').textContent = boot.symbol || 'Pair';
@@ -96,7 +164,7 @@ HTML = f"""<!doctype html>
     async function refreshCandles() {{
       try {{
         const boot = await fetchDexCandles(MINT);
-        candleSeries.setData(boot.candles);
+        for (const c of boot.candles) candleSeries.update(c);
       }} catch(e) {{}}
       setTimeout(refreshCandles, 8000);
     }}
@@ -115,6 +183,59 @@ HTML = f"""<!doctype html>
 </html>"""
 
 
+OVERVIEW_HTML = """<!doctype html>
+<html>
+<head>
+  <meta charset="utf-8"/>
+  <title>Active mints</title>
+  <meta name="viewport" content="width=device-width, initial-scale=1"/>
+  <style>
+    body { margin:0; background:#0b1220; color:#e6edf3; font-family:ui-sans-serif,system-ui }
+    #hdr { padding:10px 14px; border-bottom:1px solid #1e2636; display:flex; gap:10px; align-items:center }
+    table { border-collapse:collapse; width:100%; font-size:13px }
+    th, td { padding:6px 10px; border-bottom:1px solid #1e2636; text-align:right }
+    th:first-child, td:first-child { text-align:left }
+    a { color:#8ab4ff; text-decoration:none }
+    .up { color:#00e676 } .dn { color:#ff6e6e }
+    .tag { background:#1b2233; padding:4px 8px; border-radius:8px; font-size:12px }
+  </style>
+</head>
+<body>
+  <div id="hdr"><b>Active mints</b><span class="tag" id="status">loading…</span></div>
+  <table>
+    <thead><tr><th>Symbol</th><th>Signal</th><th>Last price</th><th>Since signal</th>
+      <th>Outcome</th><th>AI</th><th>Updated</th></tr></thead>
+    <tbody id="rows"></tbody>
+  </table>
+  <script>
+    const pct = (v) => v == null ? '-' : `<span class="${v >= 0 ? 'up' : 'dn'}">${v.toFixed(1)}%</span>`;
+    // symbols and the rest come from on-chain / DexScreener data anyone can set: escape everything
+    const esc = (v) => String(v).replace(/[&<>"']/g, (ch) => ({'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'})[ch]);
+    const ago = (ts) => ts ? Math.max(0, Math.round(Date.now()/1000 - ts)) + 's' : '-';
+    async function refresh() {
+      try {
+        const r = await fetch('/api/overview');
+        if (r.ok) {
+          const j = await r.json();
+          document.getElementById('rows').innerHTML = j.rows.map(x => `<tr>
+            <td><a href="/?mint=${encodeURIComponent(x.mint)}">${esc(x.symbol || '?')}</a></td>
+            <td>${new Date(x.signal_ts*1000).toLocaleTimeString()}</td>
+            <td>${x.last_price == null ? '-' : x.last_price.toPrecision(4)}</td>
+            <td>${pct(x.change_pct)}</td>
+            <td>${x.outcome_horizon ? esc(x.outcome_horizon) + ' ' : ''}${pct(x.outcome_ret)}</td>
+            <td>${esc(x.ai_side || '-')}</td>
+            <td>${ago(x.last_ts)}</td></tr>`).join('');
+          document.getElementById('status').textContent = j.rows.length + ' active';
+        }
+      } catch (e) {}
+      setTimeout(refresh, 5000);
+    }
+    refresh();
+  </script>
+</body>
+</html>"""
+
+
 def _conn():
     con = sqlite3.connect(DB_PATH, timeout=30)
     con.execute("""CREATE TABLE IF NOT EXISTS ai_trades(
@@ -129,8 +250,40 @@ def _conn():
     return con
 
 
+def _setup_db():
+    # schema + WAL once at startup, so readers never block the engine's writes
+    con = _conn()
+    store._init(con)   # overview and engine tables, in case the runner hasn't created them yet
+    con.execute("PRAGMA journal_mode=WAL")
+    con.commit()
+    con.close()
+
+
+class _ReadPool:
+    """Small pool of read-only sqlite connections shared by the request threads."""
+
+    def __init__(self, size=POOL_SIZE):
+        self._q = queue.LifoQueue()
+        for _ in range(size):
+            con = sqlite3.connect(f"file:{os.path.abspath(DB_PATH)}?mode=ro", uri=True,
+                                  timeout=5, check_same_thread=False)
+            con.execute("PRAGMA query_only=1")
+            self._q.put(con)
+
+    @contextmanager
+    def conn(self, timeout=5):
+        con = self._q.get(timeout=timeout)
+        try:
+            yield con
+        finally:
+            self._q.put(con)
+
+
+_pool = None
+
+
 def _json(obj, code=200):
-    b = json.dumps(obj).encode()
+    b = json.dumps(obj, separators=(",", ":")).encode()
     return code, {"Content-Type": "application/json", "Content-Length": str(len(b))}, b
 
 
@@ -143,43 +296,140 @@ def _bad(msg="bad request", code=400):
     return _json({"error": msg}, code)
 
 
-# Very small DexScreener proxy so the page can load candles without CORS pain
+# Very small DexScreener proxy so the page can load candles without CORS pain.
+# One cache entry per mint: the pair is resolved once and later refreshes only pull
+# bars after the last cached one, so every viewer of a mint shares the same upstream calls.
+_cache = CandleCache(timeout=UPSTREAM_TIMEOUT)
+_last_prune = [0.0]
 
 
 def proxy_candles(mint: str):
-    # find top pair for the mint
-    j = requests.get(
-        f"https://api.dexscreener.com/latest/dex/tokens/{mint}", timeout=10).json()
-    pairs = (j or {}).get("pairs") or []
-    if not pairs:
+    now = time.time()
+    if now - _last_prune[0] > 60:
+        _last_prune[0] = now
+        _cache.prune()
+    pair, candles = _cache.get(mint)
+    if not pair:
         return {"candles": [], "symbol": "unknown", "pairUrl": None}
-    pair = max(pairs, key=lambda p: float(
-        p.get("liquidity", {}).get("usd", 0) or 0))
     symbol = f"{pair.get('baseToken', {}).get('symbol', '?')}/{pair.get('quoteToken', {}).get('symbol', '?')}"
-    pair_url = pair.get("url")
-    # DexScreener bars endpoint (1m). If unavailable just synthesize from last trades.
-    # Public bars API:
-    #   https://api.dexscreener.com/chart/bars/{chain}/{pairAddress}?from=unix&to=unix&resolution=1
-    chain = pair.get("chainId") or "solana"
-    addr = pair.get("pairAddress")
-    now = int(time.time())
-    frm = now - 60*60*6   # ~6h
-    bars = requests.get(
-        f"https://api.dexscreener.com/chart/bars/{chain}/{addr}",
-        params={"from": frm, "to": now, "resolution": 1}, timeout=10
-    ).json()
-    candles = []
-    for b in (bars or []):
-        # each bar: [t, o, h, l, c, v] per docs; time is unix seconds
+    return {"candles": candles, "symbol": symbol, "pairUrl": pair.get("url")}
+
+
+GZIP_MIN_BYTES = 512
+
+
+def _cols_candles(candles):
+    """Columnar bars: one array per field instead of one object per bar."""
+    return {"t": [c["time"] for c in candles], "o": [c["open"] for c in candles],
+            "h": [c["high"] for c in candles], "l": [c["low"] for c in candles],
+            "c": [c["close"] for c in candles]}
+
+
+def _cols_signals(sigs):
+    return {k: [s[k] for s in sigs] for k in ("id", "t", "side", "price", "conf")}
+
+
+def _qs_int(qs, name):
+    try:
+        return int(float(qs.get(name, ["0"])[0] or 0))
+    except ValueError:
+        return 0
+
+
+class _Overview:
+    """
+    In-memory copy of mint_overview. Writers keep that table current, so the server
+    only pulls rows changed since its last look, at most once per REFRESH_SEC,
+    no matter how many dashboards are open.
+    """
+    REFRESH_SEC = 1.0
+    ACTIVE_HOURS = 6
+
+    def __init__(self):
+        self.rows = {}
+        self._seen_ts = 0
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    def snapshot(self):
+        with self._lock:
+            if time.time() - self._checked >= self.REFRESH_SEC:
+                self._pull()
+            cutoff = time.time() - self.ACTIVE_HOURS*3600
+            rows = [r for r in self.rows.values() if (r["signal_ts"] or 0) >= cutoff]
+        rows.sort(key=lambda r: r["signal_ts"] or 0, reverse=True)
+        return rows
+
+    def _pull(self):
+        self._checked = time.time()
+        with _pool.conn() as con:
+            cur = con.execute("SELECT * FROM mint_overview WHERE updated_ts >= ?", (self._seen_ts,))
+            cols = [d[0] for d in cur.description]
+            fresh = [dict(zip(cols, r)) for r in cur.fetchall()]
+        for r in fresh:
+            p0, p1 = r["signal_price"], r["last_price"]
+            r["change_pct"] = ((p1 - p0) / p0 * 100.0) if (p0 and p1) else None
+            self.rows[r["mint"]] = r
+            self._seen_ts = max(self._seen_ts, r["updated_ts"])
+        cutoff = time.time() - self.ACTIVE_HOURS*3600
+        for m in [m for m, r in self.rows.items() if (r["signal_ts"] or 0) < cutoff]:
+            del self.rows[m]
+
+
+_overview = _Overview()
+
+
+class _Hub:
+    """Per-mint wakeups: the signal engine POSTs /api/notify after writing ai_trades."""
+
+    def __init__(self):
+        self._cv = threading.Condition()
+        self._ver = {}
+
+    def version(self, mint):
+        with self._cv:
+            return self._ver.get(mint, 0)
+
+    def notify(self, mints):
+        with self._cv:
+            for m in mints:
+                self._ver[m] = self._ver.get(m, 0) + 1
+            self._cv.notify_all()
+
+    def wait(self, mint, seen, timeout):
+        with self._cv:
+            self._cv.wait_for(lambda: self._ver.get(mint, 0) != seen, timeout)
+            return self._ver.get(mint, 0)
+
+
+_hub = _Hub()
+STREAM_CANDLE_SEC = 5     # how often a stream looks for new bars
+STREAM_MARKER_SEC = 5     # fallback marker check when no notify arrives
+STREAM_PING_SEC = 15
+
+
+def _signal_rows(mint, after_id=0, limit=500):
+    with _pool.conn() as con:
+        rows = con.execute(
+            "SELECT id, ts, side, price, conf FROM ai_trades WHERE mint=? AND id>? ORDER BY id ASC LIMIT ?",
+            (mint, after_id, limit)).fetchall()
+    sigs = [{"id": r[0], "t": r[1], "side": r[2], "price": float(r[3]), "conf": r[4]} for r in rows]
+    return sigs, (rows[-1][0] if rows else after_id)
+
+
+def _stage_stats():
+    """Runner pipeline metrics as last exported to stage_stats (empty if the runner never ran)."""
+    with _pool.conn() as con:
         try:
-            candles.append({"time": int(b[0]), "open": float(b[1]), "high": float(b[2]),
-                            "low": float(b[3]), "close": float(b[4])})
-        except Exception:
-            continue
-    return {"candles": candles[-800:], "symbol": symbol, "pairUrl": pair_url}
+            rows = con.execute("SELECT stage, ts, stats FROM stage_stats").fetchall()
+        except sqlite3.OperationalError:
+            return {}
+    return {r[0]: dict(json.loads(r[2]), ts=r[1]) for r in rows}
 
 
 class H(BaseHTTPRequestHandler):
+    timeout = 30  # socket timeout so a stalled client can't pin a worker thread
+
     def do_GET(self):
         try:
             u = urlparse(self.path)
@@ -187,6 +437,14 @@ class H(BaseHTTPRequestHandler):
                 code, headers, body = _html(HTML)
             elif u.path == "/health":
                 code, headers, body = _html("ok")
+            elif u.path == "/overview":
+                code, headers, body = _html(OVERVIEW_HTML)
+            elif u.path == "/api/overview":
+                code, headers, body = _json({"rows": _overview.snapshot()})
+            elif u.path == "/api/stats":
+                code, headers, body = _json(dict(_cache.stats, mints=len(_cache)))
+            elif u.path == "/api/pipeline":
+                code, headers, body = _json({"stages": _stage_stats()})
             elif u.path == "/api/live":
                 qs = parse_qs(u.query)
                 mint = (qs.get("mint", [""])[0] or "").strip()
@@ -194,14 +452,23 @@ class H(BaseHTTPRequestHandler):
                     code, headers, body = _bad("missing mint")
                     self._send(code, headers, body)
                     return
-                con = _conn()
-                cur = con.cursor()
-                cur.execute(
-                    "SELECT ts, side, price, conf FROM ai_trades WHERE mint=? ORDER BY ts ASC LIMIT 500", (mint,))
-                rows = cur.fetchall()
-                con.close()
-                code, headers, body = _json({"signals": [{"t": r[0], "side": r[1], "price": float(
-                    r[2]), "conf": (r[3] if r[3] is not None else None)} for r in rows]})
+                # since=<id>: only markers newer than the client's cursor
+                sigs, cursor = _signal_rows(mint, _qs_int(qs, "since"))
+                if qs.get("format", [""])[0] == "cols":
+                    code, headers, body = _json({"signals": _cols_signals(sigs), "cursor": cursor})
+                else:
+                    for sg in sigs:
+                        sg.pop("id")
+                    code, headers, body = _json({"signals": sigs, "cursor": cursor})
+            elif u.path == "/api/stream":
+                qs = parse_qs(u.query)
+                mint = (qs.get("mint", [""])[0] or "").strip()
+                if not mint:
+                    code, headers, body = _bad("missing mint")
+                    self._send(code, headers, body)
+                    return
+                self._stream(mint)
+                return
             elif u.path == "/candles":
                 qs = parse_qs(u.query)
                 mint = (qs.get("mint", [""])[0] or "").strip()
@@ -210,6 +477,13 @@ class H(BaseHTTPRequestHandler):
                     self._send(code, headers, body)
                     return
                 data = proxy_candles(mint)
+                # since=<unix>: bars at/after the client's last bar (it may still be forming)
+                since = _qs_int(qs, "since")
+                if since:
+                    data["candles"] = [c for c in data["candles"] if c["time"] >= since]
+                data["cursor"] = data["candles"][-1]["time"] if data["candles"] else since
+                if qs.get("format", [""])[0] == "cols":
+                    data["candles"] = _cols_candles(data["candles"])
                 code, headers, body = _json(data)
             elif u.path == "/api/marker/test":
                 # quick manual test: /api/marker/test?mint=<MINT>
@@ -238,11 +512,90 @@ class H(BaseHTTPRequestHandler):
             except:
                 pass
 
+    def do_POST(self):
+        u = urlparse(self.path)
+        if u.path != "/api/notify":
+            self._send(*_bad("not found", 404))
+            return
+        try:
+            n = int(self.headers.get("Content-Length") or 0)
+            data = json.loads(self.rfile.read(n) or b"{}")
+            mints = [m for m in (data.get("mints") or []) if isinstance(m, str)]
+            _hub.notify(mints)
+            self._send(*_json({"ok": True, "mints": len(mints)}))
+        except Exception as e:
+            self._send(*_bad(f"bad notify: {e}"))
+
+    def _event(self, name, obj):
+        self.wfile.write(f"event: {name}\ndata: {json.dumps(obj)}\n\n".encode())
+        self.wfile.flush()
+
+    def _stream(self, mint):
+        """Server-Sent Events: full state once, then only new bars and new markers."""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("X-Accel-Buffering", "no")
+        self.end_headers()
+        try:
+            try:
+                boot = proxy_candles(mint)
+            except Exception:
+                boot = {"candles": [], "symbol": "unknown", "pairUrl": None}
+            sigs, last_id = _signal_rows(mint)
+            seen = _hub.version(mint)
+            boot["signals"] = sigs
+            self._event("init", boot)
+            candles = boot["candles"]
+            last_bar = candles[-1]["time"] if candles else 0
+            t_candles = t_markers = t_ping = time.time()
+            while True:
+                ver = _hub.wait(mint, seen, timeout=1.0)
+                now = time.time()
+                if ver != seen or now - t_markers >= STREAM_MARKER_SEC:
+                    seen, t_markers = ver, now
+                    sigs, last_id = _signal_rows(mint, last_id)
+                    if sigs:
+                        self._event("markers", {"signals": sigs})
+                if now - t_candles >= STREAM_CANDLE_SEC:
+                    t_candles = now
+                    try:
+                        fresh = [c for c in proxy_candles(mint)["candles"] if c["time"] >= last_bar]
+                    except Exception:
+                        fresh = []  # upstream hiccup: keep the stream, retry next round
+                    if fresh:
+                        last_bar = fresh[-1]["time"]
+                        self._event("candles", {"candles": fresh})
+                if now - t_ping >= STREAM_PING_SEC:
+                    t_ping = now
+                    self.wfile.write(b": ping\n\n")
+                    self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError, TimeoutError):
+            return  # viewer went away
+        except Exception as e:
+            # headers are already out; just end the stream and let EventSource reconnect
+            print("[viewer] stream error:", repr(e))
+
     def log_request(self, *args, **kwargs):
         # keep console clean
         pass
 
+    def _conditional(self, headers, body):
+        """ETag/If-None-Match -> 304, and gzip when the client accepts it."""
+        etag = '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+        # anything big enough to gzip varies by Accept-Encoding, whichever encoding this client gets
+        vary = {"Vary": "Accept-Encoding"} if len(body) >= GZIP_MIN_BYTES else {}
+        headers = dict(headers, ETag=etag, **{"Cache-Control": "no-cache"}, **vary)
+        if etag in (self.headers.get("If-None-Match") or ""):
+            return 304, dict({"ETag": etag, "Cache-Control": "no-cache"}, **vary), b""
+        if vary and "gzip" in (self.headers.get("Accept-Encoding") or ""):
+            body = gzip.compress(body, 5)
+            headers.update({"Content-Encoding": "gzip", "Content-Length": str(len(body))})
+        return 200, headers, body
+
     def _send(self, code, headers, body):
+        if code == 200 and headers.get("Content-Type") == "application/json":
+            code, headers, body = self._conditional(headers, body)
         self.send_response(code)
         for k, v in headers.items():
             self.send_header(k, v)
@@ -250,9 +603,23 @@ class H(BaseHTTPRequestHandler):
         self.wfile.write(body)
 
 
+class _ThreadedServer(ThreadingHTTPServer):
+    request_queue_size = 128   # default 5 drops SYNs when many tabs refresh at once
+
+
 def main():
-    print(f"[viewer] http://localhost:{PORT}/?mint=<MINT>")
-    HTTPServer(("0.0.0.0", PORT), H).serve_forever()
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--port", type=int, default=PORT)
+    ap.add_argument("--mode", choices=("threaded", "single"), default="threaded",
+                    help="threaded: one thread per request (default); single: legacy serial server")
+    args = ap.parse_args()
+
+    global _pool
+    _setup_db()
+    _pool = _ReadPool()
+    server_cls = _ThreadedServer if args.mode == "threaded" else HTTPServer
+    print(f"[viewer] http://localhost:{args.port}/?mint=<MINT> ({args.mode})")
+    server_cls(("0.0.0.0", args.port), H).serve_forever()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,15 @@
+# scripts/signal_engine.py — follow every mint in engine_follow from one process
+import argparse
+from core.engine import SignalEngine, CYCLE_SEC, FETCH_WORKERS
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--cycle", type=float, default=CYCLE_SEC, help="seconds per decision cycle")
+    ap.add_argument("--workers", type=int, default=FETCH_WORKERS, help="concurrent candle fetches")
+    args = ap.parse_args()
+    SignalEngine(cycle_sec=args.cycle, workers=args.workers).run_forever()
+
+
+if __name__ == "__main__":
+    main()
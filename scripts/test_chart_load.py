@@ -0,0 +1,72 @@
+# scripts/test_chart_load.py — many viewers per mint against a running serve_chart
+import argparse
+import threading
+import time
+import requests
+
+
+def _viewer(base, mint, stop, stats, lock, with_candles):
+    s = requests.Session()
+    paths = [f"/api/live?mint={mint}"] + ([f"/candles?mint={mint}"] if with_candles else [])
+    while not stop.is_set():
+        for path in paths:
+            t0 = time.time()
+            try:
+                ok = s.get(base + path, timeout=30).status_code == 200
+            except Exception:
+                ok = False
+            dt = time.time() - t0
+            with lock:
+                stats.setdefault(path.split("?")[0], []).append((dt, ok))
+
+
+def _pct(xs, q):
+    xs = sorted(xs)
+    return xs[min(len(xs)-1, int(q*len(xs)))] if xs else 0.0
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--base", default="http://localhost:8765")
+    ap.add_argument("--mints", default="So11111111111111111111111111111111111111112",
+                    help="comma-separated mints")
+    ap.add_argument("--viewers", type=int, default=25, help="viewers per mint")
+    ap.add_argument("--seconds", type=float, default=20)
+    ap.add_argument("--no-candles", action="store_true", help="skip /candles (no upstream calls)")
+    args = ap.parse_args()
+
+    mints = [m.strip() for m in args.mints.split(",") if m.strip()]
+    stop, lock, stats = threading.Event(), threading.Lock(), {}
+    threads = [threading.Thread(target=_viewer, daemon=True,
+                                args=(args.base, m, stop, stats, lock, not args.no_candles))
+               for m in mints for _ in range(args.viewers)]
+    for t in threads:
+        t.start()
+
+    # /health must stay fast while the viewers hammer the server
+    health = []
+    t_end = time.time() + args.seconds
+    while time.time() < t_end:
+        t0 = time.time()
+        try:
+            ok = requests.get(args.base + "/health", timeout=5).text.strip() == "ok"
+        except Exception:
+            ok = False
+        health.append((time.time() - t0, ok))
+        time.sleep(0.5)
+    stop.set()
+    for t in threads:
+        t.join(timeout=35)
+
+    stats["/health"] = health
+    print(f"[load] {len(mints)} mint(s) x {args.viewers} viewers for {args.seconds:.0f}s")
+    for path, xs in sorted(stats.items()):
+        lat = [d for d, _ in xs]
+        errs = sum(1 for _, ok in xs if not ok)
+        print(f"  {path:<10} n={len(xs):>6}  rps={len(xs)/args.seconds:>7.1f}  "
+              f"p50={_pct(lat, .5)*1000:>7.1f}ms  p95={_pct(lat, .95)*1000:>7.1f}ms  "
+              f"max={max(lat)*1000 if lat else 0:>7.1f}ms  errors={errs}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+# scripts/test_notifier.py — burst posts through core.notifier into the local fake webhook
+import argparse
+import os
+import time
+from scripts.fake_webhook import FakeWebhook
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--posts", type=int, default=40)
+    ap.add_argument("--bucket", type=int, default=2, help="fake webhook posts per window")
+    ap.add_argument("--window", type=float, default=1.0)
+    ap.add_argument("--fail-every", type=int, default=4)
+    args = ap.parse_args()
+
+    hook = FakeWebhook(0, args.bucket, args.window, args.fail_every).start()
+    # must be set before core.config is imported
+    os.environ["DISCORD_WEBHOOK"] = hook.url
+    os.environ["DRY_RUN"] = "0"
+    from core import notifier
+
+    slowest = 0.0
+    for i in range(args.posts):
+        t0 = time.time()
+        notifier.post({"mint": f"Mint{i}", "symbol": f"T{i}", "pair_url": "https://dexscreener.com"},
+                      70 + i % 30, {"liq": 20, "mc": 10, "age": 15})
+        slowest = max(slowest, time.time() - t0)
+        if i % 7 == 6:
+            time.sleep(0.3)   # bursts with small gaps
+    ok = notifier.flush(60)
+
+    embeds = sum(len(p.get("embeds") or []) for _, p in hook.received)
+    print(f"[notifier] {args.posts} posts, slowest post() call {slowest*1000:.2f}ms")
+    print(f"[notifier] webhook calls={len(hook.statuses)} delivered={len(hook.received)} "
+          f"embeds={embeds} 429s={hook.statuses.count(429)} 5xx={hook.statuses.count(502)}")
+    print(f"[notifier] flushed={ok} stats={notifier.stats()}")
+    hook.stop()
+
+
+if __name__ == "__main__":
+    main()
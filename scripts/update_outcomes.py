@@ -1,3 +1,14 @@
+import argparse
 from core import analytics
-analytics.update_recent_outcomes(hours_back=12)
-print("Outcomes updated.")
+from core.outcomes import OutcomeScheduler
+
+ap = argparse.ArgumentParser()
+ap.add_argument("--hours", type=int, default=12)
+ap.add_argument("--loop", action="store_true", help="stay up and fire each horizon at its due time")
+args = ap.parse_args()
+
+if args.loop:
+    OutcomeScheduler().run_forever(args.hours)
+else:
+    analytics.update_recent_outcomes(hours_back=args.hours)
+    print("Outcomes updated.")